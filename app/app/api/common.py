@@ -1,10 +1,167 @@
+import asyncio
+from http import HTTPStatus
+from typing import Awaitable, List, Optional, Type, TypeVar
+
+from fastapi import HTTPException, Request, Response
 from pydantic import BaseModel, Field
 
+from app.core.config import settings
+from app.services.cache_manager import Payload
+
 DEFAULT_PAGE_SIZE = 10
 DEFAULT_PAGE_NUMBER = 1
+# Content encodings of stored payloads, most preferred first
+ENCODING_PREFERENCE = ("br", "zstd", "gzip", "deflate")
+# Non-standard status (as nginx's) of requests abandoned by the client
+CLIENT_CLOSED_REQUEST = 499
+
+T = TypeVar("T")
+
+
+class ClientDisconnected(Exception):
+    pass
 
 
 class PaginatedParams(BaseModel):
     page: int = Field(DEFAULT_PAGE_NUMBER, alias="page", description="Page number")
     size: int = Field(DEFAULT_PAGE_SIZE, alias="size",
                       description="Number of results per page")
+    cursor: Optional[str] = Field(
+        None, alias="cursor",
+        description="Cursor from the X-Next-Cursor header of the previous page, "
+                    "or '*' to start; replaces page")
+
+
+class BatchRequest(BaseModel):
+    ids: List[str] = Field(..., min_items=1, max_items=settings.batch_max_ids,
+                           description="IDs to fetch")
+
+
+def parse_fields(fields: Optional[str], model: Type[BaseModel]) -> Optional[List[str]]:
+    """The fields of a ``fields=`` projection, sorted and with the id, so equal
+    projections share a cache entry; None (whole documents) when omitted or
+    when every field is requested."""
+    if not fields:
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = sorted(requested - model.__fields__.keys())
+    if unknown:
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST,
+                            detail=f"Unknown fields: {', '.join(unknown)}")
+    requested.add("id")
+    if requested == model.__fields__.keys():
+        return None
+    return sorted(requested)
+
+
+def json_response(body: bytes, headers: Optional[dict[str, str]] = None) -> Response:
+    """Send an already serialized JSON body (e.g. straight from the cache) as-is."""
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def cache_control(route: str) -> str:
+    max_age = settings.http_max_age.get(route, 0)
+    if not max_age:
+        return "no-cache"
+    return (f"public, max-age={max_age}, "
+            f"stale-while-revalidate={settings.http_stale_while_revalidate}")
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether an If-None-Match header matches the ETag (weak comparison)."""
+    if if_none_match.strip() == "*":
+        return True
+    etag = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == etag
+               for tag in if_none_match.split(","))
+
+
+def encoding_etag(etag: str, encoding: str) -> str:
+    """ETag of the ``encoding`` of a representation: each encoding is a
+    representation of its own. Keeps the tag's weakness."""
+    weak = "W/" if etag.startswith("W/") else ""
+    opaque = etag.removeprefix("W/").strip('"')
+    return f'{weak}"{opaque}-{encoding}"'
+
+
+def accepted_encodings(accept_encoding: str) -> set[str]:
+    """Content codings an Accept-Encoding header allows (q > 0)."""
+    accepted = set()
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        params = params.strip()
+        try:
+            quality = float(params[2:]) if params.startswith("q=") else 1.0
+        except ValueError:
+            quality = 0.0
+        if quality > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def choose_encoding(accept_encoding: Optional[str],
+                    encodings: dict[str, bytes]) -> Optional[str]:
+    if not accept_encoding or not encodings:
+        return None
+    accepted = accepted_encodings(accept_encoding)
+    for encoding in ENCODING_PREFERENCE:
+        if encoding in encodings and (encoding in accepted or "*" in accepted):
+            return encoding
+    return None
+
+
+def payload_response(payload: Payload, request: Optional[Request] = None,
+                     route: Optional[str] = None) -> Response:
+    """Send a payload with the route's Cache-Control, or 304 Not Modified when
+    the request's If-None-Match has its ETag.
+
+    The body is sent precompressed as stored in the cache when the client
+    accepts one of its encodings.
+    """
+    headers = dict(payload.headers)
+    body = payload.body
+    if route is not None:
+        headers["Cache-Control"] = cache_control(route)
+        headers["Vary"] = "Accept-Encoding"
+    encoding = None
+    if request is not None:
+        encoding = choose_encoding(request.headers.get("accept-encoding"),
+                                   payload.encodings)
+    if encoding is not None:
+        body = payload.encodings[encoding]
+        headers["Content-Encoding"] = encoding
+        if "ETag" in headers:
+            headers["ETag"] = encoding_etag(headers["ETag"], encoding)
+    etag = headers.get("ETag")
+    if_none_match = None
+    if request is not None:
+        if_none_match = request.headers.get("if-none-match")
+    if etag and if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=HTTPStatus.NOT_MODIFIED, headers=headers)
+    return json_response(body, headers)
+
+
+def json_list_response(bodies: List[Optional[bytes]]) -> Response:
+    """Join cached JSON bodies into an array, with null for missing items."""
+    return json_response(b"[" + b",".join(body or b"null" for body in bodies) + b"]")
+
+
+async def _wait_for_disconnect(request: Request) -> None:
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+
+
+async def cancel_on_disconnect(request: Request, awaitable: Awaitable[T]) -> T:
+    """Await ``awaitable``, cancelling it and raising ``ClientDisconnected`` if
+    the client goes away first (e.g. a superseded autocomplete keystroke)."""
+    task = asyncio.ensure_future(awaitable)
+    disconnect = asyncio.ensure_future(_wait_for_disconnect(request))
+    try:
+        await asyncio.wait({task, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        disconnect.cancel()
+        if not task.done():
+            task.cancel()
+    if not task.done():
+        raise ClientDisconnected()
+    return task.result()
@@ -0,0 +1,24 @@
+from http import HTTPStatus
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import ORJSONResponse
+
+from app.services.dependencies import get_cache_invalidator, get_warmup
+from app.services.invalidation import CacheInvalidator
+from app.services.warmup import Warmup
+
+router = APIRouter()
+
+
+@router.get("/ready", include_in_schema=False)
+async def ready(
+    warmup: Warmup = Depends(get_warmup),
+    cache_invalidator: CacheInvalidator = Depends(get_cache_invalidator),
+) -> ORJSONResponse:
+    """Readiness probe: 503 until the cache generations are loaded and the cache
+    warm-up has finished."""
+    is_ready = warmup.is_ready and cache_invalidator.generations_loaded
+    status_code = HTTPStatus.OK if is_ready else HTTPStatus.SERVICE_UNAVAILABLE
+    body = {**warmup.status(),
+            "generations_loaded": cache_invalidator.generations_loaded}
+    return ORJSONResponse(body, status_code=status_code)
@@ -0,0 +1,97 @@
+import os
+import time
+
+from fastapi import APIRouter, Depends, Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest)
+from prometheus_client.multiprocess import MultiProcessCollector
+
+from app.core.metrics import (
+    ES_BATCHING_STATS,
+    ES_POOL_STATS,
+    HTTP_REQUEST_DURATION,
+    LOCAL_CACHE_STATS,
+    REDIS_POOL_STATS,
+)
+from app.db import elastic, redis
+from app.services.batching import BatchingElasticsearchService
+from app.services.cache_manager import CacheManager, TieredCacheManager
+from app.services.dependencies import (
+    get_async_elasticsearch_service, get_cache_manager, get_elasticsearch_service)
+from app.services.elasticsearch_service import (
+    AsyncElasticsearchService, ElasticsearchService)
+
+router = APIRouter()
+
+
+def _registry() -> CollectorRegistry:
+    """The process's own metrics, or those of all workers in multiprocess mode."""
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry)
+    return registry
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics(
+    cache_manager: CacheManager = Depends(get_cache_manager),
+    es_service: ElasticsearchService = Depends(get_elasticsearch_service),
+    async_es_service: ElasticsearchService = Depends(get_async_elasticsearch_service),
+) -> Response:
+    """Prometheus metrics in the text exposition format."""
+    if isinstance(cache_manager, TieredCacheManager):
+        for index_name, stats in cache_manager.stats().items():
+            for stat, value in stats.items():
+                LOCAL_CACHE_STATS.labels(index_name, stat).set(value)
+    if isinstance(es_service, BatchingElasticsearchService):
+        for stat, value in es_service.stats().items():
+            ES_BATCHING_STATS.labels(stat).set(value)
+    # Pool use against capacity, for sizing workers
+    if redis.redis is not None:
+        for stat, value in redis.pool_stats(redis.redis).items():
+            REDIS_POOL_STATS.labels(stat).set(value)
+    if (elastic.es is not None
+            and isinstance(async_es_service, AsyncElasticsearchService)):
+        stats = elastic.pool_stats(elastic.es, async_es_service.in_flight)
+        for stat, value in stats.items():
+            ES_POOL_STATS.labels(stat).set(value)
+    # Passed as a header: media_type would get a second charset appended
+    return Response(content=generate_latest(_registry()),
+                    headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+
+class MetricsMiddleware:
+    """Records the duration of every HTTP request by endpoint and status.
+
+    Plain ASGI rather than ``BaseHTTPMiddleware``, which would add a task and a
+    queue to each request. The endpoint label is the handler (``movies.film_details``),
+    so path parameters don't multiply the label values.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched handler in the (shared) scope
+            endpoint = scope.get("endpoint")
+            name = (f"{endpoint.__module__.rsplit('.', 1)[-1]}.{endpoint.__name__}"
+                    if endpoint is not None else "unmatched")
+            HTTP_REQUEST_DURATION.labels(scope["method"], name, str(status)).observe(
+                time.perf_counter() - started)
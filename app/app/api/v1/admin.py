@@ -0,0 +1,50 @@
+from http import HTTPStatus
+from secrets import compare_digest
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
+from app.services.dependencies import get_cache_invalidator
+from app.services.invalidation import CacheInvalidator
+from app.services.search_profiles import SEARCH_PROFILES
+
+router = APIRouter()
+
+
+class InvalidationRequest(BaseModel):
+    index: str = Field(..., description="Index of the changed documents, e.g. 'movies'")
+    ids: List[str] = Field([], description="IDs of changed or deleted documents; "
+                                           "empty when documents were only added")
+
+
+class InvalidationResponse(BaseModel):
+    index: str
+    generation: int
+
+
+async def check_admin_token(x_admin_token: Optional[str] = Header(None)) -> None:
+    if not settings.admin_token or not x_admin_token \
+            or not compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(status_code=HTTPStatus.FORBIDDEN,
+                            detail="Invalid admin token")
+
+
+@router.post("/invalidate", response_model=InvalidationResponse,
+             summary="Invalidate Cached Documents",
+             dependencies=[Depends(check_admin_token)])
+async def invalidate(
+    request: InvalidationRequest,
+    invalidator: CacheInvalidator = Depends(get_cache_invalidator),
+) -> InvalidationResponse:
+    """
+    Drop cached copies of changed documents and all cached searches of their
+    index, on all workers.
+    - **index**: Index of the documents ('movies', 'persons' or 'genres').
+    - **ids**: IDs of the changed documents.
+    """
+    if request.index not in SEARCH_PROFILES:
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail="Unknown index")
+    generation = await invalidator.invalidate(request.index, request.ids)
+    return InvalidationResponse(index=request.index, generation=generation)
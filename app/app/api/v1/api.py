@@ -1,9 +1,12 @@
 from fastapi import APIRouter
 
-from app.api.v1 import persons, genres, movies
+from app.api.v1 import admin, persons, genres, movies, search, suggest
 
 
 api_router = APIRouter()
 api_router.include_router(persons.router, prefix="/persons", tags=["persons"])
 api_router.include_router(movies.router, prefix="/movies", tags=["movies"])
 api_router.include_router(genres.router, prefix="/genres", tags=["genres"])
+api_router.include_router(search.router, prefix="/search", tags=["search"])
+api_router.include_router(suggest.router, prefix="/suggest", tags=["suggest"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
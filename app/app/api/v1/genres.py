@@ -1,9 +1,12 @@
 from http import HTTPStatus
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from app.models.genre import Genre
 from app.interfaces.igenre_service import IGenreService
 from app.services.dependencies import get_genre_service
-from search.app.app.api.common import PaginatedParams
+from app.api.common import (BatchRequest, PaginatedParams, json_list_response,
+                            parse_fields, payload_response)
+from app.services.cursor import InvalidCursorError
 
 router = APIRouter()
 
@@ -13,37 +16,67 @@ class InvalidFieldNameError(Exception):
 
 
 @router.get("/{_id}", response_model=Genre, summary="Get Genre Details")
-async def genre_details(_id: str, _service: IGenreService = Depends(get_genre_service)
-                        ) -> Genre:
+async def genre_details(
+    _id: str,
+    request: Request,
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. 'id,name'"),
+    _service: IGenreService = Depends(get_genre_service),
+) -> Response:
     """
     Retrieve detailed information about a genre by its ID.
     - **_id**: UUID of the genre to retrieve details for.
+    - **fields**: Fields to return (the id is always included); all when omitted.
     """
-    result = await _service.get_by_id(_id)
+    result = await _service.get_by_id_raw(_id, parse_fields(fields, Genre))
     if not result:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="Genre not found")
-    return result
+    return payload_response(result, request, "detail")
+
+
+@router.post("/_batch", response_model=list[Optional[Genre]],
+             summary="Get Genres by IDs")
+async def genres_batch(
+    batch: BatchRequest, _service: IGenreService = Depends(get_genre_service)
+) -> Response:
+    """
+    Retrieve several genres by their IDs in one request.
+    - **ids**: UUIDs of the genres; results follow their order, with null for
+      unknown IDs.
+    """
+    result = await _service.get_many_raw(batch.ids)
+    return json_list_response(result)
 
 
 @router.get("/search/", response_model=list[Genre], summary="Search Genres")
 async def search_genres(
+    request: Request,
     query: str = Query(None, min_length=1, description="Search query string"),
     paginated_params: PaginatedParams = Depends(),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. 'id,name'"),
     _service: IGenreService = Depends(get_genre_service)
-) -> list[Genre]:
+) -> Response:
     """
     Search for genres based on a query string with pagination.
     - **query**: The search query string.
     - **page**: Page number.
     - **size**: Number of results per page.
+    - **cursor**: Cursor of the next page (see the X-Next-Cursor header), '*' to start.
+    - **fields**: Fields to return (the id is always included); all when omitted.
     """
     if not query:
         raise HTTPException(status_code=HTTPStatus.BAD_REQUEST,
                             detail="Query string is required")
-    result = await _service.search_genres(query, paginated_params.page, paginated_params.size)
+    try:
+        result = await _service.search_genres_raw(
+            query, paginated_params.page, paginated_params.size,
+            paginated_params.cursor, parse_fields(fields, Genre))
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail=str(e))
     if not result:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="Genres not found")
-    return result
+    return payload_response(result, request, "search")
 
 
 @router.get(
@@ -52,17 +85,22 @@ async def search_genres(
     summary="Search Genres by Field",
 )
 async def search_field(
+    request: Request,
     field_search: str = Query(..., description="Field to search in, e.g., 'full_name'"),
     query: str = Query(..., description="Search query string"),
     paginated_params: PaginatedParams = Depends(),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. 'id,name'"),
     _service: IGenreService = Depends(get_genre_service),
-) -> list[Genre]:
+) -> Response:
     """
     Search for genres based on a specified field and query with pagination.
     - **field_search**: The field to search in (e.g., 'name').
     - **query**: The search query string.
     - **page**: Page number.
     - **size**: Number of results per page.
+    - **cursor**: Cursor of the next page (see the X-Next-Cursor header), '*' to start.
+    - **fields**: Fields to return (the id is always included); all when omitted.
     """
     if not query:
         raise HTTPException(status_code=HTTPStatus.BAD_REQUEST,
@@ -71,14 +109,16 @@ async def search_field(
         raise HTTPException(status_code=HTTPStatus.BAD_REQUEST,
                             detail="Field search is required")
     try:
-        result = await _service.search_genres_by_field(field_search, query,
-                                                       paginated_params.page, paginated_params.size)
-    except InvalidFieldNameError as e:
+        result = await _service.search_genres_by_field_raw(
+            field_search, query, paginated_params.page, paginated_params.size,
+            paginated_params.cursor, parse_fields(fields, Genre))
+    except (InvalidFieldNameError, InvalidCursorError) as e:
         raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail=str(e))
 
     if not result:
         raise HTTPException(
-            status_code=HTTPStatus.NOT_FOUND, detail="No genres found matching the query"
+            status_code=HTTPStatus.NOT_FOUND,
+            detail="No genres found matching the query",
         )
 
-    return result
+    return payload_response(result, request, "search")
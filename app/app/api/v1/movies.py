@@ -1,9 +1,15 @@
 from http import HTTPStatus
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from app.models.browse import FilmBrowseResults
 from app.models.film import Film
 from app.interfaces.ifilm_service import IFilmService
 from app.services.dependencies import get_film_service
-from search.app.app.api.common import PaginatedParams
+from app.api.common import (DEFAULT_PAGE_NUMBER, DEFAULT_PAGE_SIZE, BatchRequest,
+                            PaginatedParams, json_list_response, parse_fields,
+                            payload_response)
+from app.services.cursor import InvalidCursorError
+from app.services.search_profiles import get_search_profile
 
 router = APIRouter()
 
@@ -14,37 +20,67 @@ class InvalidFieldNameError(Exception):
 
 @router.get("/{film_id}", response_model=Film, summary="Get Film Details")
 async def film_details(
-    film_id: str, _service: IFilmService = Depends(get_film_service)
-) -> Film:
+    film_id: str,
+    request: Request,
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. 'id,title'"),
+    _service: IFilmService = Depends(get_film_service),
+) -> Response:
     """
     Retrieve detailed information about a film by its ID.
     - **film_id**: UUID of the film to retrieve details for.
+    - **fields**: Fields to return (the id is always included); all when omitted.
     """
-    film = await _service.get_by_id(film_id)
+    film = await _service.get_by_id_raw(film_id, parse_fields(fields, Film))
     if not film:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="Film not found")
-    return film
+    return payload_response(film, request, "detail")
+
+
+@router.post("/_batch", response_model=list[Optional[Film]],
+             summary="Get Films by IDs")
+async def films_batch(
+    batch: BatchRequest, _service: IFilmService = Depends(get_film_service)
+) -> Response:
+    """
+    Retrieve several films by their IDs in one request.
+    - **ids**: UUIDs of the films; results follow their order, with null for
+      unknown IDs.
+    """
+    films = await _service.get_many_raw(batch.ids)
+    return json_list_response(films)
 
 
-@router.get("/search/", response_model=list[Film], summary="Search Films by Query Params")
+@router.get("/search/", response_model=list[Film],
+            summary="Search Films by Query Params")
 async def search_films(
+    request: Request,
     query: str = Query(None, min_length=1, description="Search query string"),
     paginated_params: PaginatedParams = Depends(),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. 'id,title'"),
     _service: IFilmService = Depends(get_film_service)
-) -> list[Film]:
+) -> Response:
     """
     Search for films based on a query string with pagination.
     - **query**: The search query string.
     - **page**: Page number.
     - **size**: Number of results per page.
+    - **cursor**: Cursor of the next page (see the X-Next-Cursor header), '*' to start.
+    - **fields**: Fields to return (the id is always included); all when omitted.
     """
     if not query:
         raise HTTPException(status_code=HTTPStatus.BAD_REQUEST,
                             detail="Query string is required")
-    films = await _service.search_films(query, paginated_params.page, paginated_params.size)
+    try:
+        films = await _service.search_films_raw(
+            query, paginated_params.page, paginated_params.size,
+            paginated_params.cursor, parse_fields(fields, Film))
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail=str(e))
     if not films:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="Films not found")
-    return films
+    return payload_response(films, request, "search")
 
 
 @router.get(
@@ -53,18 +89,23 @@ async def search_films(
     summary="Search Films by Field",
 )
 async def search_field(
-    field_search: str = Query(...,
-                              description="Field to search in, e.g., 'title', 'genre', 'actors.name'"),
+    request: Request,
+    field_search: str = Query(
+        ..., description="Field to search in, e.g., 'title', 'genre', 'actors.name'"),
     query: str = Query(..., description="Search query string"),
     paginated_params: PaginatedParams = Depends(),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. 'id,title'"),
     _service: IFilmService = Depends(get_film_service),
-) -> list[Film]:
+) -> Response:
     """
     Search for films based on a specified field and query with pagination.
     - **field_search**: The field to search in (e.g., 'title', 'genre', 'actors.name').
     - **query**: The search query string.
     - **page**: Page number.
     - **size**: Number of results per page.
+    - **cursor**: Cursor of the next page (see the X-Next-Cursor header), '*' to start.
+    - **fields**: Fields to return (the id is always included); all when omitted.
     """
     if not query:
         raise HTTPException(status_code=HTTPStatus.BAD_REQUEST,
@@ -73,11 +114,53 @@ async def search_field(
         raise HTTPException(status_code=HTTPStatus.BAD_REQUEST,
                             detail="Field search is required")
     try:
-        films = await _service.search_films_by_field(field_search, query, paginated_params.page, paginated_params.size)
-    except InvalidFieldNameError as e:
+        films = await _service.search_films_by_field_raw(
+            field_search, query, paginated_params.page, paginated_params.size,
+            paginated_params.cursor, parse_fields(fields, Film))
+    except (InvalidFieldNameError, InvalidCursorError) as e:
         raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail=str(e))
 
     if not films:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND,
                             detail="No films found matching the query")
-    return films
+    return payload_response(films, request, "search")
+
+
+@router.get("/browse/", response_model=FilmBrowseResults,
+            summary="Browse Films by Filters")
+async def browse_films(
+    request: Request,
+    genre: List[str] = Query(None, description="Genres to include (any of them)"),
+    type: List[str] = Query(
+        None, description="Types to include (any of them), e.g. 'movie'"),
+    imdb_rating_min: Optional[float] = Query(
+        None, ge=0, description="Minimum IMDb rating"),
+    imdb_rating_max: Optional[float] = Query(
+        None, ge=0, description="Maximum IMDb rating"),
+    sort: str = Query(
+        "-imdb_rating", description="Sort field, '-' prefixed for descending order"),
+    page: int = Query(DEFAULT_PAGE_NUMBER, ge=1, description="Page number"),
+    size: int = Query(
+        DEFAULT_PAGE_SIZE, ge=1, description="Number of results per page"),
+    _service: IFilmService = Depends(get_film_service),
+) -> Response:
+    """
+    List films matching all the filters, with the number of matching films per
+    genre and type.
+    - **genre**: Genres to include (repeatable).
+    - **type**: Types to include (repeatable).
+    - **imdb_rating_min** / **imdb_rating_max**: IMDb rating range (inclusive).
+    - **sort**: imdb_rating or title, '-' prefixed for descending order.
+    - **page**: Page number.
+    - **size**: Number of results per page.
+    """
+    if sort.lstrip("-") not in get_search_profile("movies").sort_fields:
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST,
+                            detail=f"Unknown sort field: {sort}")
+    if imdb_rating_min is not None and imdb_rating_max is not None \
+            and imdb_rating_min > imdb_rating_max:
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST,
+                            detail="imdb_rating_min is greater than imdb_rating_max")
+    result = await _service.browse_films_raw(genre, type, imdb_rating_min,
+                                             imdb_rating_max, sort, page, size)
+    return payload_response(result, request, "search")
@@ -1,9 +1,15 @@
 from http import HTTPStatus
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from app.models.film import Film
 from app.models.person import Person
 from app.interfaces.iperson_service import IPersonService
-from app.services.dependencies import get_person_service
-from search.app.app.api.common import PaginatedParams
+from app.services.dependencies import get_filmography_service, get_person_service
+from app.services.filmography import FilmographyService
+from app.api.common import (DEFAULT_PAGE_NUMBER, DEFAULT_PAGE_SIZE, BatchRequest,
+                            PaginatedParams, json_list_response, parse_fields,
+                            payload_response)
+from app.services.cursor import InvalidCursorError
 
 router = APIRouter()
 
@@ -14,34 +20,83 @@ class InvalidFieldNameError(Exception):
 
 @router.get("/{_id}", response_model=Person, summary="Get Person Details")
 async def person_details(
-    _id: str, _service: IPersonService = Depends(get_person_service)
-) -> Person:
+    _id: str,
+    request: Request,
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. 'id,full_name'"),
+    _service: IPersonService = Depends(get_person_service),
+) -> Response:
     """
     Retrieve detailed information about a person by its ID.
     - **_id**: UUID of the person to retrieve details for.
+    - **fields**: Fields to return (the id is always included); all when omitted.
     """
-    result = await _service.get_by_id(_id)
+    result = await _service.get_by_id_raw(_id, parse_fields(fields, Person))
     if not result:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="Person not found")
-    return result
+    return payload_response(result, request, "detail")
+
+
+@router.get("/{_id}/films", response_model=list[Film], summary="Get Films of a Person")
+async def person_films(
+    _id: str,
+    request: Request,
+    page: int = Query(DEFAULT_PAGE_NUMBER, ge=1, description="Page number"),
+    size: int = Query(
+        DEFAULT_PAGE_SIZE, ge=1, description="Number of results per page"),
+    _service: FilmographyService = Depends(get_filmography_service),
+) -> Response:
+    """
+    Retrieve the films of a person (in the order of its films_id) with pagination.
+    - **_id**: UUID of the person.
+    - **page**: Page number.
+    - **size**: Number of results per page.
+    """
+    result = await _service.get_films_raw(_id, page, size)
+    if not result:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="Person not found")
+    return payload_response(result, request, "search")
+
+
+@router.post("/_batch", response_model=list[Optional[Person]],
+             summary="Get Persons by IDs")
+async def persons_batch(
+    batch: BatchRequest, _service: IPersonService = Depends(get_person_service)
+) -> Response:
+    """
+    Retrieve several persons by their IDs in one request.
+    - **ids**: UUIDs of the persons; results follow their order, with null for
+      unknown IDs.
+    """
+    result = await _service.get_many_raw(batch.ids)
+    return json_list_response(result)
 
 
 @router.get("/search/", response_model=list[Person], summary="Search Persons")
 async def search_persons(
+    request: Request,
     query: str = Query(None, min_length=1, description="Search query string"),
     paginated_params: PaginatedParams = Depends(),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. 'id,full_name'"),
     _service: IPersonService = Depends(get_person_service)
-) -> list[Person]:
+) -> Response:
     """
     Search for persons based on a query string with pagination.
     - **query**: The search query string.
     - **paginated_params**: Pagination parameters.
+    - **fields**: Fields to return (the id is always included); all when omitted.
     """
-    result = await _service.search_persons(query, paginated_params.page, paginated_params.size)
+    try:
+        result = await _service.search_persons_raw(
+            query, paginated_params.page, paginated_params.size,
+            paginated_params.cursor, parse_fields(fields, Person))
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail=str(e))
     if not result:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND,
                             detail="Persons not found")
-    return result
+    return payload_response(result, request, "search")
 
 
 @router.get(
@@ -50,18 +105,23 @@ async def search_persons(
     summary="Search Persons by Field",
 )
 async def search_field(
-    field_search: str = Query(...,
-                              description="Field to search in, e.g., 'title', 'genre', 'actors.name'"),
+    request: Request,
+    field_search: str = Query(
+        ..., description="Field to search in, e.g., 'title', 'genre', 'actors.name'"),
     query: str = Query(..., description="Search query string"),
     paginated_params: PaginatedParams = Depends(),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. 'id,full_name'"),
     _service: IPersonService = Depends(get_person_service),
-) -> list[Person]:
+) -> Response:
     """
     Search for persons based on a specified field and query with pagination.
     - **field_search**: The field to search in (e.g., 'title', 'genre', 'actors.name').
     - **query**: The search query string.
     - **page**: Page number.
     - **size**: Number of results per page.
+    - **cursor**: Cursor of the next page (see the X-Next-Cursor header), '*' to start.
+    - **fields**: Fields to return (the id is always included); all when omitted.
     """
     if not query:
         raise HTTPException(status_code=HTTPStatus.BAD_REQUEST,
@@ -70,14 +130,16 @@ async def search_field(
         raise HTTPException(status_code=HTTPStatus.BAD_REQUEST,
                             detail="Field search is required")
     try:
-        result = await _service.search_persons_by_field(field_search, query, paginated_params.page,
-                                                        paginated_params.size)
-    except InvalidFieldNameError as e:
+        result = await _service.search_persons_by_field_raw(
+            field_search, query, paginated_params.page, paginated_params.size,
+            paginated_params.cursor, parse_fields(fields, Person))
+    except (InvalidFieldNameError, InvalidCursorError) as e:
         raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail=str(e))
 
     if not result:
         raise HTTPException(
-            status_code=HTTPStatus.NOT_FOUND, detail="No persons found matching the query"
+            status_code=HTTPStatus.NOT_FOUND,
+            detail="No persons found matching the query",
         )
 
-    return result
+    return payload_response(result, request, "search")
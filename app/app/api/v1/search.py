@@ -0,0 +1,39 @@
+from http import HTTPStatus
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+
+from app.api.common import DEFAULT_PAGE_NUMBER, DEFAULT_PAGE_SIZE, json_response
+from app.models.search import SearchResults
+from app.services.dependencies import get_federated_search_service
+from app.services.federated_search import FederatedSearchService
+from app.services.search_profiles import SEARCH_PROFILES
+
+router = APIRouter()
+
+
+@router.get("/", response_model=SearchResults,
+            summary="Search Films, Persons and Genres")
+async def search(
+    query: str = Query(..., min_length=1, description="Search query string"),
+    types: List[str] = Query(
+        None, description="Indexes to search: movies, persons, genres"),
+    page: int = Query(DEFAULT_PAGE_NUMBER, ge=1, description="Page number"),
+    size: int = Query(
+        DEFAULT_PAGE_SIZE, ge=1, description="Number of results per page and index"),
+    _service: FederatedSearchService = Depends(get_federated_search_service),
+) -> Response:
+    """
+    Search several indexes at once; results are grouped by index, with an
+    empty list for indexes without matches.
+    - **query**: The search query string.
+    - **types**: Indexes to search (repeatable); all by default.
+    - **page**: Page number.
+    - **size**: Number of results per page and index.
+    """
+    types = list(dict.fromkeys(types or SEARCH_PROFILES))
+    unknown = [index_name for index_name in types if index_name not in SEARCH_PROFILES]
+    if unknown:
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST,
+                            detail=f"Unknown types: {', '.join(unknown)}")
+    return json_response(await _service.search_raw(query, page, size, types))
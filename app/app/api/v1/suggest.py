@@ -0,0 +1,45 @@
+from http import HTTPStatus
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+
+from app.api.common import (
+    CLIENT_CLOSED_REQUEST, ClientDisconnected, cancel_on_disconnect, json_response)
+from app.core.config import settings
+from app.models.suggestion import Suggestions
+from app.services.dependencies import get_suggest_service
+from app.services.search_profiles import SEARCH_PROFILES
+from app.services.suggest import SuggestService
+
+router = APIRouter()
+
+
+@router.get("/", response_model=Suggestions, summary="Suggest Titles")
+async def suggest(
+    request: Request,
+    query: str = Query(..., min_length=1, description="What has been typed so far"),
+    types: List[str] = Query(
+        None, description="Indexes to suggest from: movies, persons, genres"),
+    size: int = Query(5, ge=1, le=settings.suggest_max_size,
+                      description="Suggestions per index"),
+    _service: SuggestService = Depends(get_suggest_service),
+) -> Response:
+    """
+    Autocomplete a search box: IDs and titles (names for persons) matching
+    every typed word as a prefix, best first.
+    - **query**: What has been typed so far.
+    - **types**: Indexes to suggest from (repeatable); all by default.
+    - **size**: Number of suggestions per index.
+    """
+    types = list(dict.fromkeys(types or SEARCH_PROFILES))
+    unknown = [index_name for index_name in types if index_name not in SEARCH_PROFILES]
+    if unknown:
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST,
+                            detail=f"Unknown types: {', '.join(unknown)}")
+    try:
+        body = await cancel_on_disconnect(request, _service.suggest(query, types, size))
+    except ClientDisconnected:
+        # Superseded by the next keystroke; nobody reads the response
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+    cache_control = f"public, max-age={int(settings.suggest_cache_ttl)}"
+    return json_response(body, {"Cache-Control": cache_control})
@@ -1,4 +1,5 @@
 from logging import config as logging_config
+from typing import Optional
 
 from pydantic import BaseSettings, Field
 
@@ -14,10 +15,113 @@ class Settings(BaseSettings):
     redis_port: int = Field(6379, env="REDIS_PORT")
     elastic_host: str = Field("elasticsearch", env="ELASTIC_HOST")
     elastic_port: int = Field(9200, env="ELASTIC_PORT")
+    # Redis connection pool: requests wait up to REDIS_POOL_TIMEOUT seconds for
+    # one of REDIS_MAX_CONNECTIONS connections, then fail
+    redis_max_connections: int = Field(50, env="REDIS_MAX_CONNECTIONS")
+    redis_pool_timeout: float = Field(1.0, env="REDIS_POOL_TIMEOUT")
+    redis_connect_timeout: float = Field(1.0, env="REDIS_CONNECT_TIMEOUT")
+    redis_socket_timeout: float = Field(1.0, env="REDIS_SOCKET_TIMEOUT")
+    redis_max_retries: int = Field(1, env="REDIS_MAX_RETRIES")
+    redis_health_check_interval: int = Field(30, env="REDIS_HEALTH_CHECK_INTERVAL")
+    # Elasticsearch nodes, e.g. ELASTIC_HOSTS='["http://es1:9200", "http://es2:9200"]'
+    # (requests are spread round-robin); defaults to ELASTIC_HOST:ELASTIC_PORT
+    elastic_hosts: list[str] = Field([], env="ELASTIC_HOSTS")
+    es_connections_per_node: int = Field(10, env="ES_CONNECTIONS_PER_NODE")
+    es_request_timeout: float = Field(5.0, env="ES_REQUEST_TIMEOUT")
+    es_max_retries: int = Field(2, env="ES_MAX_RETRIES")
+    es_retry_on_timeout: bool = Field(False, env="ES_RETRY_ON_TIMEOUT")
+    # Discover the cluster's nodes on startup and after a node fails
+    es_sniff: bool = Field(False, env="ES_SNIFF")
+    es_sniff_interval: float = Field(60.0, env="ES_SNIFF_INTERVAL")
+    # Deadlines (seconds) per operation overriding ES_REQUEST_TIMEOUT, e.g.
+    # ES_OPERATION_TIMEOUTS='{"suggest": 0.3, "get_all": 30}'
+    es_operation_timeouts: dict[str, float] = Field({}, env="ES_OPERATION_TIMEOUTS")
+    # In-process cache tier in front of Redis; sizes/TTLs can be overridden
+    # per index, e.g. LOCAL_CACHE_SIZES='{"genres": 100}'
+    local_cache_enabled: bool = Field(True, env="LOCAL_CACHE_ENABLED")
+    local_cache_max_size: int = Field(1024, env="LOCAL_CACHE_MAX_SIZE")
+    local_cache_ttl: int = Field(10, env="LOCAL_CACHE_TTL")
+    local_cache_sizes: dict[str, int] = Field({}, env="LOCAL_CACHE_SIZES")
+    local_cache_ttls: dict[str, int] = Field({}, env="LOCAL_CACHE_TTLS")
+    # Cached entries are served as fresh for CACHE_SOFT_TTL seconds, then served
+    # stale while being refreshed in the background until CACHE_HARD_TTL
+    cache_soft_ttl: int = Field(300, env="CACHE_SOFT_TTL")
+    cache_hard_ttl: int = Field(3600, env="CACHE_HARD_TTL")
+    # TTL of cached "not found" results (unknown IDs, empty searches)
+    cache_negative_ttl: int = Field(30, env="CACHE_NEGATIVE_TTL")
+    # Delay before retrying a failed background refresh of a stale entry
+    cache_refresh_backoff: int = Field(30, env="CACHE_REFRESH_BACKOFF")
+    # Keep-alive of the point in time opened for cursor pagination (e.g. "1m");
+    # unset to page with plain search_after over the live index
+    es_pit_keep_alive: Optional[str] = Field(None, env="ES_PIT_KEEP_ALIVE")
+    # Concurrent get-by-id lookups are sent to Elasticsearch as one mget per index
+    es_batch_enabled: bool = Field(True, env="ES_BATCH_ENABLED")
+    es_batch_max_size: int = Field(50, env="ES_BATCH_MAX_SIZE")
+    es_batch_max_wait_ms: float = Field(2.0, env="ES_BATCH_MAX_WAIT_MS")
+    # Cache-Control of responses per route kind (detail, search): browsers and
+    # CDNs reuse them for max-age seconds, then serve them stale while revalidating
+    http_max_age: dict[str, int] = Field({"detail": 60, "search": 30},
+                                         env="HTTP_MAX_AGE")
+    http_stale_while_revalidate: int = Field(300, env="HTTP_STALE_WHILE_REVALIDATE")
+    # Indexes whose searches fetch the hits' detail fields and cache their detail
+    # views along (opening a result is then a cache hit, at the cost of larger
+    # searches), e.g. SEARCH_PREFETCH_DETAILS='["movies"]'
+    search_prefetch_details: list[str] = Field([], env="SEARCH_PREFETCH_DETAILS")
+    # Maximum number of IDs accepted by the _batch endpoints
+    batch_max_ids: int = Field(100, env="BATCH_MAX_IDS")
+    # Turns search query normalization on or off per index, overriding the
+    # search profile, e.g. QUERY_NORMALIZATION='{"genres": false}'
+    query_normalization: dict[str, bool] = Field({}, env="QUERY_NORMALIZATION")
+    # Compression of cached values of at least CACHE_COMPRESSION_MIN_SIZE bytes:
+    # none, zlib, gzip, or zstd/lz4/br when their packages are installed
+    cache_compression: str = Field("gzip", env="CACHE_COMPRESSION")
+    cache_compression_level: Optional[int] = Field(None, env="CACHE_COMPRESSION_LEVEL")
+    cache_compression_min_size: int = Field(1024, env="CACHE_COMPRESSION_MIN_SIZE")
+    # Compressed values are sent as they are to clients accepting their encoding
+    # (gzip, deflate for zlib, br, zstd); extra HTTP content encodings to store
+    # them in, e.g. RESPONSE_ENCODINGS='["br", "deflate"]'
+    response_encodings: list[str] = Field([], env="RESPONSE_ENCODINGS")
+    # Pub/sub channel on which changed document IDs are announced to all workers
+    cache_invalidation_channel: str = Field("cache-invalidation",
+                                            env="CACHE_INVALIDATION_CHANNEL")
+    # Token for the admin endpoints (X-Admin-Token header); unset disables them
+    admin_token: Optional[str] = Field(None, env="ADMIN_TOKEN")
+    # Warm-up on startup: the WARMUP_TOP_N most requested detail/search requests
+    # per index (sampled into Redis at HOT_KEYS_SAMPLE_RATE, and/or read from a
+    # JSON lines WARMUP_FILE) are replayed before /ready reports ready
+    warmup_enabled: bool = Field(True, env="WARMUP_ENABLED")
+    warmup_file: Optional[str] = Field(None, env="WARMUP_FILE")
+    warmup_top_n: int = Field(200, env="WARMUP_TOP_N")
+    warmup_concurrency: int = Field(8, env="WARMUP_CONCURRENCY")
+    warmup_timeout: float = Field(60.0, env="WARMUP_TIMEOUT")
+    hot_keys_sample_rate: float = Field(0.01, env="HOT_KEYS_SAMPLE_RATE")
+    hot_keys_max_size: int = Field(10000, env="HOT_KEYS_MAX_SIZE")
+    hot_keys_ttl: int = Field(7 * 24 * 3600, env="HOT_KEYS_TTL")
+    # Serve the (small) genres index from an in-memory snapshot of all its
+    # documents, reloaded every GENRES_SNAPSHOT_REFRESH seconds and on invalidation
+    genres_snapshot_enabled: bool = Field(False, env="GENRES_SNAPSHOT_ENABLED")
+    genres_snapshot_refresh: float = Field(300.0, env="GENRES_SNAPSHOT_REFRESH")
+    snapshot_max_size: int = Field(10000, env="SNAPSHOT_MAX_SIZE")
+    # Autocomplete from in-process prefix indexes of titles and names (from
+    # Elasticsearch when disabled or not loaded yet), reloaded every
+    # SUGGEST_REFRESH seconds and on invalidation
+    suggest_index_enabled: bool = Field(True, env="SUGGEST_INDEX_ENABLED")
+    suggest_refresh: float = Field(600.0, env="SUGGEST_REFRESH")
+    suggest_max_documents: int = Field(200000, env="SUGGEST_MAX_DOCUMENTS")
+    suggest_max_size: int = Field(20, env="SUGGEST_MAX_SIZE")
+    suggest_cache_size: int = Field(10000, env="SUGGEST_CACHE_SIZE")
+    suggest_cache_ttl: float = Field(60.0, env="SUGGEST_CACHE_TTL")
+    # Invalidated documents arriving within this many seconds update the
+    # prefix indexes together (one fetch by ID and one rebuild)
+    suggest_invalidation_delay: float = Field(5.0, env="SUGGEST_INVALIDATION_DELAY")
+    # Cross-worker lock so only one process recomputes an expired cache entry
+    cache_lock_enabled: bool = Field(False, env="CACHE_LOCK_ENABLED")
+    cache_lock_timeout: float = Field(10.0, env="CACHE_LOCK_TIMEOUT")
+    cache_lock_wait: float = Field(2.0, env="CACHE_LOCK_WAIT")
+    cache_lock_poll_interval: float = Field(0.05, env="CACHE_LOCK_POLL_INTERVAL")
 
     class Config:
         env_file = '../../.env'
 
 
 settings = Settings()
-
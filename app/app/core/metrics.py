@@ -0,0 +1,88 @@
+"""Prometheus metrics, declared with prometheus_client.
+
+Label children are cached by prometheus_client, so an update is a dict lookup
+plus an addition and cheap enough for the hot paths. Under gunicorn set
+``PROMETHEUS_MULTIPROC_DIR`` so that ``/metrics`` aggregates all workers.
+"""
+from typing import List, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# Buckets (seconds) for requests served from memory, Redis or Elasticsearch
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0)
+# Buckets (seconds) for in-process work such as model validation
+CPU_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+               0.05)
+# Buckets (bytes) for cached payloads
+SIZE_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+# HTTP
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Time to handle an HTTP request",
+    ["method", "endpoint", "status"], buckets=LATENCY_BUCKETS)
+
+# Service layer
+CACHE_REQUESTS = Counter(
+    "cache_requests", "Cache lookups by result (hit, stale, negative, miss)",
+    ["index", "operation", "result"])
+CACHE_FILL_ERRORS = Counter(
+    "cache_fill_errors", "Failed loads of a cache entry from Elasticsearch", ["index"])
+CACHE_INVALIDATIONS = Counter(
+    "cache_invalidations", "Invalidation messages applied by this worker", ["index"])
+SERIALIZATION_DURATION = Histogram(
+    "serialization_duration_seconds",
+    "Time to validate documents and build the response body",
+    ["index", "operation"], buckets=CPU_BUCKETS)
+
+# Redis
+REDIS_COMMAND_DURATION = Histogram(
+    "redis_command_duration_seconds", "Wall time of Redis commands", ["command"],
+    buckets=LATENCY_BUCKETS)
+REDIS_ERRORS = Counter("redis_errors", "Failed Redis commands", ["command"])
+CACHE_PAYLOAD_SIZE = Histogram(
+    "cache_payload_bytes", "Size of cache entries read from and written to Redis",
+    ["index", "direction"], buckets=SIZE_BUCKETS)
+
+# Elasticsearch
+ES_REQUEST_DURATION = Histogram(
+    "elasticsearch_request_duration_seconds", "Wall time of Elasticsearch requests",
+    ["index", "operation"], buckets=LATENCY_BUCKETS)
+ES_TOOK = Histogram(
+    "elasticsearch_took_seconds", "Query time reported by Elasticsearch (took)",
+    ["index", "operation"], buckets=LATENCY_BUCKETS)
+ES_ERRORS = Counter(
+    "elasticsearch_errors", "Failed Elasticsearch requests", ["index", "operation"])
+ES_IN_FLIGHT = Gauge(
+    "elasticsearch_in_flight_requests", "Elasticsearch requests awaiting a response",
+    multiprocess_mode="livesum")
+
+# Snapshots of in-process component stats, updated when metrics are scraped
+# (summed over the live workers in multiprocess mode)
+LOCAL_CACHE_STATS = Gauge(
+    "local_cache", "In-process cache tier stats (size, max_size, hits, misses)",
+    ["index", "stat"], multiprocess_mode="livesum")
+REDIS_POOL_STATS = Gauge(
+    "redis_pool", "Redis connection pool (max_connections, open, in_use)", ["stat"],
+    multiprocess_mode="livesum")
+ES_POOL_STATS = Gauge(
+    "elasticsearch_pool",
+    "Elasticsearch client connections (nodes, max_connections, in_use)",
+    ["stat"], multiprocess_mode="livesum")
+ES_BATCHING_STATS = Gauge(
+    "elasticsearch_batching",
+    "get_by_id batching stats (batches, batched_items, largest_batch, pending)",
+    ["stat"], multiprocess_mode="livesum")
+
+
+def key_index(cache_key: str) -> str:
+    """Index name a cache key belongs to (its first segment)."""
+    return cache_key.partition(":")[0]
+
+
+def observe_payloads(keys: List[str], values: List[Optional[bytes]],
+                     direction: str) -> None:
+    for key, value in zip(keys, values):
+        if value:
+            CACHE_PAYLOAD_SIZE.labels(key_index(key), direction).observe(len(value))
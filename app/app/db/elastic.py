@@ -2,6 +2,8 @@ from typing import Optional
 
 from elasticsearch import AsyncElasticsearch
 
+from app.core.config import settings
+
 es: Optional[AsyncElasticsearch] = None
 
 # Функция понадобится при внедрении зависимостей
@@ -9,3 +11,30 @@ es: Optional[AsyncElasticsearch] = None
 
 async def get_elastic() -> AsyncElasticsearch:
     return es
+
+
+def create_elastic() -> AsyncElasticsearch:
+    """Client for the configured nodes, with bounded connection pools, timeouts
+    and retries."""
+    default_host = f"http://{settings.elastic_host}:{settings.elastic_port}"
+    return AsyncElasticsearch(
+        hosts=settings.elastic_hosts or [default_host],
+        connections_per_node=settings.es_connections_per_node,
+        request_timeout=settings.es_request_timeout,
+        max_retries=settings.es_max_retries,
+        retry_on_timeout=settings.es_retry_on_timeout,
+        sniff_on_start=settings.es_sniff,
+        sniff_on_node_failure=settings.es_sniff,
+        min_delay_between_sniffing=settings.es_sniff_interval,
+    )
+
+
+def pool_stats(elastic: AsyncElasticsearch, in_use: int) -> dict[str, int]:
+    """Connections of the client's node pool against the ``in_use`` requests in
+    flight; more of those than ``max_connections`` wait for a connection."""
+    nodes = len(elastic.transport.node_pool.all())
+    return {
+        "nodes": nodes,
+        "max_connections": nodes * settings.es_connections_per_node,
+        "in_use": in_use,
+    }
@@ -1,6 +1,10 @@
 from typing import Optional
 
-from redis.asyncio import Redis
+from redis.asyncio import BlockingConnectionPool, Redis
+from redis.asyncio.retry import Retry
+from redis.backoff import ExponentialBackoff
+
+from app.core.config import settings
 
 redis: Optional[Redis] = None
 
@@ -9,3 +13,44 @@ redis: Optional[Redis] = None
 
 async def get_redis() -> Redis:
     return redis
+
+
+def create_redis() -> Redis:
+    """Client with a bounded connection pool, timeouts and retries."""
+    pool = BlockingConnectionPool(
+        host=settings.redis_host,
+        port=settings.redis_port,
+        max_connections=settings.redis_max_connections,
+        timeout=settings.redis_pool_timeout,
+        socket_connect_timeout=settings.redis_connect_timeout,
+        socket_timeout=settings.redis_socket_timeout,
+        socket_keepalive=True,
+        health_check_interval=settings.redis_health_check_interval,
+        retry=Retry(ExponentialBackoff(), settings.redis_max_retries),
+        retry_on_timeout=settings.redis_max_retries > 0,
+    )
+    return Redis(connection_pool=pool)
+
+
+def pool_stats(client: Redis) -> dict[str, int]:
+    pool = client.connection_pool
+    if not isinstance(pool, BlockingConnectionPool):
+        return {}
+    return {"max_connections": pool.max_connections, **_blocking_pool_usage(pool)}
+
+
+def _blocking_pool_usage(pool: BlockingConnectionPool) -> dict[str, int]:
+    """Open and checked out connections of a blocking pool.
+
+    redis-py has no public API for them: they are read from the private
+    ``_connections`` list and ``pool`` queue (the idle connections plus a
+    placeholder for each one not opened yet) of redis-py 4.x. A pool laid out
+    differently reports nothing rather than failing the metrics scrape.
+    """
+    try:
+        return {
+            "open": len(pool._connections),
+            "in_use": pool.max_connections - pool.pool.qsize(),
+        }
+    except (AttributeError, TypeError):
+        return {}
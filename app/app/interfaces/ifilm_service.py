@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
 from typing import List, Optional
 from app.models.film import Film
+from app.services.cache_manager import Payload
+
 
 class IFilmService(ABC):
 
@@ -8,10 +10,46 @@ class IFilmService(ABC):
     async def get_by_id(self, film_id: str) -> Optional[Film]:
         pass
 
+    @abstractmethod
+    async def get_many(self, film_ids: List[str]) -> List[Optional[Film]]:
+        pass
+
     @abstractmethod
     async def search_films(self, query: str, page: int, size: int) -> List[Film]:
         pass
 
     @abstractmethod
-    async def search_films_by_field(self, field_search: str, query: str, page: int, size: int) -> List[Film]:
+    async def search_films_by_field(self, field_search: str, query: str, page: int,
+                                    size: int) -> List[Film]:
+        pass
+
+    @abstractmethod
+    async def get_by_id_raw(self, film_id: str,
+                            fields: Optional[List[str]] = None) -> Optional[Payload]:
+        pass
+
+    @abstractmethod
+    async def get_many_raw(self, film_ids: List[str]) -> List[Optional[bytes]]:
+        pass
+
+    @abstractmethod
+    async def search_films_raw(self, query: str, page: int, size: int,
+                               cursor: Optional[str] = None,
+                               fields: Optional[List[str]] = None
+                               ) -> Optional[Payload]:
+        pass
+
+    @abstractmethod
+    async def search_films_by_field_raw(self, field_search: str, query: str,
+                                        page: int, size: int,
+                                        cursor: Optional[str] = None,
+                                        fields: Optional[List[str]] = None
+                                        ) -> Optional[Payload]:
+        pass
+
+    @abstractmethod
+    async def browse_films_raw(self, genres: Optional[List[str]],
+                               types: Optional[List[str]],
+                               rating_min: Optional[float], rating_max: Optional[float],
+                               sort: Optional[str], page: int, size: int) -> Payload:
         pass
@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
 from typing import List, Optional
 from app.models.genre import Genre
+from app.services.cache_manager import Payload
+
 
 class IGenreService(ABC):
 
@@ -8,10 +10,39 @@ class IGenreService(ABC):
     async def get_by_id(self, film_id: str) -> Optional[Genre]:
         pass
 
+    @abstractmethod
+    async def get_many(self, genre_ids: List[str]) -> List[Optional[Genre]]:
+        pass
+
     @abstractmethod
     async def search_genres(self, query: str, page: int, size: int) -> List[Genre]:
         pass
 
     @abstractmethod
-    async def search_genres_by_field(self, field_search: str, query: str, page: int, size: int) -> List[Genre]:
+    async def search_genres_by_field(self, field_search: str, query: str, page: int,
+                                     size: int) -> List[Genre]:
+        pass
+
+    @abstractmethod
+    async def get_by_id_raw(self, genre_id: str,
+                            fields: Optional[List[str]] = None) -> Optional[Payload]:
+        pass
+
+    @abstractmethod
+    async def get_many_raw(self, genre_ids: List[str]) -> List[Optional[bytes]]:
+        pass
+
+    @abstractmethod
+    async def search_genres_raw(self, query: str, page: int, size: int,
+                                cursor: Optional[str] = None,
+                                fields: Optional[List[str]] = None
+                                ) -> Optional[Payload]:
+        pass
+
+    @abstractmethod
+    async def search_genres_by_field_raw(self, field_search: str, query: str,
+                                         page: int, size: int,
+                                         cursor: Optional[str] = None,
+                                         fields: Optional[List[str]] = None
+                                         ) -> Optional[Payload]:
         pass
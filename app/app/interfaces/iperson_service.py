@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
 from typing import List, Optional
 from app.models.person import Person
+from app.services.cache_manager import Payload
+
 
 class IPersonService(ABC):
 
@@ -8,10 +10,39 @@ class IPersonService(ABC):
     async def get_by_id(self, film_id: str) -> Optional[Person]:
         pass
 
+    @abstractmethod
+    async def get_many(self, person_ids: List[str]) -> List[Optional[Person]]:
+        pass
+
     @abstractmethod
     async def search_persons(self, query: str, page: int, size: int) -> List[Person]:
         pass
 
     @abstractmethod
-    async def search_persons_by_field(self, field_search: str, query: str, page: int, size: int) -> List[Person]:
+    async def search_persons_by_field(self, field_search: str, query: str, page: int,
+                                      size: int) -> List[Person]:
+        pass
+
+    @abstractmethod
+    async def get_by_id_raw(self, person_id: str,
+                            fields: Optional[List[str]] = None) -> Optional[Payload]:
+        pass
+
+    @abstractmethod
+    async def get_many_raw(self, person_ids: List[str]) -> List[Optional[bytes]]:
+        pass
+
+    @abstractmethod
+    async def search_persons_raw(self, query: str, page: int, size: int,
+                                 cursor: Optional[str] = None,
+                                 fields: Optional[List[str]] = None
+                                 ) -> Optional[Payload]:
+        pass
+
+    @abstractmethod
+    async def search_persons_by_field_raw(self, field_search: str, query: str,
+                                          page: int, size: int,
+                                          cursor: Optional[str] = None,
+                                          fields: Optional[List[str]] = None
+                                          ) -> Optional[Payload]:
         pass
@@ -1,11 +1,18 @@
-from elasticsearch import AsyncElasticsearch
+import asyncio
+import logging
+
 from fastapi import FastAPI
 from fastapi.responses import ORJSONResponse
-from redis.asyncio import Redis
+from redis.exceptions import RedisError
 
 from app.core.config import settings
 from app.db import elastic, redis
+from app.api import health, metrics
 from app.api.v1.api import api_router
+from app.services import dependencies
+from app.services.dependencies import Container
+from app.services.search_profiles import SEARCH_PROFILES
+from app.services.warmup import HotRequest, collect_hot_requests
 
 app = FastAPI(
     title=settings.project_name,
@@ -13,20 +20,77 @@ app = FastAPI(
     openapi_url="/api/openapi.json",
     default_response_class=ORJSONResponse,
 )
+app.add_middleware(metrics.MetricsMiddleware)
+warmup_tasks: set[asyncio.Task] = set()
+logger = logging.getLogger(__name__)
+
+
+async def warm_up_cache(container: Container) -> None:
+    index_services = container.services
+    # Loaded in the background, not holding back readiness: until then genres
+    # are served through the cache and suggestions come from Elasticsearch
+    for reloadable in container.reloadables:
+        reloadable.start()
+
+    async def replay(request: HotRequest):
+        return await index_services[request.index].replay(request.request)
+
+    try:
+        requests = []
+        if settings.warmup_enabled and container.hot_keys is not None:
+            requests = await collect_hot_requests(
+                container.hot_keys, index_services, settings.warmup_file,
+                settings.warmup_top_n)
+        await container.warmup.run(requests, replay)
+    except Exception as e:
+        logger.exception("Cache warm-up failed")
+        container.warmup.abort(e)
+    finally:
+        if not container.warmup.is_ready:
+            # Cancelled: don't leave /ready failing
+            container.warmup.abort(asyncio.CancelledError())
+
+
+def warmup_done(task: asyncio.Task) -> None:
+    warmup_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Cache warm-up task failed: %r", task.exception())
 
 
 @app.on_event("startup")
 async def startup():
-    redis.redis = Redis(host=settings.redis_host, port=settings.redis_port)
-    elastic.es = AsyncElasticsearch(
-        hosts=[f"http://{settings.elastic_host}:{settings.elastic_port}"]
-    )
+    redis.redis = redis.create_redis()
+    elastic.es = elastic.create_elastic()
+    container = dependencies.container = Container(redis.redis, elastic.es)
+    # Warm-up must fill the keys of the current generations. If Redis is not
+    # reachable yet, the listener loads them once subscribed; /ready waits
+    try:
+        await container.cache_invalidator.load_generations(SEARCH_PROFILES)
+    except (RedisError, OSError) as e:
+        logger.warning("Could not load the cache generations: %r", e)
+    container.cache_invalidator.start(SEARCH_PROFILES)
+    for reloadable in container.reloadables:
+        container.cache_invalidator.listeners.append(reloadable.invalidate)
+    # Runs in the background; /ready reports 503 until it is done
+    task = asyncio.create_task(warm_up_cache(container))
+    warmup_tasks.add(task)
+    task.add_done_callback(warmup_done)
 
 
 @app.on_event("shutdown")
 async def shutdown():
+    container = dependencies.container
+    for task in list(warmup_tasks):
+        task.cancel()
+    await container.cache_invalidator.stop()
+    for reloadable in container.reloadables:
+        await reloadable.stop()
     await redis.redis.close()
+    # A client given its own pool leaves it open on close
+    await redis.redis.connection_pool.disconnect()
     await elastic.es.close()
 
 
 app.include_router(api_router, prefix="/api/v1")
+app.include_router(metrics.router)
+app.include_router(health.router)
@@ -0,0 +1,9 @@
+from app.models.common import BaseOrjsonModel
+from app.models.film import Film
+
+
+class FilmBrowseResults(BaseOrjsonModel):
+    results: list[Film]
+    total: int
+    # Number of matching films by value of each facet field (genre, type)
+    facets: dict[str, dict[str, int]]
@@ -0,0 +1,10 @@
+from app.models.common import BaseOrjsonModel
+from app.models.film import Film
+from app.models.genre import Genre
+from app.models.person import Person
+
+
+class SearchResults(BaseOrjsonModel):
+    movies: list[Film] | None
+    persons: list[Person] | None
+    genres: list[Genre] | None
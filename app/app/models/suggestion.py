@@ -0,0 +1,12 @@
+from app.models.common import BaseOrjsonModel
+
+
+class Suggestion(BaseOrjsonModel):
+    id: str
+    title: str
+
+
+class Suggestions(BaseOrjsonModel):
+    movies: list[Suggestion] | None
+    persons: list[Suggestion] | None
+    genres: list[Suggestion] | None
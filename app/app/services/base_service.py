@@ -1,63 +1,582 @@
-from typing import Type, Optional, List
-from pydantic import BaseModel, parse_obj_as
+import asyncio
+import logging
+import time
+from functools import partial
+from typing import Awaitable, Callable, Type, Optional, List, Tuple
+from pydantic import BaseModel, parse_raw_as
 import orjson
-from app.services.cache_manager import CacheManager
-from app.services.elasticsearch_service import ElasticsearchService
+from app.core.config import settings
+from app.core.metrics import CACHE_FILL_ERRORS, CACHE_REQUESTS, SERIALIZATION_DURATION
+from app.services.cache_manager import CacheEntry, CacheManager, CachePipeline, Payload
+from app.services.cursor import decode_cursor, encode_cursor
+from app.services.elasticsearch_service import (
+    BrowseQuery, ElasticsearchService, SearchPage, SearchRequest)
+from app.services.search_profiles import get_search_profile, normalize_query, project
+from app.services.single_flight import SingleFlight
+from app.services.snapshot import IndexSnapshot
+from app.services.warmup import HotKeyRecorder
+
+logger = logging.getLogger(__name__)
+
+# Loaders return the final JSON response body, or None when nothing was found
+Loader = Callable[[], Awaitable[Optional[Payload]]]
+
+
+class _MultiSearch:
+    """The Elasticsearch searches of several cache fills, sent as one ``_msearch``.
+
+    Fills join while the batch is open. It is sent once closed and each joined
+    fill has either asked for its hits or finished without them (e.g. another
+    worker filled the entry meanwhile).
+    """
+
+    def __init__(self, es_service: ElasticsearchService):
+        self.es_service = es_service
+        self.requests: dict[int, SearchRequest] = {}
+        self.waiting: set[int] = set()
+        self.is_open = True
+        self.result: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._task: Optional[asyncio.Task] = None
+
+    def join(self, n: int) -> None:
+        self.waiting.add(n)
+
+    def leave(self, n: int) -> None:
+        self.waiting.discard(n)
+        self._send_when_ready()
+
+    def close(self) -> None:
+        self.is_open = False
+        self._send_when_ready()
+
+    async def search(self, n: int, request: SearchRequest) -> List[dict]:
+        if self._task is not None:
+            # Joined after the batch was sent (took over a cancelled fill)
+            return (await self.es_service.multi_search([request]))[0]
+        self.requests[n] = request
+        self.leave(n)
+        return (await asyncio.shield(self.result))[n]
+
+    def _send_when_ready(self) -> None:
+        if self.is_open or self.waiting or self._task is not None or not self.requests:
+            return
+        self._task = asyncio.create_task(self._send())
+
+    async def _send(self) -> None:
+        numbers = list(self.requests)
+        try:
+            hits = await self.es_service.multi_search(
+                [self.requests[n] for n in numbers])
+        except Exception as e:
+            self.result.set_exception(e)
+        else:
+            self.result.set_result(dict(zip(numbers, hits)))
 
 
 class BaseService:
-    def __init__(self, cache_manager: CacheManager, es_service: ElasticsearchService, index_name: str):
+    """Cached read access to one Elasticsearch index.
+
+    Cache entries hold the final JSON response bodies, validated against the
+    model once when the entry is filled. The ``*_raw`` methods return these
+    bytes as-is so the endpoints can send them without a pydantic round trip.
+
+    Unknown IDs and empty search results are cached as negative entries with
+    their own, shorter TTL so repeated misses don't reach Elasticsearch.
+    """
+
+    # Model of the index's documents, used to replay recorded requests
+    model: Type[BaseModel]
+
+    def __init__(self, cache_manager: CacheManager, es_service: ElasticsearchService,
+                 index_name: str, hot_keys: Optional[HotKeyRecorder] = None,
+                 snapshot: Optional[IndexSnapshot] = None):
         self.cache_manager = cache_manager
         self.es_service = es_service
         self.index_name = index_name
+        self.hot_keys = hot_keys
+        # When loaded, the whole index is served from memory instead (cursor
+        # pages aside)
+        self.snapshot = snapshot
+        self._single_flight = SingleFlight()
+        self._refresh_tasks: set[asyncio.Task] = set()
+
+    async def _get_by_id(self, item_id: str,
+                         model: Type[BaseModel]) -> Optional[BaseModel]:
+        payload = await self._get_by_id_raw(item_id, model)
+        return model.parse_raw(payload.body) if payload else None
+
+    async def _search(self, query: str, page: int, size: int,
+                      model: Type[BaseModel]) -> List[BaseModel]:
+        payload = await self._search_raw(query, page, size, model)
+        if not payload:
+            return []
+        return parse_raw_as(List[model], payload.body, json_loads=orjson.loads)
+
+    async def _search_field(self, field_search: str, query: str, page: int, size: int,
+                            model: Type[BaseModel]) -> List[BaseModel]:
+        payload = await self._search_field_raw(field_search, query, page, size, model)
+        if not payload:
+            return []
+        return parse_raw_as(List[model], payload.body, json_loads=orjson.loads)
+
+    async def _get_many(self, item_ids: List[str],
+                        model: Type[BaseModel]) -> List[Optional[BaseModel]]:
+        data = await self._get_many_raw(item_ids, model)
+        return [model.parse_raw(item) if item else None for item in data]
+
+    async def replay(self, request: list) -> Optional[Payload]:
+        """Serve a request recorded by the hot key recorder, filling the cache
+        (without recording it again)."""
+        kind, *args = request
+        if kind == 'detail':
+            return await self._get_by_id_raw(*args, self.model, record=False)
+        if kind == 'search':
+            return await self._search_raw(*args, self.model, record=False)
+        if kind == 'search_field':
+            return await self._search_field_raw(*args, self.model, record=False)
+        raise ValueError(f"Unknown request kind {kind!r}")
+
+    @staticmethod
+    async def search_many_raw(services: List["BaseService"], query: str, page: int,
+                              size: int) -> List[Optional[Payload]]:
+        """The search page of ``query`` from each service's index, in order.
+
+        Uses the same cache entries as each index's own search. The cached pages
+        come from one cache MGET; the missing ones are filled like any other miss
+        (one fill per key, under the cache lock), with the Elasticsearch searches
+        of those fills sent as one ``_msearch``. Snapshots are searched in memory.
+        """
+        results: List[Optional[Payload]] = [None] * len(services)
+        cached = []
+        for i, service in enumerate(services):
+            service_query = service._normalize_query(query)
+            if service._use_snapshot:
+                results[i] = service.snapshot.search(service_query, page, size)
+                continue
+            service._record('search', service_query, page, size)
+            cached.append((i, service, service_query,
+                           service._search_cache_key(service_query, page, size)))
+        if not cached:
+            return results
 
-    async def _get_by_id(self, item_id: str, model: Type[BaseModel]) -> Optional[BaseModel]:
+        cache_manager = cached[0][1].cache_manager
+        entries = await cache_manager.get_entries([key for *_, key in cached])
+        missing = []
+        for (i, service, service_query, cache_key), entry in zip(cached, entries):
+            service._count_lookup('search', entry)
+            if entry is None:
+                missing.append((i, service, service_query, cache_key))
+                continue
+            if entry.is_stale and not entry.is_negative:
+                service._refresh_in_background(cache_key, service._search_loader(
+                    service_query, page, size, service.model), entry)
+            results[i] = entry.payload
+
+        if missing:
+            batch = _MultiSearch(missing[0][1].es_service)
+            start = (page - 1) * size
+            fills = [asyncio.create_task(service._single_flight.do(cache_key, partial(
+                service._fill_from_batch, batch, n, cache_key,
+                SearchRequest(service.index_name, service_query, start, size))))
+                for n, (_, service, service_query, cache_key) in enumerate(missing)]
+            # The fills leading their key join the batch in their first step;
+            # the others await a fill already in flight
+            await asyncio.sleep(0)
+            batch.close()
+            for (i, *_), payload in zip(missing, await asyncio.gather(*fills)):
+                results[i] = payload
+        return results
+
+    def list_view(self, doc: dict, model: Optional[Type[BaseModel]] = None) -> dict:
+        """A document as shown in lists: the profile's ``list_source`` fields
+        only, leaving out the trimmed ones rather than sending them as null."""
+        source = get_search_profile(self.index_name).list_source
+        return (model or self.model)(**project(doc, source)).dict(exclude_unset=True)
+
+    @property
+    def _use_snapshot(self) -> bool:
+        return self.snapshot is not None and self.snapshot.is_loaded
+
+    async def _get_by_id_raw(self, item_id: str, model: Type[BaseModel],
+                             fields: Optional[List[str]] = None,
+                             record: bool = True) -> Optional[Payload]:
+        if self._use_snapshot:
+            return self._project_payload(self.snapshot.get(item_id), fields)
+        loader = partial(self._get_from_elastic, item_id, model, fields)
+        if fields:
+            # Versioned, as there is no single key per document to invalidate
+            cache_key = self.cache_manager.generate_cache_key(
+                self.index_name, item_id, 'fields', ','.join(fields), versioned=True)
+            return await self._get_or_load(cache_key, loader, 'detail')
+        if record:
+            self._record('detail', item_id)
         cache_key = self.cache_manager.generate_cache_key(self.index_name, item_id)
-        item = await self._get_from_cache(cache_key, model)
-        if not item:
-            item = await self._get_from_elastic(item_id, model)
-            if item:
-                await self._put_to_cache(cache_key, [item])  # Put single item in a list
-        return item
-
-    async def _search(self, query: str, page: int, size: int, model: Type[BaseModel]) -> List[BaseModel]:
-        cache_key = self.cache_manager.generate_cache_key(
-            self.index_name, 'search', query, page, size)
-        cached_results = await self._get_from_cache(cache_key, model)
-        if cached_results:
-            return cached_results
+        return await self._get_or_load(cache_key, loader, 'detail')
+
+    async def _search_raw(self, query: str, page: int, size: int,
+                          model: Type[BaseModel], cursor: Optional[str] = None,
+                          fields: Optional[List[str]] = None,
+                          record: bool = True) -> Optional[Payload]:
+        query = self._normalize_query(query)
+        if cursor:
+            return await self._search_after_raw(
+                self.es_service.custom_search_after, model, size, cursor, 'search',
+                query, fields=fields)
+        if self._use_snapshot:
+            return self._project_payload(
+                self.snapshot.search(query, page, size), fields)
+        if record and not fields:
+            self._record('search', query, page, size)
+        return await self._get_or_load(
+            self._search_cache_key(query, page, size, fields),
+            self._search_loader(query, page, size, model, fields), 'search')
+
+    def _search_cache_key(self, query: str, page: int, size: int,
+                          fields: Optional[List[str]] = None) -> str:
+        return self.cache_manager.generate_cache_key(
+            self.index_name, 'search', query, page, size, *self._fields_key(fields),
+            versioned=True)
 
+    def _search_loader(self, query: str, page: int, size: int, model: Type[BaseModel],
+                       fields: Optional[List[str]] = None) -> Loader:
         start = (page - 1) * size
-        results = await self.es_service.custom_search(self.index_name, query, start, size)
-        await self._put_to_cache(cache_key, [model(**hit) for hit in results])
-        return [model(**hit) for hit in results]
+        return partial(self._search_elastic, self.es_service.custom_search, model,
+                       query, start, size, fields=fields)
 
-    async def _search_field(self, field_search: str,
-                            query: str, page: int, size: int, model: Type[BaseModel]) -> List[BaseModel]:
+    async def _search_field_raw(self, field_search: str, query: str, page: int,
+                                size: int, model: Type[BaseModel],
+                                cursor: Optional[str] = None,
+                                fields: Optional[List[str]] = None,
+                                record: bool = True) -> Optional[Payload]:
+        query = self._normalize_query(query, field_search)
+        if cursor:
+            return await self._search_after_raw(
+                self.es_service.search_field_after, model, size, cursor, 'search_field',
+                field_search, query, fields=fields)
+        if self._use_snapshot:
+            return self._project_payload(
+                self.snapshot.search_field(field_search, query, page, size), fields)
+        if record and not fields:
+            self._record('search_field', field_search, query, page, size)
         cache_key = self.cache_manager.generate_cache_key(
-            self.index_name, 'search_field', field_search, query, page, size)
-        cached_results = await self._get_from_cache(cache_key, model)
-        if cached_results:
-            return cached_results
-
+            self.index_name, 'search_field', field_search, query, page, size,
+            *self._fields_key(fields), versioned=True)
         start = (page - 1) * size
-        results = await self.es_service.search_field(self.index_name, field_search, query, start, size)
-        await self._put_to_cache(cache_key, [model(**hit) for hit in results])
-        return [model(**hit) for hit in results]
+        return await self._get_or_load(cache_key, partial(
+            self._search_elastic, self.es_service.search_field, model, field_search,
+            query, start, size, fields=fields), 'search_field')
+
+    async def _browse_raw(self, query: BrowseQuery, page: int, size: int,
+                          model: Type[BaseModel]) -> Payload:
+        """A page of documents matching the filters, with the facet counts."""
+        cache_key = self.cache_manager.generate_cache_key(
+            self.index_name, 'browse', *query, page, size, versioned=True)
+        loader = partial(self._browse_elastic, query, (page - 1) * size, size, model)
+        return await self._get_or_load(cache_key, loader, 'browse')
+
+    async def _browse_elastic(self, query: BrowseQuery, start: int, size: int,
+                              model: Type[BaseModel]) -> Payload:
+        page = await self.es_service.browse(self.index_name, query, start, size)
+        with SERIALIZATION_DURATION.labels(self.index_name, 'browse').time():
+            return Payload(orjson.dumps({
+                "results": [self.list_view(hit, model) for hit in page.hits],
+                "total": page.total,
+                "facets": page.facets,
+            }))
+
+    def _record(self, *request) -> None:
+        if self.hot_keys is not None:
+            self.hot_keys.record(self.index_name, list(request))
+
+    @staticmethod
+    def _fields_key(fields: Optional[List[str]]) -> tuple:
+        """Cache key parts of a field projection (none without one)."""
+        return ('fields', ','.join(fields)) if fields else ()
+
+    @staticmethod
+    def _source(model: Type[BaseModel],
+                fields: Optional[List[str]]) -> Optional[List[str]]:
+        """_source includes of a field projection: the requested fields plus the
+        model's required ones, which validation needs."""
+        if not fields:
+            return None
+        required = [name for name, field in model.__fields__.items() if field.required]
+        return sorted(set(fields).union(required))
+
+    @staticmethod
+    def _dump(model: Type[BaseModel], doc: dict,
+              fields: Optional[List[str]] = None) -> dict:
+        return model(**doc).dict(include=set(fields) if fields else None)
+
+    @staticmethod
+    def _project_payload(payload: Optional[Payload],
+                         fields: Optional[List[str]]) -> Optional[Payload]:
+        """A payload of the snapshot with only the requested fields."""
+        if not payload or not fields:
+            return payload
+        value = orjson.loads(payload.body)
+        if isinstance(value, list):
+            value = [project(item, fields) for item in value]
+        else:
+            value = project(value, fields)
+        return Payload(orjson.dumps(value)).with_etag()
+
+    def _normalize_query(self, query: str, field_search: Optional[str] = None) -> str:
+        """Normalize the query for this index, unless disabled for it
+        (QUERY_NORMALIZATION) or the field search runs a term-level query."""
+        profile = get_search_profile(self.index_name)
+        if not settings.query_normalization.get(
+                self.index_name, profile.normalize_query):
+            return query
+        if field_search is not None and field_search not in profile.normalized_fields:
+            return query
+        return normalize_query(query)
+
+    async def _search_after_raw(self, search: Callable[..., Awaitable[SearchPage]],
+                                model: Type[BaseModel], size: int, cursor: str,
+                                kind: str, *args, fields: Optional[List[str]] = None
+                                ) -> Optional[Payload]:
+        """Fetch the page after ``cursor`` with ``search_after``, so deep pages cost
+        the same as the first one. The next page's cursor goes into X-Next-Cursor.
+
+        Raises InvalidCursorError for a malformed cursor.
+        """
+        position = decode_cursor(cursor)
+        loader = partial(self._search_elastic_after, search, model, *args, size,
+                         position.search_after, position.pit_id, fields=fields)
+        if settings.es_pit_keep_alive:
+            # Point-in-time pages belong to a single client's paging session
+            return await loader()
+        cache_key = self.cache_manager.generate_cache_key(
+            self.index_name, kind, *args, 'after', cursor, size,
+            *self._fields_key(fields), versioned=True)
+        return await self._get_or_load(cache_key, loader, f'{kind}_after')
+
+    async def _get_many_raw(self, item_ids: List[str],
+                            model: Type[BaseModel]) -> List[Optional[bytes]]:
+        """Fetch several items in input order (None for unknown IDs).
+
+        Cached items come from one cache MGET, the rest from one Elasticsearch
+        mget, and the fetched items are written back in a single batch.
+        """
+        if self._use_snapshot:
+            return self.snapshot.get_many(item_ids)
+        cache_keys = [self.cache_manager.generate_cache_key(self.index_name, item_id)
+                      for item_id in item_ids]
+        entries = await self.cache_manager.get_entries(cache_keys)
+        results: List[Optional[bytes]] = [None] * len(item_ids)
+        missing_ids = []
+        for i, entry in enumerate(entries):
+            self._count_lookup('get_many', entry)
+            if entry is None:
+                missing_ids.append(item_ids[i])
+                continue
+            if entry.is_negative:
+                continue
+            if entry.is_stale:
+                self._refresh_in_background(
+                    cache_keys[i], partial(self._get_from_elastic, item_ids[i], model),
+                    entry)
+            results[i] = entry.value
+
+        if missing_ids:
+            missing_ids = list(dict.fromkeys(missing_ids))
+            generation = self.cache_manager.generations.get(self.index_name, 0)
+            docs = await self.es_service.get_many(self.index_name, missing_ids)
+            with SERIALIZATION_DURATION.labels(self.index_name, 'get_many').time():
+                loaded = {
+                    item_id: Payload(orjson.dumps(model(**doc).dict())) if doc else None
+                    for item_id, doc in zip(missing_ids, docs)}
+            # As in _queue_entries: skip the write if invalidated during the load
+            if generation == self.cache_manager.generations.get(self.index_name, 0):
+                await self.cache_manager.set_entries([
+                    self._cache_entry(self.cache_manager.generate_cache_key(
+                        self.index_name, item_id), data)
+                    for item_id, data in loaded.items()
+                ])
+            for i, item_id in enumerate(item_ids):
+                if loaded.get(item_id):
+                    results[i] = loaded[item_id].body
+        return results
 
-    async def _get_from_elastic(self, item_id: str, model: Type[BaseModel]) -> Optional[BaseModel]:
-        result = await self.es_service.get_by_id(self.index_name, item_id)
+    async def _get_or_load(self, cache_key: str, loader: Loader,
+                           operation: str) -> Optional[Payload]:
+        entry = await self.cache_manager.get_entry(cache_key)
+        self._count_lookup(operation, entry)
+        if entry is not None:
+            if entry.is_stale and not entry.is_negative:
+                self._refresh_in_background(cache_key, loader, entry)
+            return entry.payload
+        # Concurrent misses on the same key share one Elasticsearch call and cache write
+        return await self._single_flight.do(
+            cache_key, partial(self._fill_cache, cache_key, loader))
+
+    async def _fill_from_batch(self, batch: _MultiSearch, n: int, cache_key: str,
+                               request: SearchRequest) -> Optional[Payload]:
+        batch.join(n)
+        try:
+            return await self._fill_cache(
+                cache_key, partial(self._load_from_batch, batch, n, request))
+        finally:
+            batch.leave(n)
+
+    async def _load_from_batch(self, batch: _MultiSearch, n: int,
+                               request: SearchRequest) -> Optional[Payload]:
+        return self._search_payload(await batch.search(n, request), self.model)
+
+    def _count_lookup(self, operation: str, entry: Optional[CacheEntry]) -> None:
+        if entry is None:
+            result = 'miss'
+        elif entry.is_negative:
+            result = 'negative'
+        else:
+            result = 'stale' if entry.is_stale else 'hit'
+        CACHE_REQUESTS.labels(self.index_name, operation, result).inc()
+
+    def _refresh_in_background(self, cache_key: str, loader: Loader,
+                               stale: CacheEntry) -> None:
+        if cache_key in self._single_flight:
+            return
+        task = asyncio.create_task(self._single_flight.do(
+            cache_key, partial(self._fill_cache, cache_key, loader, stale)))
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_done)
+
+    def _refresh_done(self, task: asyncio.Task) -> None:
+        self._refresh_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Background cache refresh failed: %r", task.exception())
+
+    async def _fill_cache(self, cache_key: str, loader: Loader,
+                          stale: Optional[CacheEntry] = None) -> Optional[Payload]:
+        if not settings.cache_lock_enabled:
+            return await self._load_to_cache(cache_key, loader, stale)
+
+        lock = self.cache_manager.lock(cache_key, settings.cache_lock_timeout)
+        async with lock as acquired:
+            if not acquired and stale is not None:
+                # Another worker is refreshing this entry; keep serving the stale value
+                return stale.payload
+            if acquired:
+                # Another worker may have filled the entry before we got the lock
+                entry = await self.cache_manager.get_entry(cache_key)
+            else:
+                entry = await self._wait_for_cache(cache_key)
+            if entry is not None and not entry.is_stale:
+                return entry.payload
+            return await self._load_to_cache(cache_key, loader, stale)
+
+    async def _wait_for_cache(self, key: str) -> Optional[CacheEntry]:
+        deadline = time.monotonic() + settings.cache_lock_wait
+        while time.monotonic() < deadline:
+            await asyncio.sleep(settings.cache_lock_poll_interval)
+            entry = await self.cache_manager.get_entry(key)
+            if entry is not None:
+                return entry
+        return None
+
+    async def _load_to_cache(self, key: str, loader: Loader,
+                             stale: Optional[CacheEntry] = None) -> Optional[Payload]:
+        generation = self.cache_manager.generations.get(self.index_name, 0)
+        try:
+            payload = await loader()
+        except Exception as e:
+            CACHE_FILL_ERRORS.labels(self.index_name).inc()
+            if stale is None:
+                raise
+            # Serve stale data until its hard TTL and back off before the next refresh
+            logger.warning("Serving stale cache entry %s: %r", key, e)
+            remaining = stale.expires_at - time.time()
+            if remaining > 1:
+                await self.cache_manager.set_entry(
+                    key, stale.value, settings.cache_refresh_backoff, remaining,
+                    stale.headers)
+            return stale.payload
+        if payload:
+            payload = payload.with_etag()
+        async with self.cache_manager.pipeline() as pipeline:
+            # Background refreshes only renew their own entry
+            self._queue_entries(pipeline, key, payload, generation,
+                                related=stale is None)
+        if payload and key in pipeline.encodings:
+            # Sent like the cache hits that follow, with the same ETags
+            payload = payload._replace(encodings=pipeline.encodings[key])
+        return payload
+
+    async def _search_elastic(self, search: Callable[..., Awaitable[List[dict]]],
+                              model: Type[BaseModel], *args,
+                              fields: Optional[List[str]] = None) -> Optional[Payload]:
+        hits = await search(self.index_name, *args, source=self._source(model, fields))
+        return self._search_payload(hits, model, fields=fields)
+
+    def _search_payload(self, hits: List[dict], model: Type[BaseModel],
+                        headers: Optional[dict[str, str]] = None,
+                        fields: Optional[List[str]] = None) -> Optional[Payload]:
+        """Response body of a search page; with ``prefetch_details`` the hits carry
+        the detail fields, and their detail views come along as related entries."""
+        if not hits:
+            return None
+        profile = get_search_profile(self.index_name)
+        with SERIALIZATION_DURATION.labels(self.index_name, 'search').time():
+            if fields:
+                body = orjson.dumps([self._dump(model, hit, fields) for hit in hits])
+                return Payload(body, headers or {})
+            body = orjson.dumps([self.list_view(hit, model) for hit in hits])
+            if not profile.prefetch_details:
+                return Payload(body, headers or {})
+            related = tuple(
+                (self.cache_manager.generate_cache_key(self.index_name, str(hit["id"])),
+                 orjson.dumps(model(**hit).dict()))
+                for hit in hits)
+        return Payload(body, headers or {}, related)
+
+    async def _search_elastic_after(self, search: Callable[..., Awaitable[SearchPage]],
+                                    model: Type[BaseModel], *args,
+                                    fields: Optional[List[str]] = None
+                                    ) -> Optional[Payload]:
+        page = await search(self.index_name, *args, source=self._source(model, fields))
+        if not page.hits:
+            return None
+        headers = {}
+        if page.search_after is not None:
+            headers["X-Next-Cursor"] = encode_cursor(page.search_after, page.pit_id)
+        return self._search_payload(page.hits, model, headers, fields)
+
+    async def _get_from_elastic(self, item_id: str, model: Type[BaseModel],
+                                fields: Optional[List[str]] = None
+                                ) -> Optional[Payload]:
+        result = await self.es_service.get_by_id(
+            self.index_name, item_id, self._source(model, fields))
         if result:
-            return model(**result)
+            with SERIALIZATION_DURATION.labels(self.index_name, 'detail').time():
+                return Payload(orjson.dumps(self._dump(model, result, fields)))
         return None
 
-    async def _get_from_cache(self, key: str, model: Type[BaseModel]) -> List[BaseModel]:
-        data = await self.cache_manager.get(key)
-        if data:
-            items = orjson.loads(data)
-            return [parse_obj_as(model, item) for item in items]
-        return []
+    def _queue_entries(self, pipeline: CachePipeline, key: str,
+                       payload: Optional[Payload], generation: int,
+                       related: bool = True) -> None:
+        """Queue the entry of ``key`` and, with ``related``, the payload's related
+        entries, if the index is still at the ``generation`` its load started in.
+
+        An invalidation during the load (which bumps the generation) may have
+        deleted the entry already; writing the payload loaded before it would
+        revive old data. Related entries are only written where absent: they
+        never replace an entry loaded by itself.
+        """
+        if generation != self.cache_manager.generations.get(self.index_name, 0):
+            return
+        pipeline.set_entry(*self._cache_entry(key, payload))
+        if not payload or not related:
+            return
+        for related_key, body in payload.related:
+            pipeline.set_entry(*self._cache_entry(related_key, Payload(body)),
+                               only_if_absent=True)
 
-    async def _put_to_cache(self, key: str, items: List[BaseModel]):
-        data = orjson.dumps([item.dict() for item in items])
-        await self.cache_manager.set(key, data)
+    def _cache_entry(self, key: str, payload: Optional[Payload]
+                     ) -> Tuple[str, bytes, float, float, Optional[dict]]:
+        if payload:
+            return (key, payload.body, settings.cache_soft_ttl, settings.cache_hard_ttl,
+                    payload.with_etag().headers)
+        # Negative entries are never served stale, so a newly indexed document
+        # shows up once the (short) negative TTL runs out
+        return key, b"", settings.cache_negative_ttl, settings.cache_negative_ttl, None
@@ -0,0 +1,126 @@
+import asyncio
+from typing import List, Optional
+
+from app.services.elasticsearch_service import (
+    BrowsePage, BrowseQuery, ElasticsearchService, SearchPage, SearchRequest)
+
+
+class BatchingElasticsearchService(ElasticsearchService):
+    """Collects ``get_by_id`` calls per index into a single ``mget``.
+
+    A batch is sent once ``max_batch_size`` distinct IDs are pending or
+    ``max_wait`` seconds after its first ID arrived, whichever comes first.
+    Concurrent lookups of the same ID share one slot in the batch.
+    """
+
+    def __init__(self, es_service: ElasticsearchService, max_batch_size: int,
+                 max_wait: float):
+        self.es_service = es_service
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.batches = 0
+        self.batched_items = 0
+        self.largest_batch = 0
+        self._pending: dict[str, dict[str, asyncio.Future]] = {}
+        self._flush_handles: dict[str, asyncio.TimerHandle] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    async def get_by_id(self, index_name: str, item_id: str,
+                        source: Optional[List[str]] = None) -> Optional[dict]:
+        if source is not None:
+            # Projected lookups are rare and can't share an mget of the detail fields
+            return await self.es_service.get_by_id(index_name, item_id, source)
+        pending = self._pending.setdefault(index_name, {})
+        future = pending.get(item_id)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            pending[item_id] = future
+            if len(pending) >= self.max_batch_size:
+                self._flush(index_name)
+            elif index_name not in self._flush_handles:
+                self._flush_handles[index_name] = asyncio.get_running_loop().call_later(
+                    self.max_wait, self._flush, index_name)
+        return await asyncio.shield(future)
+
+    async def get_many(self, index_name: str, item_ids: List[str],
+                       source: Optional[List[str]] = None) -> List[Optional[dict]]:
+        return await self.es_service.get_many(index_name, item_ids, source)
+
+    async def get_all(self, index_name: str, max_size: int,
+                      source: Optional[List[str]] = None) -> List[dict]:
+        return await self.es_service.get_all(index_name, max_size, source)
+
+    async def suggest(self, index_name: str, field: str, prefix: str,
+                      size: int) -> List[dict]:
+        return await self.es_service.suggest(index_name, field, prefix, size)
+
+    async def custom_search(self, index_name: str, query: str, start: int, size: int,
+                            source: Optional[List[str]] = None) -> List[dict]:
+        return await self.es_service.custom_search(
+            index_name, query, start, size, source)
+
+    async def search_field(
+        self, index_name: str, field_search: str, query: str, start: int, size: int,
+        source: Optional[List[str]] = None
+    ) -> List[dict]:
+        return await self.es_service.search_field(
+            index_name, field_search, query, start, size, source)
+
+    async def multi_search(self, searches: List[SearchRequest]) -> List[List[dict]]:
+        return await self.es_service.multi_search(searches)
+
+    async def browse(self, index_name: str, query: BrowseQuery, start: int,
+                     size: int) -> BrowsePage:
+        return await self.es_service.browse(index_name, query, start, size)
+
+    async def custom_search_after(
+        self, index_name: str, query: str, size: int,
+        search_after: Optional[list] = None, pit_id: Optional[str] = None,
+        source: Optional[List[str]] = None
+    ) -> SearchPage:
+        return await self.es_service.custom_search_after(
+            index_name, query, size, search_after, pit_id, source)
+
+    async def search_field_after(
+        self, index_name: str, field_search: str, query: str, size: int,
+        search_after: Optional[list] = None, pit_id: Optional[str] = None,
+        source: Optional[List[str]] = None
+    ) -> SearchPage:
+        return await self.es_service.search_field_after(
+            index_name, field_search, query, size, search_after, pit_id, source)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "batched_items": self.batched_items,
+            "largest_batch": self.largest_batch,
+            "pending": sum(len(pending) for pending in self._pending.values()),
+        }
+
+    def _flush(self, index_name: str) -> None:
+        handle = self._flush_handles.pop(index_name, None)
+        if handle is not None:
+            handle.cancel()
+        pending = self._pending.pop(index_name, None)
+        if not pending:
+            return
+        task = asyncio.create_task(self._send(index_name, pending))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, index_name: str, pending: dict[str, asyncio.Future]) -> None:
+        item_ids = list(pending)
+        self.batches += 1
+        self.batched_items += len(item_ids)
+        self.largest_batch = max(self.largest_batch, len(item_ids))
+        try:
+            docs = await self.es_service.get_many(index_name, item_ids)
+        except Exception as e:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for item_id, doc in zip(item_ids, docs):
+            future = pending[item_id]
+            if not future.done():
+                future.set_result(doc)
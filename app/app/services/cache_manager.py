@@ -1,11 +1,190 @@
+import hashlib
+import struct
+import time
 from abc import ABC, abstractmethod
-from typing import Optional
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterator, List, NamedTuple, Optional, Sequence, Tuple
 from redis.asyncio import Redis
+from redis.exceptions import LockError
 import urllib
+import orjson
+
+from app.core.metrics import REDIS_COMMAND_DURATION, REDIS_ERRORS, observe_payloads
+from app.services.codecs import DECODERS, IDENTITY, Codec
+from app.services.local_cache import LocalCache
+
+# Bumped whenever the layout of cached values changes
+ENTRY_MARKER = 0x05
+# marker, codec of the value, fresh-until and expires-at (unix time), the
+# length of the serialized response headers and the number of extra encodings
+# of the value in front of it
+ENTRY_HEADER = struct.Struct(">BBddHB")
+# Codec and length of an extra encoding
+VARIANT_HEADER = struct.Struct(">BI")
+# Leading cache key parts kept as-is, and the size (bytes) of the hash of the others
+KEY_PREFIX_PARTS = 2
+KEY_DIGEST_SIZE = 16
+# Size (bytes) of the body hash used as ETag
+ETAG_DIGEST_SIZE = 12
+
+
+class Payload(NamedTuple):
+    """A JSON response body with the extra HTTP headers to send along."""
+
+    body: bytes
+    headers: dict[str, str] = {}
+    # Bodies of other cache keys produced by the same load (e.g. the detail
+    # views of search hits), written along with this payload
+    related: Tuple[Tuple[str, bytes], ...] = ()
+    # The body as stored precompressed, by HTTP content encoding
+    encodings: dict[str, bytes] = {}
+
+    def with_etag(self) -> "Payload":
+        """The payload with an ETag header (a hash of the body), cached along
+        with it."""
+        if "ETag" in self.headers:
+            return self
+        digest = hashlib.blake2b(self.body, digest_size=ETAG_DIGEST_SIZE).hexdigest()
+        return self._replace(headers={**self.headers, "ETag": f'"{digest}"'})
+
+
+class CacheEntry(NamedTuple):
+    """Cached payload with a soft (fresh) and a hard (expiry) deadline.
+
+    An empty value is a negative entry: the item was looked up and not found.
+    ``encodings`` are the value's encodings that can be sent to HTTP clients
+    as they are: that of the value itself and any extra ones stored with it.
+    """
+
+    value: bytes
+    fresh_until: float
+    expires_at: float
+    headers: dict[str, str] = {}
+    encodings: dict[str, bytes] = {}
+
+    @property
+    def is_stale(self) -> bool:
+        return time.time() >= self.fresh_until
+
+    @property
+    def is_negative(self) -> bool:
+        return not self.value
+
+    @property
+    def payload(self) -> Optional[Payload]:
+        if not self.value:
+            return None
+        return Payload(self.value, self.headers, encodings=self.encodings)
+
+    def pack(self, codec: Codec = IDENTITY,
+             variant_codecs: Sequence[Codec] = ()) -> bytes:
+        """The entry with its value encoded by ``codec``, followed by the extra
+        encodings of ``variant_codecs`` (for HTTP clients accepting them)."""
+        return self.encode(codec, variant_codecs)[0]
+
+    def encode(self, codec: Codec = IDENTITY,
+               variant_codecs: Sequence[Codec] = ()) -> Tuple[bytes, dict[str, bytes]]:
+        """``pack`` along with the encodings it produced that HTTP clients accept
+        (what ``unpack`` would return as ``encodings``)."""
+        headers = orjson.dumps(self.headers) if self.headers else b""
+        value = codec.encode(self.value) if self.value else self.value
+        if len(value) >= len(self.value):
+            # Not worth it (or negative entry): keep the value as it is
+            codec, value = IDENTITY, self.value
+        variants = []
+        encodings = {codec.content_encoding: value} if codec.content_encoding else {}
+        for variant_codec in variant_codecs:
+            if variant_codec.id != codec.id and self.value:
+                encoded = variant_codec.encode(self.value)
+                if len(encoded) < len(self.value):
+                    variants.append(
+                        VARIANT_HEADER.pack(variant_codec.id, len(encoded)) + encoded)
+                    if variant_codec.content_encoding:
+                        encodings[variant_codec.content_encoding] = encoded
+        data = (ENTRY_HEADER.pack(ENTRY_MARKER, codec.id, self.fresh_until,
+                                  self.expires_at, len(headers), len(variants))
+                + headers + b"".join(variants) + value)
+        return data, encodings
+
+    @classmethod
+    def unpack(cls, data: bytes) -> Optional["CacheEntry"]:
+        if len(data) < ENTRY_HEADER.size or data[0] != ENTRY_MARKER:
+            # Written in another format (e.g. before an upgrade): treat as a miss
+            return None
+        (_, codec_id, fresh_until, expires_at, headers_size,
+         variant_count) = ENTRY_HEADER.unpack_from(data)
+        codec = DECODERS.get(codec_id)
+        if codec is None:
+            # Compressed with a codec that isn't installed here
+            return None
+        offset = ENTRY_HEADER.size + headers_size
+        headers = orjson.loads(data[ENTRY_HEADER.size:offset]) if headers_size else {}
+        encodings = {}
+        for _ in range(variant_count):
+            variant_id, length = VARIANT_HEADER.unpack_from(data, offset)
+            offset += VARIANT_HEADER.size
+            variant_codec = DECODERS.get(variant_id)
+            if variant_codec is not None and variant_codec.content_encoding:
+                encodings[variant_codec.content_encoding] = data[offset:offset + length]
+            offset += length
+        stored = data[offset:]
+        try:
+            value = codec.decode(stored)
+        except Exception:
+            # Corrupt value; each codec has its own error type
+            return None
+        if codec.content_encoding:
+            encodings[codec.content_encoding] = stored
+        return cls(value, fresh_until, expires_at, headers, encodings)
+
+
+# Cache key, entry and its expiry in seconds
+EntryItem = Tuple[str, CacheEntry, int]
+
+
+class CachePipeline:
+    """Cache writes queued inside an ``async with cache_manager.pipeline()`` block
+    and sent together (one round trip for Redis) when the block exits."""
+
+    def __init__(self, cache_manager: "CacheManager"):
+        self.cache_manager = cache_manager
+        self.items: List[EntryItem] = []
+        # Written only where the key doesn't exist yet
+        self.new_items: List[EntryItem] = []
+        # Once the block has exited: the HTTP encodings stored for each of
+        # ``items`` by key, as reads of the entry will return them
+        self.encodings: dict[str, dict[str, bytes]] = {}
+
+    def set_entry(self, key: str, value: bytes, fresh_for: float,
+                  expiry: Optional[float] = None,
+                  headers: Optional[dict[str, str]] = None,
+                  only_if_absent: bool = False) -> None:
+        entry, expiry = self.cache_manager._new_entry(value, fresh_for, expiry, headers)
+        (self.new_items if only_if_absent else self.items).append((key, entry, expiry))
+
+    async def __aenter__(self) -> "CachePipeline":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None and (self.items or self.new_items):
+            encodings = await self.cache_manager.mset_entries(
+                self.items, self.new_items)
+            self.encodings = {key: item_encodings for (key, _, _), item_encodings
+                              in zip(self.items, encodings)}
+
 
 class CacheManager(ABC):
-    def __init__(self, default_expiry: int = 300):  # Default expiry 5 minutes
+    def __init__(self, default_expiry: int = 300,  # Default expiry 5 minutes
+                 codec: Codec = IDENTITY, compress_min_size: int = 1024,
+                 variant_codecs: Sequence[Codec] = ()):
         self.default_expiry = default_expiry
+        # Values of at least compress_min_size bytes are stored compressed with
+        # codec, and additionally encoded with each of variant_codecs
+        self.codec = codec
+        self.compress_min_size = compress_min_size
+        self.variant_codecs = variant_codecs
+        # Generation of each index, bumped by invalidations (see CacheInvalidator)
+        self.generations: dict[str, int] = {}
 
     @abstractmethod
     async def get(self, key: str) -> Optional[str]:
@@ -15,18 +194,270 @@ class CacheManager(ABC):
     async def set(self, key: str, value: str, expiry: Optional[int] = None) -> None:
         pass
 
-    def generate_cache_key(self, *args) -> str:
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        return [await self.get(key) for key in keys]
+
+    async def mset(self, items: List[Tuple[str, bytes, Optional[int]]],
+                   new_items: Sequence[Tuple[str, bytes, Optional[int]]] = ()) -> None:
+        """Store several ``(key, value, expiry)`` items at once, and ``new_items``
+        where their key doesn't exist yet (never overwriting a newer value)."""
+        for key, value, expiry in items:
+            await self.set(key, value, expiry)
+        for key, value, expiry in new_items:
+            if await self.get(key) is None:
+                await self.set(key, value, expiry)
+
+    async def delete(self, keys: List[str]) -> None:
+        """Remove keys from the cache (and from any in-process tier)."""
+        pass
+
+    def evict_local(self, keys: List[str]) -> None:
+        """Remove keys from the in-process tier only, if there is one."""
+        pass
+
+    def pipeline(self) -> CachePipeline:
+        return CachePipeline(self)
+
+    async def get_entry(self, key: str) -> Optional[CacheEntry]:
+        data = await self.get(key)
+        if not data:
+            return None
+        return CacheEntry.unpack(data)
+
+    async def set_entry(self, key: str, value: bytes, fresh_for: float,
+                        expiry: Optional[float] = None,
+                        headers: Optional[dict[str, str]] = None) -> None:
+        """Store ``value`` as fresh for ``fresh_for`` seconds and keep it (stale)
+        until ``expiry`` seconds have passed."""
+        await self.mset_entries(
+            [(key, *self._new_entry(value, fresh_for, expiry, headers))])
+
+    async def get_entries(self, keys: List[str]) -> List[Optional[CacheEntry]]:
+        return [CacheEntry.unpack(data) if data else None
+                for data in await self.mget(keys)]
+
+    async def set_entries(self, entries: List[Tuple[str, bytes, float, Optional[float],
+                                                    Optional[dict[str, str]]]]) -> None:
+        """Store several ``(key, value, fresh_for, expiry, headers)`` entries at
+        once."""
+        await self.mset_entries(
+            [(key, *self._new_entry(value, fresh_for, expiry, headers))
+             for key, value, fresh_for, expiry, headers in entries])
+
+    async def mset_entries(self, items: List[EntryItem],
+                           new_items: Sequence[EntryItem] = ()
+                           ) -> List[dict[str, bytes]]:
+        """``mset`` for entries, packed (and compressed) here. Returns the HTTP
+        encodings stored for each of ``items``."""
+        packed = [(key, *self._encode_entry(entry), expiry)
+                  for key, entry, expiry in items]
+        await self.mset([(key, data, expiry) for key, data, _, expiry in packed],
+                        [(key, self._encode_entry(entry)[0], expiry)
+                         for key, entry, expiry in new_items])
+        return [encodings for _, _, encodings, _ in packed]
+
+    def _new_entry(self, value: bytes, fresh_for: float, expiry: Optional[float],
+                   headers: Optional[dict[str, str]] = None) -> Tuple[CacheEntry, int]:
+        expiry = expiry if expiry is not None else self.default_expiry
+        now = time.time()
+        entry = CacheEntry(value, now + min(fresh_for, expiry), now + expiry,
+                           headers or {})
+        return entry, max(1, int(expiry))
+
+    def _encode_entry(self, entry: CacheEntry) -> Tuple[bytes, dict[str, bytes]]:
+        if len(entry.value) < self.compress_min_size:
+            return entry.encode()
+        return entry.encode(self.codec, self.variant_codecs)
+
+    @asynccontextmanager
+    async def lock(self, key: str, timeout: float) -> AsyncIterator[bool]:
+        """Try to take an exclusive lock on ``key``; yields whether it was acquired.
+
+        The base implementation has nothing to coordinate with and always succeeds.
+        """
+        yield True
+
+    def generate_cache_key(self, *args, versioned: bool = False) -> str:
+        """``index:kind:digest`` for searches, ``index:id`` for single items.
+
+        The first two parts are kept readable (the local cache tier and the
+        metrics rely on the index prefix); the rest is hashed, so keys don't grow
+        with the query length. ``versioned`` keys include the generation of the
+        index, so invalidating any of its documents moves them to new keys.
+        """
         encoded_args = [urllib.parse.quote_plus(str(arg)) for arg in args]
-        return ":".join(encoded_args)
+        if versioned:
+            generation = self.generations.get(str(args[0]), 0)
+            encoded_args.insert(KEY_PREFIX_PARTS, f"g{generation}")
+        if len(encoded_args) <= KEY_PREFIX_PARTS:
+            return ":".join(encoded_args)
+        digest = hashlib.blake2b(":".join(encoded_args[KEY_PREFIX_PARTS:]).encode(),
+                                 digest_size=KEY_DIGEST_SIZE).hexdigest()
+        return ":".join(encoded_args[:KEY_PREFIX_PARTS] + [digest])
+
+
+@contextmanager
+def _redis_timer(command: str) -> Iterator[None]:
+    """Observes the command's wall time and counts it as failed on exceptions."""
+    with REDIS_COMMAND_DURATION.labels(command).time(), \
+            REDIS_ERRORS.labels(command).count_exceptions():
+        yield
+
 
 class RedisCacheManager(CacheManager):
-    def __init__(self, redis: Redis, default_expiry: int = 300):
-        super().__init__(default_expiry)
+    def __init__(self, redis: Redis, default_expiry: int = 300,
+                 codec: Codec = IDENTITY, compress_min_size: int = 1024,
+                 variant_codecs: Sequence[Codec] = ()):
+        super().__init__(default_expiry, codec, compress_min_size, variant_codecs)
         self.redis = redis
 
     async def get(self, key: str) -> Optional[str]:
-        return await self.redis.get(key)
+        with _redis_timer("get"):
+            value = await self.redis.get(key)
+        observe_payloads([key], [value], "read")
+        return value
 
     async def set(self, key: str, value: str, expiry: Optional[int] = None) -> None:
         expiry = expiry if expiry is not None else self.default_expiry
-        await self.redis.set(key, value, ex=expiry)
+        observe_payloads([key], [value], "write")
+        with _redis_timer("set"):
+            await self.redis.set(key, value, ex=expiry)
+
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        if not keys:
+            return []
+        with _redis_timer("mget"):
+            values = await self.redis.mget(keys)
+        observe_payloads(keys, values, "read")
+        return values
+
+    async def mset(self, items: List[Tuple[str, bytes, Optional[int]]],
+                   new_items: Sequence[Tuple[str, bytes, Optional[int]]] = ()) -> None:
+        if not items and not new_items:
+            return
+        written = [*items, *new_items]
+        observe_payloads([key for key, _, _ in written],
+                         [value for _, value, _ in written], "write")
+        # MSET can't set expiries, so pipeline the SETs into a single round trip
+        with _redis_timer("mset"):
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, value, expiry in items:
+                    pipe.set(key, value,
+                             ex=expiry if expiry is not None else self.default_expiry)
+                for key, value, expiry in new_items:
+                    pipe.set(key, value,
+                             ex=expiry if expiry is not None else self.default_expiry,
+                             nx=True)
+                await pipe.execute()
+
+    async def delete(self, keys: List[str]) -> None:
+        if not keys:
+            return
+        with _redis_timer("delete"):
+            await self.redis.delete(*keys)
+
+    @asynccontextmanager
+    async def lock(self, key: str, timeout: float) -> AsyncIterator[bool]:
+        redis_lock = self.redis.lock(f"lock:{key}", timeout=timeout, blocking=False)
+        acquired = await redis_lock.acquire()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                try:
+                    await redis_lock.release()
+                except LockError:
+                    # The lock expired while the value was being recomputed
+                    pass
+
+
+class TieredCacheManager(CacheManager):
+    """In-process LRU/TTL tier (L1) in front of a shared cache manager (L2).
+
+    L1 holds decoded ``CacheEntry`` objects, so hits cost no unpacking or
+    decompression; only what is sent to the backend is packed. Plain values
+    (``get``/``set``) go to the backend only. Keys start with the index name
+    (see ``generate_cache_key``), which selects the per-index L1 cache and its
+    size/TTL limits.
+    """
+
+    def __init__(self, backend: CacheManager, max_size: int, ttl: int,
+                 index_sizes: Optional[dict[str, int]] = None,
+                 index_ttls: Optional[dict[str, int]] = None):
+        super().__init__(backend.default_expiry, backend.codec,
+                         backend.compress_min_size, backend.variant_codecs)
+        self.backend = backend
+        self.max_size = max_size
+        self.ttl = ttl
+        self.index_sizes = index_sizes or {}
+        self.index_ttls = index_ttls or {}
+        self.local_caches: dict[str, LocalCache] = {}
+
+    def _local_cache(self, key: str) -> LocalCache:
+        index_name = key.split(":", 1)[0]
+        local_cache = self.local_caches.get(index_name)
+        if local_cache is None:
+            local_cache = LocalCache(self.index_sizes.get(index_name, self.max_size),
+                                     self.index_ttls.get(index_name, self.ttl))
+            self.local_caches[index_name] = local_cache
+        return local_cache
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self.backend.get(key)
+
+    async def set(self, key: str, value: str, expiry: Optional[int] = None) -> None:
+        await self.backend.set(key, value, expiry)
+
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        return await self.backend.mget(keys)
+
+    async def mset(self, items: List[Tuple[str, bytes, Optional[int]]],
+                   new_items: Sequence[Tuple[str, bytes, Optional[int]]] = ()) -> None:
+        await self.backend.mset(items, new_items)
+
+    async def get_entry(self, key: str) -> Optional[CacheEntry]:
+        return (await self.get_entries([key]))[0]
+
+    async def get_entries(self, keys: List[str]) -> List[Optional[CacheEntry]]:
+        entries = [self._local_cache(key).get(key) for key in keys]
+        missing = [i for i, entry in enumerate(entries) if entry is None]
+        if missing:
+            backend_entries = await self.backend.get_entries([keys[i] for i in missing])
+            now = time.time()
+            for i, entry in zip(missing, backend_entries):
+                if entry is not None:
+                    self._local_cache(keys[i]).set(
+                        keys[i], entry, entry.expires_at - now)
+                    entries[i] = entry
+        return entries
+
+    async def mset_entries(self, items: List[EntryItem],
+                           new_items: Sequence[EntryItem] = ()
+                           ) -> List[dict[str, bytes]]:
+        packed = [(key, *self._encode_entry(entry), expiry)
+                  for key, entry, expiry in items]
+        await self.backend.mset(
+            [(key, data, expiry) for key, data, _, expiry in packed],
+            [(key, self._encode_entry(entry)[0], expiry)
+             for key, entry, expiry in new_items])
+        # Whether new_items were written is unknown here; L1 fills on the next read
+        for (key, entry, expiry), (_, _, encodings, _) in zip(items, packed):
+            self._local_cache(key).set(key, entry._replace(encodings=encodings), expiry)
+        return [encodings for _, _, encodings, _ in packed]
+
+    async def delete(self, keys: List[str]) -> None:
+        await self.backend.delete(keys)
+        self.evict_local(keys)
+
+    def evict_local(self, keys: List[str]) -> None:
+        for key in keys:
+            self._local_cache(key).delete(key)
+
+    @asynccontextmanager
+    async def lock(self, key: str, timeout: float) -> AsyncIterator[bool]:
+        async with self.backend.lock(key, timeout) as acquired:
+            yield acquired
+
+    def stats(self) -> dict[str, dict]:
+        return {index_name: local_cache.stats()
+                for index_name, local_cache in self.local_caches.items()}
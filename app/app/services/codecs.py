@@ -0,0 +1,162 @@
+import gzip
+import logging
+import zlib
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+try:
+    import lz4.frame
+except ImportError:  # optional dependency
+    lz4 = None
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+
+class Codec:
+    """Compression of cached values. ``id`` is stored in each cache entry, so an
+    entry can be read back whatever codec is configured at the time."""
+
+    id = 0
+    name = "none"
+    # HTTP Content-Encoding of the encoded bytes, if browsers can decode them
+    content_encoding: Optional[str] = None
+
+    def encode(self, data: bytes) -> bytes:
+        return data
+
+    def decode(self, data: bytes) -> bytes:
+        return data
+
+
+class ZlibCodec(Codec):
+    id = 1
+    name = "zlib"
+    content_encoding = "deflate"
+
+    def __init__(self, level: Optional[int] = None):
+        # Fast levels give most of the gain on JSON
+        self.level = level if level is not None else 1
+
+    def encode(self, data: bytes) -> bytes:
+        return zlib.compress(data, self.level)
+
+    def decode(self, data: bytes) -> bytes:
+        return zlib.decompress(data)
+
+
+class ZstdCodec(Codec):
+    id = 2
+    name = "zstd"
+    content_encoding = "zstd"
+
+    def __init__(self, level: Optional[int] = None):
+        self.level = level if level is not None else 3
+        self._compressor = zstandard.ZstdCompressor(level=self.level)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def encode(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def decode(self, data: bytes) -> bytes:
+        return self._decompressor.decompress(data)
+
+
+class Lz4Codec(Codec):
+    id = 3
+    name = "lz4"
+
+    def __init__(self, level: Optional[int] = None):
+        self.level = level if level is not None else 0
+
+    def encode(self, data: bytes) -> bytes:
+        return lz4.frame.compress(data, compression_level=self.level)
+
+    def decode(self, data: bytes) -> bytes:
+        return lz4.frame.decompress(data)
+
+
+class GzipCodec(Codec):
+    id = 4
+    name = "gzip"
+    content_encoding = "gzip"
+
+    def __init__(self, level: Optional[int] = None):
+        self.level = level if level is not None else 1
+
+    def encode(self, data: bytes) -> bytes:
+        # No timestamp, so equal values compress to equal bytes
+        return gzip.compress(data, self.level, mtime=0)
+
+    def decode(self, data: bytes) -> bytes:
+        return gzip.decompress(data)
+
+
+class BrotliCodec(Codec):
+    id = 5
+    name = "br"
+    content_encoding = "br"
+
+    def __init__(self, level: Optional[int] = None):
+        # Brotli's quality 11 default is far too slow for cache fills
+        self.level = level if level is not None else 4
+
+    def encode(self, data: bytes) -> bytes:
+        return brotli.compress(data, mode=brotli.MODE_TEXT, quality=self.level)
+
+    def decode(self, data: bytes) -> bytes:
+        return brotli.decompress(data)
+
+
+IDENTITY = Codec()
+
+CODEC_CLASSES = {codec.name: codec
+                 for codec in (ZlibCodec, ZstdCodec, Lz4Codec, GzipCodec, BrotliCodec)}
+# Codecs producing each HTTP content encoding (e.g. deflate is zlib)
+ENCODING_CODECS = {codec.content_encoding: codec for codec in CODEC_CLASSES.values()
+                   if codec.content_encoding}
+AVAILABLE = ({"none", "zlib", "gzip"} | ({"zstd"} if zstandard else set())
+             | ({"lz4"} if lz4 else set()) | ({"br"} if brotli else set()))
+
+# Instances used to decode entries, by the codec id stored in them
+DECODERS: dict[int, Codec] = {IDENTITY.id: IDENTITY}
+for _name in AVAILABLE - {"none"}:
+    DECODERS[CODEC_CLASSES[_name].id] = CODEC_CLASSES[_name]()
+
+
+def get_codec(name: str, level: Optional[int] = None) -> Codec:
+    """Codec by name (none, zlib, gzip, zstd, lz4, br); falls back to zlib when
+    the module of an optional codec isn't installed."""
+    if name == IDENTITY.name:
+        return IDENTITY
+    if name not in CODEC_CLASSES:
+        raise ValueError(f"Unknown cache codec {name!r}")
+    if name not in AVAILABLE:
+        logger.warning("Cache codec %s is not installed, using zlib", name)
+        name = ZlibCodec.name
+    return CODEC_CLASSES[name](level)
+
+
+def get_response_codecs(encodings: List[str]) -> List[Codec]:
+    """Codecs of the extra HTTP content encodings (gzip, deflate, br, zstd) to
+    store cached values in; unknown ones and those whose package isn't installed
+    are skipped."""
+    codecs = []
+    for encoding in encodings:
+        codec = ENCODING_CODECS.get(encoding)
+        if codec is None:
+            logger.warning("Unknown response encoding %s, skipping it", encoding)
+        elif codec.name not in AVAILABLE:
+            logger.warning("Response encoding %s is not installed, skipping it",
+                           encoding)
+        else:
+            codecs.append(codec())
+    return codecs
@@ -0,0 +1,39 @@
+import base64
+import binascii
+from typing import NamedTuple, Optional
+
+import orjson
+
+# Passed as the cursor to start paging through results with cursors
+START_CURSOR = "*"
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+class Cursor(NamedTuple):
+    """Position after the last hit of a page (``search_after`` sort values)."""
+
+    search_after: Optional[list] = None
+    pit_id: Optional[str] = None
+
+
+def encode_cursor(search_after: list, pit_id: Optional[str] = None) -> str:
+    data = {"a": search_after}
+    if pit_id:
+        data["p"] = pit_id
+    return base64.urlsafe_b64encode(orjson.dumps(data)).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    if cursor == START_CURSOR:
+        return Cursor()
+    try:
+        data = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        raise InvalidCursorError("Malformed cursor")
+    if (not isinstance(data, dict) or not isinstance(data.get("a"), list)
+            or not data["a"]):
+        raise InvalidCursorError("Malformed cursor")
+    return Cursor(data["a"], data.get("p"))
@@ -1,42 +1,163 @@
-from functools import lru_cache
-from fastapi import Depends
+from typing import List, Optional
 from elasticsearch import AsyncElasticsearch
 from redis.asyncio import Redis
 
-from app.services.elasticsearch_service import AsyncElasticsearchService, ElasticsearchService
+from app.services.base_service import BaseService
+from app.services.elasticsearch_service import (
+    AsyncElasticsearchService, ElasticsearchService)
+from app.services.batching import BatchingElasticsearchService
+from app.services.federated_search import FederatedSearchService
+from app.services.filmography import FilmographyService
 from app.services.film_service import FilmService
 from app.services.genre_service import GenreService
 from app.services.person_service import PersonService
-from app.services.cache_manager import CacheManager, RedisCacheManager
-from app.db.elastic import get_elastic
-from app.db.redis import get_redis
-
-@lru_cache()
-def get_redis_cache_manager(redis: Redis = Depends(get_redis)) -> RedisCacheManager:
-    return RedisCacheManager(redis)
-
-@lru_cache()
-def get_elasticsearch_service(
-    elastic: AsyncElasticsearch = Depends(get_elastic)) -> ElasticsearchService:
-    return AsyncElasticsearchService(elastic)
-
-@lru_cache()
-def get_film_service(
-    cache_manager: CacheManager = Depends(get_redis_cache_manager),
-    es_service: ElasticsearchService = Depends(get_elasticsearch_service),
-) -> FilmService:
-    return FilmService(cache_manager, es_service)
-
-@lru_cache()
-def get_genre_service(
-    cache_manager: CacheManager = Depends(get_redis_cache_manager),
-    es_service: ElasticsearchService = Depends(get_elasticsearch_service),
-) -> GenreService:
-    return GenreService(cache_manager, es_service)
-
-@lru_cache()
-def get_person_service(
-    cache_manager: CacheManager = Depends(get_redis_cache_manager),
-    es_service: ElasticsearchService = Depends(get_elasticsearch_service),
-) -> PersonService:
-    return PersonService(cache_manager, es_service)
+from app.services.cache_manager import (
+    CacheManager, RedisCacheManager, TieredCacheManager)
+from app.services.codecs import get_codec, get_response_codecs
+from app.services.invalidation import CacheInvalidator
+from app.services.reloadable import Reloadable
+from app.services.search_profiles import SEARCH_PROFILES
+from app.services.snapshot import IndexSnapshot
+from app.services.suggest import SuggestService
+from app.services.warmup import HotKeyRecorder, Warmup
+from app.models.genre import Genre
+from app.core.config import settings
+
+
+class Container:
+    """The long-lived instances shared by all requests, created once on startup
+    (see ``main.startup``) and handed to the endpoints by the providers below.
+
+    ``redis_cache_manager`` and ``async_es_service`` replace the wrappers of
+    the network clients, e.g. with the benchmark's in-memory fakes.
+    """
+
+    def __init__(self, redis: Optional[Redis], elastic: Optional[AsyncElasticsearch],
+                 redis_cache_manager: Optional[CacheManager] = None,
+                 async_es_service: Optional[ElasticsearchService] = None,
+                 record_hot_keys: bool = True):
+        self.redis_cache_manager = redis_cache_manager or RedisCacheManager(
+            redis,
+            default_expiry=settings.cache_hard_ttl,
+            codec=get_codec(settings.cache_compression,
+                            settings.cache_compression_level),
+            compress_min_size=settings.cache_compression_min_size,
+            variant_codecs=get_response_codecs(settings.response_encodings),
+        )
+        self.cache_manager: CacheManager = self.redis_cache_manager
+        if settings.local_cache_enabled:
+            self.cache_manager = TieredCacheManager(
+                self.redis_cache_manager,
+                max_size=settings.local_cache_max_size,
+                ttl=settings.local_cache_ttl,
+                index_sizes=settings.local_cache_sizes,
+                index_ttls=settings.local_cache_ttls,
+            )
+        self.cache_invalidator = CacheInvalidator(
+            redis, self.cache_manager, settings.cache_invalidation_channel)
+        self.hot_keys: Optional[HotKeyRecorder] = None
+        if record_hot_keys:
+            self.hot_keys = HotKeyRecorder(
+                redis, sample_rate=settings.hot_keys_sample_rate,
+                max_size=settings.hot_keys_max_size, ttl=settings.hot_keys_ttl)
+        self.warmup = Warmup(concurrency=settings.warmup_concurrency,
+                             timeout=settings.warmup_timeout)
+
+        self.async_es_service = async_es_service or AsyncElasticsearchService(
+            elastic, pit_keep_alive=settings.es_pit_keep_alive,
+            operation_timeouts=settings.es_operation_timeouts)
+        self.es_service = self.async_es_service
+        if settings.es_batch_enabled:
+            self.es_service = BatchingElasticsearchService(
+                self.async_es_service,
+                max_batch_size=settings.es_batch_max_size,
+                max_wait=settings.es_batch_max_wait_ms / 1000,
+            )
+
+        self.genre_snapshot: Optional[IndexSnapshot] = None
+        if settings.genres_snapshot_enabled:
+            self.genre_snapshot = IndexSnapshot(
+                self.es_service, 'genres', Genre,
+                refresh_interval=settings.genres_snapshot_refresh,
+                max_size=settings.snapshot_max_size)
+        self.suggest_service = SuggestService(
+            self.es_service, list(SEARCH_PROFILES),
+            refresh_interval=settings.suggest_refresh,
+            max_size=settings.suggest_max_documents,
+            cache_size=settings.suggest_cache_size,
+            cache_ttl=settings.suggest_cache_ttl,
+            invalidation_delay=settings.suggest_invalidation_delay)
+
+        self.film_service = FilmService(
+            self.cache_manager, self.es_service, self.hot_keys)
+        self.genre_service = GenreService(
+            self.cache_manager, self.es_service, self.hot_keys, self.genre_snapshot)
+        self.person_service = PersonService(
+            self.cache_manager, self.es_service, self.hot_keys)
+        self.federated_search_service = FederatedSearchService(
+            [self.film_service, self.genre_service, self.person_service])
+        self.filmography_service = FilmographyService(
+            self.person_service, self.film_service)
+
+    @property
+    def services(self) -> dict[str, BaseService]:
+        return {service.index_name: service
+                for service in (self.film_service, self.genre_service,
+                                self.person_service)}
+
+    @property
+    def reloadables(self) -> List[Reloadable]:
+        """In-process indexes to load on startup and keep up to date."""
+        reloadables: List[Reloadable] = []
+        if self.genre_snapshot is not None:
+            reloadables.append(self.genre_snapshot)
+        if settings.suggest_index_enabled:
+            reloadables.extend(self.suggest_service.indexes.values())
+        return reloadables
+
+
+container: Optional[Container] = None
+
+
+def get_cache_manager() -> CacheManager:
+    return container.cache_manager
+
+
+def get_cache_invalidator() -> CacheInvalidator:
+    return container.cache_invalidator
+
+
+def get_warmup() -> Warmup:
+    return container.warmup
+
+
+def get_elasticsearch_service() -> ElasticsearchService:
+    return container.es_service
+
+
+def get_async_elasticsearch_service() -> ElasticsearchService:
+    return container.async_es_service
+
+
+def get_film_service() -> FilmService:
+    return container.film_service
+
+
+def get_genre_service() -> GenreService:
+    return container.genre_service
+
+
+def get_person_service() -> PersonService:
+    return container.person_service
+
+
+def get_suggest_service() -> SuggestService:
+    return container.suggest_service
+
+
+def get_federated_search_service() -> FederatedSearchService:
+    return container.federated_search_service
+
+
+def get_filmography_service() -> FilmographyService:
+    return container.filmography_service
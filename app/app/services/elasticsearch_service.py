@@ -1,72 +1,411 @@
+import asyncio
+import logging
+import time
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Awaitable, Iterable, List, NamedTuple, Optional, Tuple
 from elasticsearch import AsyncElasticsearch, NotFoundError
 
+from app.core.metrics import ES_ERRORS, ES_IN_FLIGHT, ES_REQUEST_DURATION, ES_TOOK
+from app.services.search_profiles import get_search_profile
+
+logger = logging.getLogger(__name__)
+
 
 NESTED_FIELDS = ["actors.name", "directors.name", "writers.name"]
+# Documents fetched per request when loading a whole index
+GET_ALL_PAGE_SIZE = 1000
+# Cursor pages are sorted by relevance with the document id as a unique tiebreaker.
+# Sorting needs doc values, so ``id`` must be mapped as a keyword field in every
+# index (a text field would fail the search)
+SEARCH_AFTER_SORT = [{"_score": "desc"}, {"id": "asc"}]
+# Values counted per facet field by browse
+FACET_SIZE = 100
+
+
+class SearchPage(NamedTuple):
+    hits: List[dict]
+    # Sort values of the last hit, None when there are no more pages
+    search_after: Optional[list] = None
+    pit_id: Optional[str] = None
+
+
+class SearchRequest(NamedTuple):
+    """One ``custom_search`` of a ``multi_search``."""
+
+    index_name: str
+    query: str
+    start: int
+    size: int
+
+
+class BrowseQuery(NamedTuple):
+    """Filters and sort of a ``browse``, in canonical form (see ``of``)."""
+
+    # Values to match (any of them) by field, e.g. (("genre", ("Comedy", "Drama")),)
+    terms: Tuple[Tuple[str, Tuple[str, ...]], ...] = ()
+    # Inclusive (field, min, max) bounds; None leaves a side open
+    ranges: Tuple[Tuple[str, Optional[float], Optional[float]], ...] = ()
+    # Sort option of the search profile, "-" prefixed for descending order
+    sort: Optional[str] = None
+
+    @classmethod
+    def of(cls, terms: dict[str, Optional[Iterable[str]]],
+           ranges: dict[str, Tuple[Optional[float], Optional[float]]],
+           sort: Optional[str] = None) -> "BrowseQuery":
+        """Equal filter sets give equal queries (and cache keys) regardless of
+        the order of fields and values; empty filters are dropped."""
+        return cls(
+            tuple((field, tuple(sorted(set(values))))
+                  for field, values in sorted(terms.items()) if values),
+            tuple((field, low, high) for field, (low, high) in sorted(ranges.items())
+                  if low is not None or high is not None),
+            sort,
+        )
+
+
+class BrowsePage(NamedTuple):
+    hits: List[dict]
+    total: int
+    # Document counts of the matching documents by value of each facet field,
+    # e.g. {"genre": {"Drama": 12}}
+    facets: dict[str, dict[str, int]]
+
+
+class MultiSearchError(Exception):
+    """A search of a ``multi_search`` failed."""
+
 
 class ElasticsearchService(ABC):
     @abstractmethod
-    async def get_by_id(self, index_name: str, item_id: str) -> Optional[dict]:
+    async def get_by_id(self, index_name: str, item_id: str,
+                        source: Optional[List[str]] = None) -> Optional[dict]:
+        """A document with the ``source`` fields (default: the profile's detail
+        fields)."""
         pass
 
+    @abstractmethod
+    async def get_many(self, index_name: str, item_ids: List[str],
+                       source: Optional[List[str]] = None) -> List[Optional[dict]]:
+        """Fetch several documents at once; missing ones are returned as None,
+        in input order."""
+        pass
 
     @abstractmethod
-    async def custom_search(self, index_name: str, query: str, start: int, size: int) -> List[dict]:
+    async def get_all(self, index_name: str, max_size: int,
+                      source: Optional[List[str]] = None) -> List[dict]:
+        """All documents of an index (at most ``max_size``), ordered by id, with
+        the ``source`` fields (default: the detail fields)."""
+        pass
+
+    @abstractmethod
+    async def suggest(self, index_name: str, field: str, prefix: str,
+                      size: int) -> List[dict]:
+        """Documents whose ``field`` starts with the words of ``prefix`` (id and
+        field only)."""
+        pass
+
+    @abstractmethod
+    async def custom_search(self, index_name: str, query: str, start: int, size: int,
+                            source: Optional[List[str]] = None) -> List[dict]:
+        """Hits with the ``source`` fields (default: the profile's search fields)."""
         pass
 
     @abstractmethod
     async def search_field(
-        self, index_name: str, field_search: str, query: str, start: int, size: int
-        ) -> List[dict]:
+        self, index_name: str, field_search: str, query: str, start: int, size: int,
+        source: Optional[List[str]] = None
+    ) -> List[dict]:
+        pass
+
+    @abstractmethod
+    async def multi_search(self, searches: List[SearchRequest]) -> List[List[dict]]:
+        """Run several ``custom_search`` calls (e.g. over different indexes) in one
+        request; raises MultiSearchError if any of them fails."""
+        pass
+
+    @abstractmethod
+    async def browse(self, index_name: str, query: BrowseQuery, start: int,
+                     size: int) -> BrowsePage:
+        """Documents matching the filters (in filter context, no scoring) in the
+        query's order, with the facet counts of all of them."""
+        pass
+
+    @abstractmethod
+    async def custom_search_after(
+        self, index_name: str, query: str, size: int,
+        search_after: Optional[list] = None, pit_id: Optional[str] = None,
+        source: Optional[List[str]] = None
+    ) -> SearchPage:
+        """Like ``custom_search``, but continues after the sort values of the
+        previous page."""
+        pass
+
+    @abstractmethod
+    async def search_field_after(
+        self, index_name: str, field_search: str, query: str, size: int,
+        search_after: Optional[list] = None, pit_id: Optional[str] = None,
+        source: Optional[List[str]] = None
+    ) -> SearchPage:
+        """Like ``search_field``, but continues after the sort values of the
+        previous page."""
         pass
 
 
 class AsyncElasticsearchService(ElasticsearchService):
-    def __init__(self, elastic: AsyncElasticsearch):
+    def __init__(self, elastic: AsyncElasticsearch,
+                 pit_keep_alive: Optional[str] = None,
+                 operation_timeouts: Optional[dict[str, float]] = None):
         self.elastic = elastic
+        # When set, cursor pagination runs over a point in time kept open this long
+        self.pit_keep_alive = pit_keep_alive
+        # Deadline of each operation (retries included), by operation name
+        self.operation_timeouts = operation_timeouts or {}
+        # Requests awaiting a response, i.e. holding or waiting for a connection
+        self.in_flight = 0
 
-
-    async def get_by_id(self, index_name: str, item_id: str) -> Optional[dict]:
+    async def get_by_id(self, index_name: str, item_id: str,
+                        source: Optional[List[str]] = None) -> Optional[dict]:
         try:
-            response = await self.elastic.get(index=index_name, id=item_id)
+            response = await self._request(index_name, "get", self.elastic.get(
+                index=index_name, id=item_id,
+                source_includes=source or get_search_profile(index_name).detail_source))
             return response["_source"]
         except NotFoundError:
             return None
 
+    async def get_many(self, index_name: str, item_ids: List[str],
+                       source: Optional[List[str]] = None) -> List[Optional[dict]]:
+        try:
+            response = await self._request(index_name, "mget", self.elastic.mget(
+                index=index_name, ids=item_ids,
+                source_includes=source or get_search_profile(index_name).detail_source))
+        except NotFoundError:
+            return [None] * len(item_ids)
+        return [doc["_source"] if doc.get("found") else None
+                for doc in response["docs"]]
+
+    async def get_all(self, index_name: str, max_size: int,
+                      source: Optional[List[str]] = None) -> List[dict]:
+        docs = []
+        search_after = None
+        while len(docs) < max_size:
+            search_query = {
+                "query": {"match_all": {}},
+                "size": min(GET_ALL_PAGE_SIZE, max_size - len(docs)),
+                "sort": [{"id": "asc"}],
+                "_source": (source or get_search_profile(index_name).detail_source
+                            or True),
+            }
+            if search_after is not None:
+                search_query["search_after"] = search_after
+            response = await self._request(
+                index_name, "get_all",
+                self.elastic.search(index=index_name, body=search_query))
+            hits = response["hits"]["hits"]
+            docs.extend(hit["_source"] for hit in hits)
+            if len(hits) < search_query["size"]:
+                break
+            search_after = hits[-1]["sort"]
+        return docs
 
-    async def custom_search(self, index_name: str, query: str, start: int, size: int) -> List[dict]:
+    async def suggest(self, index_name: str, field: str, prefix: str,
+                      size: int) -> List[dict]:
         search_query = {
-            "query": {
-                "multi_match": {
-                    "query": query,
-                    "fields": ["*"],
-                }
-            },
+            "query": {"match_phrase_prefix": {field: prefix}},
+            "size": size,
+            "_source": ["id", field],
+        }
+        response = await self._request(
+            index_name, "suggest",
+            self.elastic.search(index=index_name, body=search_query))
+        return [hit["_source"] for hit in response["hits"]["hits"]]
+
+    async def custom_search(self, index_name: str, query: str, start: int, size: int,
+                            source: Optional[List[str]] = None) -> List[dict]:
+        search_query = {
+            "query": self._multi_match_query(index_name, query),
             "from": start,
             "size": size
         }
-        response = await self.elastic.search(index=index_name, body=search_query)
+        response = await self._list_search(index_name, "search", search_query, source)
         return [hit["_source"] for hit in response["hits"]["hits"]]
 
+    async def search_field(self, index_name: str, field_search: str, query: str,
+                           start: int, size: int,
+                           source: Optional[List[str]] = None) -> List[dict]:
+        search_query = {
+            "query": self._field_query(field_search, query),
+            "from": start,
+            "size": size
+        }
+        response = await self._list_search(
+            index_name, "search_field", search_query, source)
+        return [hit["_source"] for hit in response["hits"]["hits"]]
 
-    async def search_field(self, index_name: str, field_search: str, query: str, start: int, size: int) -> List[dict]:
-        if field_search in NESTED_FIELDS:
+    async def multi_search(self, searches: List[SearchRequest]) -> List[List[dict]]:
+        lines = []
+        for search in searches:
             search_query = {
-                "query": {
-                    "nested": {
-                        "path": field_search.split(".")[0],
-                        "query": {"match": {field_search: query}},
-                    }
-                },
-                "from": start,
-                "size": size
+                "query": self._multi_match_query(search.index_name, search.query),
+                "from": search.start,
+                "size": search.size,
             }
-        else:
-            search_query = {
-                "query": {"fuzzy": {field_search: query}},
-                "from": start,
-                "size": size
+            source = get_search_profile(search.index_name).search_source
+            if source is not None:
+                search_query["_source"] = source
+            lines.extend([{"index": search.index_name}, search_query])
+        index_label = ",".join(sorted({search.index_name for search in searches}))
+        response = await self._request(
+            index_label, "msearch", self.elastic.msearch(searches=lines))
+        results = []
+        for search, result in zip(searches, response["responses"]):
+            if "error" in result:
+                ES_ERRORS.labels(search.index_name, "msearch").inc()
+                raise MultiSearchError(
+                    f"Search of {search.index_name} failed: {result['error']}")
+            results.append([hit["_source"] for hit in result["hits"]["hits"]])
+        return results
+
+    async def browse(self, index_name: str, query: BrowseQuery, start: int,
+                     size: int) -> BrowsePage:
+        profile = get_search_profile(index_name)
+        filters = [{"terms": {field: list(values)}} for field, values in query.terms]
+        for field, low, high in query.ranges:
+            bounds = {op: value for op, value in (("gte", low), ("lte", high))
+                      if value is not None}
+            filters.append({"range": {field: bounds}})
+        sort = []
+        if query.sort:
+            name = query.sort.lstrip("-")
+            order = "desc" if query.sort.startswith("-") else "asc"
+            sort.append({profile.sort_fields[name]: order})
+        sort.append({"id": "asc"})
+        search_query = {
+            "query": {"bool": {"filter": filters}},
+            "from": start,
+            "size": size,
+            "sort": sort,
+            "aggs": {field: {"terms": {"field": field, "size": FACET_SIZE}}
+                     for field in profile.facet_fields},
+        }
+        response = await self._list_search(
+            index_name, "browse", search_query, profile.list_source)
+        aggregations = response.get("aggregations", {})
+        return BrowsePage(
+            [hit["_source"] for hit in response["hits"]["hits"]],
+            response["hits"]["total"]["value"],
+            {field: {str(bucket["key"]): bucket["doc_count"]
+                     for bucket in aggregations[field]["buckets"]}
+             for field in aggregations},
+        )
+
+    async def custom_search_after(self, index_name: str, query: str, size: int,
+                                  search_after: Optional[list] = None,
+                                  pit_id: Optional[str] = None,
+                                  source: Optional[List[str]] = None) -> SearchPage:
+        return await self._search_after(
+            index_name, "search_after", self._multi_match_query(index_name, query),
+            size, search_after, pit_id, source)
+
+    async def search_field_after(self, index_name: str, field_search: str,
+                                 query: str, size: int,
+                                 search_after: Optional[list] = None,
+                                 pit_id: Optional[str] = None,
+                                 source: Optional[List[str]] = None) -> SearchPage:
+        return await self._search_after(
+            index_name, "search_field_after", self._field_query(field_search, query),
+            size, search_after, pit_id, source)
+
+    async def _search_after(self, index_name: str, operation: str, query: dict,
+                            size: int,
+                            search_after: Optional[list], pit_id: Optional[str],
+                            source: Optional[List[str]] = None) -> SearchPage:
+        if self.pit_keep_alive and search_after is None and pit_id is None:
+            response = await self._request(
+                index_name, "open_point_in_time",
+                self.elastic.open_point_in_time(
+                    index=index_name, keep_alive=self.pit_keep_alive))
+            pit_id = response["id"]
+
+        search_query = {
+            "query": query,
+            "size": size,
+            "sort": SEARCH_AFTER_SORT,
+        }
+        if search_after is not None:
+            search_query["search_after"] = search_after
+        if pit_id:
+            search_query["pit"] = {"id": pit_id,
+                                   "keep_alive": self.pit_keep_alive or "1m"}
+        response = await self._list_search(index_name, operation, search_query, source)
+
+        hits = response["hits"]["hits"]
+        next_search_after = hits[-1]["sort"] if len(hits) == size else None
+        pit_id = response.get("pit_id", pit_id)
+        if pit_id and next_search_after is None:
+            # Last page: release the point in time instead of waiting for its keep-alive
+            await self._close_point_in_time(index_name, pit_id)
+            pit_id = None
+        return SearchPage([hit["_source"] for hit in hits], next_search_after, pit_id)
+
+    async def _close_point_in_time(self, index_name: str, pit_id: str) -> None:
+        try:
+            await self._request(index_name, "close_point_in_time",
+                                self.elastic.close_point_in_time(id=pit_id))
+        except Exception as e:
+            # The page is complete either way; the point in time expires on its own
+            logger.warning("Failed to close point in time: %r", e)
+
+    async def _list_search(self, index_name: str, operation: str, search_query: dict,
+                           source: Optional[List[str]] = None):
+        """Run a search for a list view, fetching only the ``source`` fields
+        (default: the profile's search fields)."""
+        source = source or get_search_profile(index_name).search_source
+        if source is not None:
+            search_query["_source"] = source
+        # A point in time already determines the index, which must not be repeated
+        index = None if "pit" in search_query else index_name
+        return await self._request(
+            index_name, operation, self.elastic.search(index=index, body=search_query))
+
+    async def _request(self, index_name: str, operation: str, request: Awaitable):
+        """Await an Elasticsearch request within the operation's deadline, recording
+        its wall time, ``took``, failures and the requests in flight."""
+        timeout = self.operation_timeouts.get(operation)
+        ES_IN_FLIGHT.inc()
+        self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            response = await (asyncio.wait_for(request, timeout) if timeout
+                              else request)
+        except NotFoundError:
+            raise
+        except Exception:
+            ES_ERRORS.labels(index_name, operation).inc()
+            raise
+        finally:
+            ES_IN_FLIGHT.dec()
+            self.in_flight -= 1
+            ES_REQUEST_DURATION.labels(index_name, operation).observe(
+                time.perf_counter() - started)
+        if "took" in response:
+            ES_TOOK.labels(index_name, operation).observe(response["took"] / 1000)
+        return response
+
+    def _multi_match_query(self, index_name: str, query: str) -> dict:
+        return {
+            "multi_match": {
+                "query": query,
+                "fields": get_search_profile(index_name).fields,
             }
-        response = await self.elastic.search(index=index_name, body=search_query)
-        return [hit["_source"] for hit in response["hits"]["hits"]]
+        }
+
+    def _field_query(self, field_search: str, query: str) -> dict:
+        if field_search in NESTED_FIELDS:
+            return {
+                "nested": {
+                    "path": field_search.split(".")[0],
+                    "query": {"match": {field_search: query}},
+                }
+            }
+        return {"fuzzy": {field_search: query}}
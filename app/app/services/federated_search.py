@@ -0,0 +1,27 @@
+from typing import List
+
+from app.services.base_service import BaseService
+
+
+class FederatedSearchService:
+    """One search over several indexes, e.g. for the global search page.
+
+    Uses the same cache entries as each index's own search (see
+    ``BaseService.search_many_raw``): the cached pages of all indexes are
+    fetched with one cache MGET, and the missing ones with one Elasticsearch
+    ``_msearch``. Indexes served from a snapshot are searched in memory.
+    """
+
+    def __init__(self, services: List[BaseService]):
+        self.services = {service.index_name: service for service in services}
+
+    async def search_raw(self, query: str, page: int, size: int,
+                         index_names: List[str]) -> bytes:
+        """JSON object with the result page of each index (an empty list when nothing
+        matched), e.g. ``{"movies": [...], "persons": [...]}``."""
+        payloads = await BaseService.search_many_raw(
+            [self.services[index_name] for index_name in index_names],
+            query, page, size)
+        return b"{" + b",".join(
+            b'"%s":%s' % (index_name.encode(), payload.body if payload else b"[]")
+            for index_name, payload in zip(index_names, payloads)) + b"}"
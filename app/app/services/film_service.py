@@ -2,18 +2,55 @@ from typing import Optional
 from app.services.base_service import BaseService
 from app.interfaces.ifilm_service import IFilmService
 from app.models.film import Film
-from app.services.cache_manager import CacheManager
-from app.services.elasticsearch_service import ElasticsearchService
+from app.services.cache_manager import CacheManager, Payload
+from app.services.elasticsearch_service import BrowseQuery, ElasticsearchService
+from app.services.warmup import HotKeyRecorder
+
 
 class FilmService(BaseService, IFilmService):
-    def __init__(self, cache_manager: CacheManager, es_service: ElasticsearchService):
-        super().__init__(cache_manager, es_service, 'movies')
+    model = Film
+
+    def __init__(self, cache_manager: CacheManager, es_service: ElasticsearchService,
+                 hot_keys: Optional[HotKeyRecorder] = None):
+        super().__init__(cache_manager, es_service, 'movies', hot_keys)
 
     async def get_by_id(self, film_id: str) -> Optional[Film]:
         return await self._get_by_id(film_id, Film)
 
+    async def get_many(self, film_ids: list[str]) -> list[Optional[Film]]:
+        return await self._get_many(film_ids, Film)
+
     async def search_films(self, query: str, page: int, size: int) -> list[Film]:
         return await self._search(query, page, size, Film)
 
-    async def search_films_by_field(self, field_search: str, query: str, page: int, size: int) -> list[Film]:
+    async def search_films_by_field(self, field_search: str, query: str, page: int,
+                                    size: int) -> list[Film]:
         return await self._search_field(field_search, query, page, size, Film)
+
+    async def get_by_id_raw(self, film_id: str,
+                            fields: Optional[list[str]] = None) -> Optional[Payload]:
+        return await self._get_by_id_raw(film_id, Film, fields)
+
+    async def get_many_raw(self, film_ids: list[str]) -> list[Optional[bytes]]:
+        return await self._get_many_raw(film_ids, Film)
+
+    async def search_films_raw(self, query: str, page: int, size: int,
+                               cursor: Optional[str] = None,
+                               fields: Optional[list[str]] = None) -> Optional[Payload]:
+        return await self._search_raw(query, page, size, Film, cursor, fields)
+
+    async def search_films_by_field_raw(self, field_search: str, query: str,
+                                        page: int, size: int,
+                                        cursor: Optional[str] = None,
+                                        fields: Optional[list[str]] = None
+                                        ) -> Optional[Payload]:
+        return await self._search_field_raw(
+            field_search, query, page, size, Film, cursor, fields)
+
+    async def browse_films_raw(self, genres: Optional[list[str]],
+                               types: Optional[list[str]],
+                               rating_min: Optional[float], rating_max: Optional[float],
+                               sort: Optional[str], page: int, size: int) -> Payload:
+        query = BrowseQuery.of({"genre": genres, "type": types},
+                               {"imdb_rating": (rating_min, rating_max)}, sort)
+        return await self._browse_raw(query, page, size, Film)
@@ -0,0 +1,54 @@
+from functools import partial
+from typing import Optional
+
+import orjson
+
+from app.core.metrics import SERIALIZATION_DURATION
+from app.services.cache_manager import Payload
+from app.services.film_service import FilmService
+from app.services.person_service import PersonService
+from app.services.search_profiles import get_search_profile, project
+
+
+class FilmographyService:
+    """The films of a person, joined on the server instead of one request per film.
+
+    A page is built from the cached person and film detail entries: one
+    lookup of the person, then one cache MGET of the page's films (the ones
+    missing from the cache come from one Elasticsearch mget), trimmed to the
+    list view fields as they are, without validating them again. The page is
+    cached in turn, under a key versioned by the generations of both indexes,
+    so invalidating the person or any film moves it to a new key.
+    """
+
+    def __init__(self, person_service: PersonService, film_service: FilmService):
+        self.person_service = person_service
+        self.film_service = film_service
+
+    async def get_films_raw(self, person_id: str, page: int,
+                            size: int) -> Optional[Payload]:
+        """JSON list of the person's films (list view fields, in the order of
+        ``films_id``), or None when the person is unknown."""
+        cache_manager = self.person_service.cache_manager
+        cache_key = cache_manager.generate_cache_key(
+            self.person_service.index_name, 'films', person_id,
+            cache_manager.generations.get(self.film_service.index_name, 0),
+            page, size, versioned=True)
+        return await self.person_service._get_or_load(
+            cache_key, partial(self._join, person_id, page, size), 'films')
+
+    async def _join(self, person_id: str, page: int, size: int) -> Optional[Payload]:
+        person = await self.person_service.get_by_id_raw(person_id)
+        if not person:
+            return None
+        films_id = [str(film_id)
+                    for film_id in orjson.loads(person.body).get("films_id") or ()]
+        start = (page - 1) * size
+        film_ids = films_id[start:start + size]
+        bodies = await self.film_service.get_many_raw(film_ids) if film_ids else []
+        # Film entries hold validated detail views: projecting them is enough
+        source = get_search_profile(self.film_service.index_name).list_source
+        index_name = self.person_service.index_name
+        with SERIALIZATION_DURATION.labels(index_name, 'films').time():
+            films = [project(orjson.loads(body), source) for body in bodies if body]
+            return Payload(orjson.dumps(films))
@@ -2,18 +2,50 @@ from typing import Optional
 from app.interfaces.igenre_service import IGenreService
 from app.services.base_service import BaseService
 from app.models.genre import Genre
-from app.services.cache_manager import CacheManager
+from app.services.cache_manager import CacheManager, Payload
 from app.services.elasticsearch_service import ElasticsearchService
+from app.services.snapshot import IndexSnapshot
+from app.services.warmup import HotKeyRecorder
+
 
 class GenreService(BaseService, IGenreService):
-    def __init__(self, cache_manager: CacheManager, es_service: ElasticsearchService):
-        super().__init__(cache_manager, es_service, 'genres')
+    model = Genre
+
+    def __init__(self, cache_manager: CacheManager, es_service: ElasticsearchService,
+                 hot_keys: Optional[HotKeyRecorder] = None,
+                 snapshot: Optional[IndexSnapshot] = None):
+        super().__init__(cache_manager, es_service, 'genres', hot_keys, snapshot)
 
     async def get_by_id(self, genre_id: str) -> Optional[Genre]:
         return await self._get_by_id(genre_id, Genre)
 
+    async def get_many(self, genre_ids: list[str]) -> list[Optional[Genre]]:
+        return await self._get_many(genre_ids, Genre)
+
     async def search_genres(self, query: str, page: int, size: int) -> list[Genre]:
         return await self._search(query, page, size, Genre)
 
-    async def search_genres_by_field(self, field_search: str, query: str, page: int, size: int) -> list[Genre]:
-        return await self._search_field(field_search, query, page, size, Genre)
\ No newline at end of file
+    async def search_genres_by_field(self, field_search: str, query: str, page: int,
+                                     size: int) -> list[Genre]:
+        return await self._search_field(field_search, query, page, size, Genre)
+
+    async def get_by_id_raw(self, genre_id: str,
+                            fields: Optional[list[str]] = None) -> Optional[Payload]:
+        return await self._get_by_id_raw(genre_id, Genre, fields)
+
+    async def get_many_raw(self, genre_ids: list[str]) -> list[Optional[bytes]]:
+        return await self._get_many_raw(genre_ids, Genre)
+
+    async def search_genres_raw(self, query: str, page: int, size: int,
+                                cursor: Optional[str] = None,
+                                fields: Optional[list[str]] = None
+                                ) -> Optional[Payload]:
+        return await self._search_raw(query, page, size, Genre, cursor, fields)
+
+    async def search_genres_by_field_raw(self, field_search: str, query: str,
+                                         page: int, size: int,
+                                         cursor: Optional[str] = None,
+                                         fields: Optional[list[str]] = None
+                                         ) -> Optional[Payload]:
+        return await self._search_field_raw(
+            field_search, query, page, size, Genre, cursor, fields)
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+from typing import Callable, Iterable, List, Optional
+
+import orjson
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.metrics import CACHE_INVALIDATIONS
+from app.services.cache_manager import CacheManager
+
+logger = logging.getLogger(__name__)
+
+# Delay before resubscribing after the pub/sub connection failed
+RECONNECT_DELAY = 1.0
+
+
+def generation_key(index_name: str) -> str:
+    return f"generation:{index_name}"
+
+
+class CacheInvalidator:
+    """Cache invalidation of changed documents across all workers.
+
+    ``invalidate`` deletes the documents' cache entries from Redis, bumps the
+    generation of their index (which moves all its search keys, see
+    ``CacheManager.generate_cache_key``) and publishes both on a pub/sub
+    channel. Every worker listens on the channel, evicts the entries from its
+    local tier and switches to the new generation.
+
+    External loaders can publish the same message themselves after deleting
+    the keys and incrementing ``generation:<index>``:
+    ``{"index": "movies", "ids": ["..."], "generation": 42}``.
+    """
+
+    def __init__(self, redis: Redis, cache_manager: CacheManager, channel: str):
+        self.redis = redis
+        self.cache_manager = cache_manager
+        self.channel = channel
+        # Called with the index and document IDs of every applied invalidation
+        self.listeners: List[Callable[[str, List[str]], None]] = []
+        # Until the current generations are read from Redis, search keys point
+        # at generation 0, i.e. possibly at entries invalidated long ago
+        self.generations_loaded = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def invalidate(self, index_name: str, item_ids: List[str]) -> int:
+        """Invalidate the documents and all searches of an index; returns its new
+        generation."""
+        keys = [self.cache_manager.generate_cache_key(index_name, item_id)
+                for item_id in item_ids]
+        await self.cache_manager.delete(keys)
+        generation = await self.redis.incr(generation_key(index_name))
+        message = {"index": index_name, "ids": item_ids, "generation": generation}
+        await self.redis.publish(self.channel, orjson.dumps(message))
+        # Don't wait for our own message to stop serving the old generation
+        self.apply(message)
+        return generation
+
+    def apply(self, message: dict) -> None:
+        index_name = message["index"]
+        self.cache_manager.evict_local(
+            [self.cache_manager.generate_cache_key(index_name, item_id)
+             for item_id in message.get("ids", ())])
+        generation = message.get("generation")
+        if generation is not None:
+            current = self.cache_manager.generations.get(index_name, 0)
+            self.cache_manager.generations[index_name] = max(current, int(generation))
+        CACHE_INVALIDATIONS.labels(index_name).inc()
+        for listener in self.listeners:
+            listener(index_name, list(message.get("ids", ())))
+
+    async def load_generations(self, index_names: Iterable[str]) -> None:
+        index_names = list(index_names)
+        values = await self.redis.mget(
+            [generation_key(index_name) for index_name in index_names])
+        for index_name, value in zip(index_names, values):
+            if value is not None:
+                self.cache_manager.generations[index_name] = int(value)
+        self.generations_loaded = True
+
+    async def listen(self, index_names: Iterable[str]) -> None:
+        """Apply invalidations from the channel until cancelled, resubscribing
+        on errors."""
+        index_names = list(index_names)
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    # Catch up on generations bumped while not subscribed
+                    await self.load_generations(index_names)
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self._handle(message["data"])
+            except (RedisError, OSError) as e:
+                logger.warning(
+                    "Cache invalidation channel failed, resubscribing: %r", e)
+                await asyncio.sleep(RECONNECT_DELAY)
+
+    def start(self, index_names: Iterable[str]) -> None:
+        self._task = asyncio.create_task(self.listen(index_names))
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def _handle(self, data: bytes) -> None:
+        try:
+            message = orjson.loads(data)
+            self.apply(message)
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning("Ignoring malformed cache invalidation %r: %r", data, e)
@@ -2,18 +2,48 @@ from typing import Optional
 from app.interfaces.iperson_service import IPersonService
 from app.services.base_service import BaseService
 from app.models.person import Person
-from app.services.cache_manager import CacheManager
+from app.services.cache_manager import CacheManager, Payload
 from app.services.elasticsearch_service import ElasticsearchService
+from app.services.warmup import HotKeyRecorder
+
 
 class PersonService(BaseService, IPersonService):
-    def __init__(self, cache_manager: CacheManager, es_service: ElasticsearchService):
-        super().__init__(cache_manager, es_service, 'persons')
+    model = Person
+
+    def __init__(self, cache_manager: CacheManager, es_service: ElasticsearchService,
+                 hot_keys: Optional[HotKeyRecorder] = None):
+        super().__init__(cache_manager, es_service, 'persons', hot_keys)
 
     async def get_by_id(self, person_id: str) -> Optional[Person]:
         return await self._get_by_id(person_id, Person)
 
+    async def get_many(self, person_ids: list[str]) -> list[Optional[Person]]:
+        return await self._get_many(person_ids, Person)
+
     async def search_persons(self, query: str, page: int, size: int) -> list[Person]:
         return await self._search(query, page, size, Person)
 
-    async def search_persons_by_field(self, field_search: str, query: str, page: int, size: int) -> list[Person]:
+    async def search_persons_by_field(self, field_search: str, query: str, page: int,
+                                      size: int) -> list[Person]:
         return await self._search_field(field_search, query, page, size, Person)
+
+    async def get_by_id_raw(self, person_id: str,
+                            fields: Optional[list[str]] = None) -> Optional[Payload]:
+        return await self._get_by_id_raw(person_id, Person, fields)
+
+    async def get_many_raw(self, person_ids: list[str]) -> list[Optional[bytes]]:
+        return await self._get_many_raw(person_ids, Person)
+
+    async def search_persons_raw(self, query: str, page: int, size: int,
+                                 cursor: Optional[str] = None,
+                                 fields: Optional[list[str]] = None
+                                 ) -> Optional[Payload]:
+        return await self._search_raw(query, page, size, Person, cursor, fields)
+
+    async def search_persons_by_field_raw(self, field_search: str, query: str,
+                                          page: int, size: int,
+                                          cursor: Optional[str] = None,
+                                          fields: Optional[list[str]] = None
+                                          ) -> Optional[Payload]:
+        return await self._search_field_raw(
+            field_search, query, page, size, Person, cursor, fields)
@@ -0,0 +1,83 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Reloadable(ABC):
+    """In-process data derived from an index, loaded in the background on
+    ``start``, reloaded every ``refresh_interval`` seconds and updated when
+    documents of the index are invalidated.
+
+    Invalidations arriving within ``invalidation_delay`` seconds of each other
+    are applied together (see ``apply_changes``).
+    """
+
+    def __init__(self, index_name: str, refresh_interval: float,
+                 invalidation_delay: float = 0.0):
+        self.index_name = index_name
+        self.refresh_interval = refresh_interval
+        self.invalidation_delay = invalidation_delay
+        self._task: Optional[asyncio.Task] = None
+        self._invalidation_task: Optional[asyncio.Task] = None
+        # IDs invalidated since the last update, including during an update;
+        # None when an invalidation didn't name any (reload everything)
+        self._changed: Optional[set] = set()
+        self._has_changes = False
+
+    @abstractmethod
+    async def refresh(self) -> None:
+        pass
+
+    async def apply_changes(self, item_ids: List[str]) -> None:
+        """Update the data after the documents ``item_ids`` changed; reloads
+        everything unless overridden."""
+        await self.refresh()
+
+    async def refresh_safely(self) -> None:
+        """Reload, keeping the previous data if that fails."""
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.warning("Failed to reload %s from %s: %r",
+                           type(self).__name__, self.index_name, e)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._refresh_periodically())
+
+    async def stop(self) -> None:
+        for task in (self._task, self._invalidation_task):
+            if task is not None:
+                task.cancel()
+
+    def invalidate(self, index_name: str, item_ids: List[str]) -> None:
+        """Schedule an update when documents of the index have changed."""
+        if index_name != self.index_name:
+            return
+        if not item_ids:
+            self._changed = None
+        elif self._changed is not None:
+            self._changed.update(item_ids)
+        self._has_changes = True
+        if self._invalidation_task is None or self._invalidation_task.done():
+            self._invalidation_task = asyncio.create_task(self._apply_while_changed())
+
+    async def _apply_while_changed(self) -> None:
+        while self._has_changes:
+            await asyncio.sleep(self.invalidation_delay)
+            changed, self._changed, self._has_changes = self._changed, set(), False
+            try:
+                if changed is None:
+                    await self.refresh()
+                else:
+                    await self.apply_changes(sorted(changed))
+            except Exception as e:
+                logger.warning("Failed to update %s of %s: %r",
+                               type(self).__name__, self.index_name, e)
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            await self.refresh_safely()
+            await asyncio.sleep(self.refresh_interval)
@@ -0,0 +1,97 @@
+import re
+import unicodedata
+from typing import Dict, List, NamedTuple, Optional
+
+from app.core.config import settings
+
+WHITESPACE_RE = re.compile(r"\s+")
+TOKEN_RE = re.compile(r"\w+")
+
+
+class SearchProfile(NamedTuple):
+    """How an index is searched and which parts of its documents are fetched."""
+
+    # multi_match fields with boosts
+    fields: List[str]
+    # _source includes for search results (list views); None fetches everything
+    list_source: Optional[List[str]] = None
+    # _source includes for single documents (detail views); None fetches everything
+    detail_source: Optional[List[str]] = None
+    # Normalize full-text queries (see ``normalize_query``) before searching and caching
+    normalize_query: bool = True
+    # Fields whose field searches are analyzed and normalized as well; the others
+    # get term-level (fuzzy/keyword) queries, where case and spacing matter
+    normalized_fields: List[str] = []
+    # Display title offered by /suggest, and the field ranking equally good matches
+    suggest_field: Optional[str] = None
+    suggest_rank: Optional[str] = None
+    # Searches fetch the detail fields as well and cache every hit's detail
+    # view, so opening a search result is a cache hit (SEARCH_PREFETCH_DETAILS)
+    prefetch_details: bool = False
+    # Keyword fields browse can filter on and counts documents by (facets)
+    facet_fields: List[str] = []
+    # Sort options of browse by name, and the (sortable) fields they sort on
+    sort_fields: Dict[str, str] = {}
+
+    @property
+    def search_source(self) -> Optional[List[str]]:
+        """_source includes of searches."""
+        return self.detail_source if self.prefetch_details else self.list_source
+
+
+DEFAULT_PROFILE = SearchProfile(fields=["*"])
+
+SEARCH_PROFILES = {
+    "movies": SearchProfile(
+        fields=["title^3", "genre^2", "description"],
+        list_source=["id", "title", "imdb_rating", "genre", "type"],
+        detail_source=["id", "title", "imdb_rating", "genre", "description", "type",
+                       "actors", "directors", "writers"],
+        normalized_fields=["actors.name", "directors.name", "writers.name"],
+        suggest_field="title",
+        suggest_rank="imdb_rating",
+        facet_fields=["genre", "type"],
+        sort_fields={"imdb_rating": "imdb_rating", "title": "title.raw"},
+        prefetch_details="movies" in settings.search_prefetch_details,
+    ),
+    "persons": SearchProfile(
+        fields=["full_name"],
+        list_source=["id", "full_name", "role"],
+        detail_source=["id", "full_name", "role", "films_id"],
+        suggest_field="full_name",
+        prefetch_details="persons" in settings.search_prefetch_details,
+    ),
+    "genres": SearchProfile(
+        fields=["name^3", "description"],
+        list_source=["id", "name", "description"],
+        detail_source=["id", "name", "description"],
+        suggest_field="name",
+        prefetch_details="genres" in settings.search_prefetch_details,
+    ),
+}
+
+
+def get_search_profile(index_name: str) -> SearchProfile:
+    return SEARCH_PROFILES.get(index_name, DEFAULT_PROFILE)
+
+
+def normalize_query(query: str) -> str:
+    """Canonical form of a full-text query, so that e.g. "Star Wars" and
+    " star  wars " share one cache entry and one Elasticsearch query.
+
+    NFKC folds compatibility characters (full-width letters, ligatures,
+    non-breaking spaces). Lowercasing follows the analyzer's lowercase filter;
+    ``str.casefold`` would also rewrite letters like "ß" that the index keeps.
+    """
+    query = unicodedata.normalize("NFKC", query).lower()
+    return WHITESPACE_RE.sub(" ", query).strip()
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Words of a normalized text, roughly as the standard analyzer splits them."""
+    return TOKEN_RE.findall(normalize_query(text)) if text else []
+
+
+def project(doc: dict, source: Optional[List[str]]) -> dict:
+    """The ``source`` fields of a document, as Elasticsearch's _source includes."""
+    return {field: doc[field] for field in source if field in doc} if source else doc
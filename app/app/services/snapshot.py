@@ -0,0 +1,150 @@
+import logging
+from collections import defaultdict
+from typing import List, NamedTuple, Optional, Type
+
+import orjson
+from pydantic import BaseModel
+
+from app.services.cache_manager import Payload
+from app.services.elasticsearch_service import ElasticsearchService
+from app.services.reloadable import Reloadable
+from app.services.search_profiles import get_search_profile, normalize_query, tokenize
+
+logger = logging.getLogger(__name__)
+
+
+def fuzziness(term: str) -> int:
+    """Allowed edits for a term, as Elasticsearch's ``fuzziness: AUTO``."""
+    return 0 if len(term) <= 2 else 1 if len(term) <= 5 else 2
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance of ``a`` and ``b``, or ``limit + 1`` once it exceeds
+    ``limit``."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class Snapshot(NamedTuple):
+    # Response body of each document, by id, in id order
+    bodies: dict[str, bytes]
+    # Detail payload (with its ETag) of each document, by id
+    details: dict[str, Payload]
+    # Tokens of each (field, document id), for search
+    tokens: dict[tuple[str, str], List[str]]
+    # Documents by token, per field
+    inverted: dict[str, dict[str, set]]
+
+
+class IndexSnapshot(Reloadable):
+    """A small index held entirely in process memory.
+
+    Details, searches and field searches are answered from the snapshot
+    without any network I/O. Searches approximate the Elasticsearch queries:
+    query tokens are matched against the search profile fields (with their
+    boosts, the last token also as a prefix), and field searches match
+    tokens within the ``fuzziness: AUTO`` edit distance.
+
+    The snapshot is reloaded every ``refresh_interval`` seconds and when
+    documents of the index are invalidated (see ``Reloadable``).
+    """
+
+    def __init__(self, es_service: ElasticsearchService, index_name: str,
+                 model: Type[BaseModel], refresh_interval: float, max_size: int):
+        super().__init__(index_name, refresh_interval)
+        self.es_service = es_service
+        self.model = model
+        self.max_size = max_size
+        self._snapshot: Optional[Snapshot] = None
+        # multi_match fields and their boosts
+        self._fields = {}
+        for field in get_search_profile(index_name).fields:
+            name, _, boost = field.partition("^")
+            self._fields[name] = float(boost or 1)
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._snapshot is not None
+
+    async def refresh(self) -> None:
+        docs = await self.es_service.get_all(self.index_name, self.max_size)
+        if len(docs) >= self.max_size:
+            logger.warning("Snapshot of %s is truncated at %d documents",
+                           self.index_name, self.max_size)
+        bodies, tokens = {}, {}
+        inverted: dict[str, dict[str, set]] = defaultdict(lambda: defaultdict(set))
+        for doc in docs:
+            item = self.model(**doc).dict()
+            item_id = str(item["id"])
+            bodies[item_id] = orjson.dumps(item)
+            for field, value in item.items():
+                if isinstance(value, str) and field != "id":
+                    tokens[field, item_id] = tokenize(value)
+                    for token in tokens[field, item_id]:
+                        inverted[field][token].add(item_id)
+        details = {item_id: Payload(body).with_etag()
+                   for item_id, body in bodies.items()}
+        self._snapshot = Snapshot(bodies, details, tokens, inverted)
+        logger.info("Loaded a snapshot of %d %s", len(bodies), self.index_name)
+
+    def get(self, item_id: str) -> Optional[Payload]:
+        return self._snapshot.details.get(item_id)
+
+    def get_many(self, item_ids: List[str]) -> List[Optional[bytes]]:
+        return [self._snapshot.bodies.get(item_id) for item_id in item_ids]
+
+    def search(self, query: str, page: int, size: int) -> Optional[Payload]:
+        query_tokens = tokenize(query)
+        scores: dict[str, float] = defaultdict(float)
+        for field, boost in self._fields.items():
+            inverted = self._snapshot.inverted.get(field, {})
+            for i, query_token in enumerate(query_tokens):
+                for item_id in inverted.get(query_token, ()):
+                    scores[item_id] += boost
+                if i == len(query_tokens) - 1:
+                    # Typeahead: the last token may be unfinished
+                    for token, item_ids in inverted.items():
+                        if token != query_token and token.startswith(query_token):
+                            for item_id in item_ids:
+                                scores[item_id] += boost / 2
+        return self._page(scores, page, size)
+
+    def search_field(self, field_search: str, query: str, page: int,
+                     size: int) -> Optional[Payload]:
+        query = normalize_query(query)
+        limit = fuzziness(query)
+        scores: dict[str, float] = {}
+        for item_id in self._snapshot.bodies:
+            best = 0.0
+            for token in self._snapshot.tokens.get((field_search, item_id), ()):
+                if token == query:
+                    best = max(best, 2.0)
+                elif token.startswith(query):
+                    best = max(best, 1.5)
+                else:
+                    distance = edit_distance(query, token, limit)
+                    if distance <= limit:
+                        best = max(best, 1 / (1 + distance))
+            if best:
+                scores[item_id] = best
+        return self._page(scores, page, size)
+
+    def _page(self, scores: dict[str, float], page: int,
+              size: int) -> Optional[Payload]:
+        ranked = sorted(scores, key=lambda item_id: (-scores[item_id], item_id))
+        start = (page - 1) * size
+        bodies = [self._snapshot.bodies[item_id]
+                  for item_id in ranked[start:start + size]]
+        if not bodies:
+            return None
+        return Payload(b"[" + b",".join(bodies) + b"]").with_etag()
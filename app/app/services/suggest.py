@@ -0,0 +1,198 @@
+import asyncio
+import heapq
+import logging
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Iterable, List, NamedTuple, Optional
+
+import orjson
+
+from app.services.elasticsearch_service import ElasticsearchService
+from app.services.local_cache import LocalCache
+from app.services.reloadable import Reloadable
+from app.services.search_profiles import get_search_profile, normalize_query, tokenize
+
+logger = logging.getLogger(__name__)
+
+# Sorts after every character a term can continue with
+PREFIX_END = "\U0010ffff"
+# Query words up to this long are looked up in precomputed posting lists
+SHORT_PREFIX = 2
+# Candidates a lookup examines at most: queries of several short words can
+# otherwise scan most of the index (rarer matches beyond are not suggested)
+MAX_CANDIDATES = 500
+
+
+class Suggestion(NamedTuple):
+    id: str
+    title: str
+
+
+class PrefixIndex:
+    """Titles of one index for prefix lookups.
+
+    Documents are numbered best first (by rank, then shorter titles) and the
+    posting list of every word holds those numbers in order, so a lookup can
+    stop as soon as it has found ``size`` titles starting with the query.
+    """
+
+    def __init__(self, docs: List[dict], field: str, rank_field: Optional[str] = None):
+        docs = sorted(docs, key=lambda doc: (
+            -float(doc.get(rank_field) or 0) if rank_field else 0,
+            len(doc.get(field) or ""), str(doc["id"])))
+        self.ids = [str(doc["id"]) for doc in docs]
+        self.titles = [doc.get(field) or "" for doc in docs]
+        self.normalized = [normalize_query(title) for title in self.titles]
+        self.words = [tokenize(title) for title in self.titles]
+        # " word word ...": a word starts with q where " q" occurs
+        self._word_text = [" " + " ".join(words) for words in self.words]
+        postings: dict[str, List[int]] = defaultdict(list)
+        # Short prefixes match many words; their merged posting lists are kept
+        short: dict[str, List[int]] = defaultdict(list)
+        for position, words in enumerate(self.words):
+            for word in set(words):
+                postings[word].append(position)
+            for prefix in {word[:length] for word in words
+                           for length in range(1, SHORT_PREFIX + 1)}:
+                short[prefix].append(position)
+        self._terms = sorted(postings)
+        self._postings = [postings[term] for term in self._terms]
+        self._short = dict(short)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def lookup(self, query: str, size: int) -> List[Suggestion]:
+        """Titles with a word starting with each word of ``query``: those starting
+        with the whole query first, best first."""
+        query = normalize_query(query)
+        query_words = tokenize(query)
+        if not query_words:
+            return []
+        starts = [" " + word for word in query_words]
+        first, rest = [], []
+        previous = None
+        scanned = 0
+        for position in self._candidates(max(query_words, key=len)):
+            if position == previous:
+                continue
+            previous = position
+            scanned += 1
+            if scanned > MAX_CANDIDATES:
+                break
+            if len(query_words) > 1:
+                word_text = self._word_text[position]
+                if not all(word in word_text for word in starts):
+                    continue
+            if self.normalized[position].startswith(query):
+                first.append(position)
+                if len(first) == size:
+                    break
+            elif len(rest) < size:
+                rest.append(position)
+        return [Suggestion(self.ids[position], self.titles[position])
+                for position in (first + rest)[:size]]
+
+    def _candidates(self, prefix: str) -> Iterable[int]:
+        """Documents with a word starting with ``prefix``, in order (possibly
+        repeated)."""
+        if len(prefix) <= SHORT_PREFIX:
+            return self._short.get(prefix, ())
+        start = bisect_left(self._terms, prefix)
+        end = bisect_left(self._terms, prefix + PREFIX_END, start)
+        return heapq.merge(*self._postings[start:end])
+
+
+class SuggestIndex(Reloadable):
+    """The prefix index of one Elasticsearch index, kept up to date.
+
+    Invalidated documents are fetched by ID and the index is rebuilt from the
+    documents held in memory; builds run in a worker thread, off the event loop.
+    """
+
+    def __init__(self, es_service: ElasticsearchService, index_name: str,
+                 refresh_interval: float, max_size: int,
+                 invalidation_delay: float = 0.0):
+        super().__init__(index_name, refresh_interval, invalidation_delay)
+        self.es_service = es_service
+        self.max_size = max_size
+        profile = get_search_profile(index_name)
+        self.field = profile.suggest_field
+        self.rank_field = profile.suggest_rank
+        self.source = ["id", self.field] + (
+            [self.rank_field] if self.rank_field else [])
+        self.prefix_index: Optional[PrefixIndex] = None
+        # Bumped on every rebuild; part of the cache keys of suggestions
+        self.version = 0
+        self._docs: Optional[dict[str, dict]] = None
+
+    async def refresh(self) -> None:
+        docs = await self.es_service.get_all(
+            self.index_name, self.max_size, self.source)
+        if len(docs) >= self.max_size:
+            logger.warning("Suggestions of %s are truncated at %d documents",
+                           self.index_name, self.max_size)
+        self._docs = {str(doc["id"]): doc for doc in docs}
+        await self._rebuild()
+
+    async def apply_changes(self, item_ids: List[str]) -> None:
+        if self._docs is None:
+            # Not loaded yet: the pending load reads the current documents
+            return
+        docs = await self.es_service.get_many(self.index_name, item_ids, self.source)
+        for item_id, doc in zip(item_ids, docs):
+            if doc is None:
+                self._docs.pop(item_id, None)
+            else:
+                self._docs[item_id] = doc
+        await self._rebuild()
+
+    async def _rebuild(self) -> None:
+        docs = list(self._docs.values())
+        self.prefix_index = await asyncio.to_thread(
+            PrefixIndex, docs, self.field, self.rank_field)
+        self.version += 1
+
+
+class SuggestService:
+    """Title suggestions for a search box, per index.
+
+    Answered from in-process prefix indexes once they are loaded, and with a
+    ``match_phrase_prefix`` query until then. Responses are cached by
+    normalized query for ``cache_ttl`` seconds (and until an index reloads).
+    """
+
+    def __init__(self, es_service: ElasticsearchService, index_names: List[str],
+                 refresh_interval: float, max_size: int, cache_size: int,
+                 cache_ttl: float, invalidation_delay: float = 0.0):
+        self.es_service = es_service
+        self.indexes = {
+            index_name: SuggestIndex(es_service, index_name, refresh_interval, max_size,
+                                     invalidation_delay)
+            for index_name in index_names}
+        self._cache = LocalCache(cache_size, cache_ttl)
+
+    async def suggest(self, query: str, index_names: List[str], size: int) -> bytes:
+        """JSON object with the suggestions of each index, e.g.
+        ``{"movies": [{"id": ..., "title": ...}], ...}``."""
+        query = normalize_query(query)
+        indexes = [self.indexes[index_name] for index_name in index_names]
+        cache_key = ":".join([str(size), query] + [f"{index.index_name}.{index.version}"
+                                                   for index in indexes])
+        body = self._cache.get(cache_key)
+        if body is not None:
+            return body
+        result = {}
+        for index in indexes:
+            if index.prefix_index is not None:
+                suggestions = index.prefix_index.lookup(query, size)
+            else:
+                docs = await self.es_service.suggest(
+                    index.index_name, index.field, query, size)
+                suggestions = [Suggestion(str(doc["id"]), doc.get(index.field) or "")
+                               for doc in docs]
+            result[index.index_name] = [suggestion._asdict()
+                                        for suggestion in suggestions]
+        body = orjson.dumps(result)
+        self._cache.set(cache_key, body)
+        return body
@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Awaitable, Callable, Iterable, List, NamedTuple, Optional
+
+import orjson
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+
+class HotRequest(NamedTuple):
+    """A cacheable service call: ``["detail", id]``, ``["search", query, page, size]``
+    or ``["search_field", field, query, page, size]`` against an index."""
+
+    index: str
+    request: list
+
+
+def hot_key(index_name: str) -> str:
+    return f"hot:{index_name}"
+
+
+class HotKeyRecorder:
+    """Counts a sample of the requests served per index in a Redis sorted set,
+    so the next deploy can warm the cache with the most requested ones."""
+
+    def __init__(self, redis: Redis, sample_rate: float, max_size: int, ttl: int):
+        self.redis = redis
+        self.sample_rate = sample_rate
+        self.max_size = max_size
+        self.ttl = ttl
+        self._tasks: set[asyncio.Task] = set()
+
+    def record(self, index_name: str, request: list) -> None:
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return
+        # Off the request path: a slow or failing Redis only loses samples
+        task = asyncio.create_task(self._record(index_name, orjson.dumps(request)))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _record(self, index_name: str, member: bytes) -> None:
+        key = hot_key(index_name)
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.zincrby(key, 1, member)
+                # Keep only the top max_size requests and forget an index's
+                # counts once it hasn't been requested for ttl seconds
+                pipe.zremrangebyrank(key, 0, -self.max_size - 1)
+                pipe.expire(key, self.ttl)
+                await pipe.execute()
+        except RedisError as e:
+            logger.debug("Failed to record hot request: %r", e)
+
+    async def top(self, index_names: Iterable[str], limit: int) -> List[HotRequest]:
+        """The ``limit`` most requested requests of each index, most requested first."""
+        requests = []
+        for index_name in index_names:
+            members = await self.redis.zrevrange(hot_key(index_name), 0, limit - 1)
+            requests.extend(HotRequest(index_name, orjson.loads(member))
+                            for member in members)
+        return requests
+
+
+def read_hot_requests(path: str, limit: int) -> List[HotRequest]:
+    """Read up to ``limit`` requests per index from a JSON lines file of
+    ``{"index": "movies", "request": ["detail", "<id>"]}`` objects."""
+    requests = []
+    counts: dict[str, int] = {}
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            data = orjson.loads(line)
+            index_name = data["index"]
+            if counts.get(index_name, 0) < limit:
+                counts[index_name] = counts.get(index_name, 0) + 1
+                requests.append(HotRequest(index_name, data["request"]))
+    return requests
+
+
+async def collect_hot_requests(hot_keys: HotKeyRecorder, index_names: Iterable[str],
+                               path: Optional[str], limit: int) -> List[HotRequest]:
+    """Hot requests from the file at ``path`` (if any) followed by the recorded
+    ones, without duplicates. An unavailable source is skipped."""
+    index_names = list(index_names)
+    requests = []
+    if path:
+        try:
+            requests.extend(read_hot_requests(path, limit))
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Can't read warm-up requests from %s: %r", path, e)
+    try:
+        requests.extend(await hot_keys.top(index_names, limit))
+    except RedisError as e:
+        logger.warning("Can't read recorded hot requests: %r", e)
+    unique: dict[bytes, HotRequest] = {}
+    for request in requests:
+        unique.setdefault(orjson.dumps([request.index, request.request]), request)
+    return list(unique.values())
+
+
+class Warmup:
+    """Progress of replaying hot requests into the cache before taking traffic."""
+
+    def __init__(self, concurrency: int, timeout: float):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.state = "pending"
+        self.total = 0
+        self.completed = 0
+        self.failed = 0
+        self.duration: Optional[float] = None
+        # Why warm-up stopped early, if it did
+        self.error: Optional[str] = None
+
+    @property
+    def is_ready(self) -> bool:
+        return self.state == "done"
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "total": self.total,
+            "completed": self.completed,
+            "failed": self.failed,
+            "duration": self.duration,
+            "error": self.error,
+        }
+
+    def abort(self, error: BaseException) -> None:
+        """Give up warming up (e.g. the hot requests couldn't be read): the
+        instance takes traffic with whatever is cached."""
+        self.error = repr(error)
+        self.state = "done"
+
+    async def run(self, requests: List[HotRequest],
+                  replay: Callable[[HotRequest], Awaitable[object]]) -> None:
+        """Replay ``requests`` with at most ``concurrency`` in flight. The instance
+        reports ready when done, or after ``timeout`` seconds whatever is left."""
+        self.state = "running"
+        self.total = len(requests)
+        started = time.monotonic()
+        queue = iter(requests)
+
+        async def worker():
+            for request in queue:
+                try:
+                    await replay(request)
+                    self.completed += 1
+                except Exception as e:
+                    self.failed += 1
+                    logger.debug("Warm-up of %s failed: %r", request, e)
+
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(worker() for _ in range(self.concurrency))),
+                self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Cache warm-up timed out after %d of %d requests",
+                           self.completed + self.failed, self.total)
+        self.duration = time.monotonic() - started
+        self.state = "done"
+        logger.info("Cache warm-up done: %d requests, %d failed, %.1fs",
+                    self.completed, self.failed, self.duration)
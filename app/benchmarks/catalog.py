@@ -0,0 +1,81 @@
+import random
+import uuid
+from typing import NamedTuple
+
+GENRE_NAMES = [
+    "Action", "Adventure", "Animation", "Biography", "Comedy", "Crime", "Documentary",
+    "Drama", "Family", "Fantasy", "History", "Horror", "Music", "Musical", "Mystery",
+    "News", "Romance", "Sci-Fi", "Short", "Sport", "Thriller", "War", "Western",
+    "Боевик", "Комедия", "Драма",
+]
+
+# Title and name vocabulary, mixing Latin and Cyrillic like the real catalog
+TITLE_WORDS = [
+    "star", "wars", "empire", "return", "night", "city", "lost", "world", "dark",
+    "knight", "space", "odyssey", "river", "king", "queen", "ghost", "shadow", "fire",
+    "ice", "dream", "love", "war", "peace", "last", "first", "iron", "golden", "secret",
+    "звезда", "война", "мир", "ночь", "город", "тень", "огонь", "лёд", "мечта",
+    "любовь",
+]
+FIRST_NAMES = ["John", "Anna", "Mark", "Maria", "George", "Olga", "Harrison", "Carrie",
+               "Иван", "Пётр", "Елена", "Дмитрий", "Светлана", "Alec", "Natalie",
+               "Ewan"]
+LAST_NAMES = ["Lucas", "Ford", "Fisher", "Hamill", "Portman", "McGregor", "Guinness",
+              "Иванов", "Петров", "Смирнова", "Кузнецов", "Tarkovsky", "Nolan",
+              "Villeneuve"]
+FILM_TYPES = ["movie", "tv_show"]
+ROLES = ["actor", "director", "writer"]
+
+
+class Catalog(NamedTuple):
+    films: list[dict]
+    persons: list[dict]
+    genres: list[dict]
+
+    def documents(self) -> dict[str, list[dict]]:
+        """Documents per Elasticsearch index."""
+        return {"movies": self.films, "persons": self.persons, "genres": self.genres}
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def generate_catalog(films: int = 10000, persons: int = 3000,
+                     seed: int = 42) -> Catalog:
+    """Build a deterministic catalog shaped like the production indexes."""
+    rng = random.Random(seed)
+
+    genres = [{"id": _uuid(rng), "name": name, "description": f"{name} films"}
+              for name in GENRE_NAMES]
+
+    people = []
+    for _ in range(persons):
+        people.append({
+            "id": _uuid(rng),
+            "full_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "role": rng.sample(ROLES, rng.randint(1, 2)),
+            "films_id": [],
+        })
+
+    movies = []
+    for _ in range(films):
+        film_id = _uuid(rng)
+        cast = rng.sample(people, min(len(people), rng.randint(3, 15)))
+        for person in cast:
+            person["films_id"].append(film_id)
+        movies.append({
+            "id": film_id,
+            "imdb_rating": round(rng.uniform(1, 10), 1),
+            "genre": [genre["name"] for genre in rng.sample(genres, rng.randint(1, 3))],
+            "title": " ".join(rng.choice(TITLE_WORDS)
+                              for _ in range(rng.randint(1, 4))).title(),
+            "description": " ".join(rng.choice(TITLE_WORDS)
+                                    for _ in range(rng.randint(10, 40))),
+            "type": rng.choice(FILM_TYPES),
+            "actors": [{"name": person["full_name"]} for person in cast[2:]],
+            "directors": [{"name": cast[0]["full_name"]}],
+            "writers": [{"name": cast[1]["full_name"]}],
+        })
+
+    return Catalog(movies, people, genres)
@@ -0,0 +1,131 @@
+"""Memory footprint and encode/decode time of cache value encodings.
+
+Compares the stored size of realistic cache entries and the time to go from
+documents to the stored bytes (encode) and from the stored bytes back to a
+response body (decode):
+
+    python -m benchmarks.codecs --films 2000
+
+Rows are the current path (orjson bodies in the cache entry envelope) with
+each available codec, plus msgpack when installed; msgpack values have to be
+turned back into JSON on every read, which the decode column includes.
+"""
+import argparse
+import sys
+import time
+from typing import Callable, List, NamedTuple, Optional
+
+import orjson
+
+from app.models.film import Film
+from app.models.person import Person
+from app.services.cache_manager import CacheEntry
+from app.services.codecs import AVAILABLE, IDENTITY, CODEC_CLASSES, Codec
+from app.services.search_profiles import get_search_profile
+from benchmarks.catalog import generate_catalog
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+
+class Encoding(NamedTuple):
+    name: str
+    encode: Callable[[list], bytes]
+    decode: Callable[[bytes], bytes]
+
+
+def _project(doc: dict, source: Optional[List[str]]) -> dict:
+    return {field: doc[field] for field in source if field in doc} if source else doc
+
+
+def build_values(films: int, persons: int, seed: int) -> dict[str, List[list]]:
+    """Documents of each kind of cache entry, as validated by the services."""
+    catalog = generate_catalog(films=films, persons=persons, seed=seed)
+    movies, people = get_search_profile("movies"), get_search_profile("persons")
+    film_details = [Film(**_project(doc, movies.detail_source)).dict()
+                    for doc in catalog.films]
+    film_rows = [Film(**_project(doc, movies.list_source)).dict()
+                 for doc in catalog.films]
+    full_rows = [Film(**doc).dict() for doc in catalog.films]
+    return {
+        "movies detail": film_details,
+        "movies search page": [film_rows[i:i + 10]
+                               for i in range(0, len(film_rows), 10)],
+        "movies page, full docs": [full_rows[i:i + 10]
+                                   for i in range(0, len(full_rows), 10)],
+        "persons detail": [Person(**_project(doc, people.detail_source)).dict()
+                           for doc in catalog.persons],
+    }
+
+
+def orjson_encoding(codec: Codec, min_size: int) -> Encoding:
+    def encode(value) -> bytes:
+        body = orjson.dumps(value)
+        return CacheEntry(body, 0.0, 0.0).pack(
+            codec if len(body) >= min_size else IDENTITY)
+
+    def decode(data: bytes) -> bytes:
+        return CacheEntry.unpack(data).value
+
+    return Encoding(f"orjson+{codec.name}", encode, decode)
+
+
+def msgpack_encoding() -> Encoding:
+    def encode(value) -> bytes:
+        return CacheEntry(msgpack.packb(value, default=str), 0.0, 0.0).pack()
+
+    def decode(data: bytes) -> bytes:
+        return orjson.dumps(msgpack.unpackb(CacheEntry.unpack(data).value))
+
+    return Encoding("msgpack", encode, decode)
+
+
+def measure(encoding: Encoding, values: list) -> dict:
+    started = time.perf_counter()
+    encoded = [encoding.encode(value) for value in values]
+    encode_time = time.perf_counter() - started
+    started = time.perf_counter()
+    for data in encoded:
+        encoding.decode(data)
+    decode_time = time.perf_counter() - started
+    return {
+        "bytes": sum(map(len, encoded)),
+        "encode_us": encode_time / len(values) * 1e6,
+        "decode_us": decode_time / len(values) * 1e6,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--films", type=int, default=2000)
+    parser.add_argument("--persons", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--min-size", type=int, default=1024,
+                        help="compress values of at least this many bytes")
+    args = parser.parse_args(argv)
+
+    encodings = [orjson_encoding(IDENTITY, args.min_size)]
+    for name in sorted(AVAILABLE - {IDENTITY.name}):
+        encodings.append(orjson_encoding(CODEC_CLASSES[name](), args.min_size))
+    if msgpack is not None:
+        encodings.append(msgpack_encoding())
+
+    for kind, values in build_values(args.films, args.persons, args.seed).items():
+        print(f"{kind} ({len(values)} entries)")
+        print(f"  {'encoding':<16}{'KiB':>10}{'ratio':>8}"
+              f"{'encode us':>12}{'decode us':>12}")
+        baseline = None
+        for encoding in encodings:
+            result = measure(encoding, values)
+            baseline = baseline or result["bytes"]
+            print(f"  {encoding.name:<16}{result['bytes'] / 1024:>10.0f}"
+                  f"{result['bytes'] / baseline:>8.2f}"
+                  f"{result['encode_us']:>12.1f}{result['decode_us']:>12.1f}")
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,306 @@
+import asyncio
+import random
+import re
+import time
+from collections import Counter, defaultdict
+from typing import List, Optional, Sequence, Tuple
+
+from app.services.cache_manager import CacheManager
+from app.services.codecs import IDENTITY, Codec
+from app.services.elasticsearch_service import (
+    FACET_SIZE, NESTED_FIELDS, BrowsePage, BrowseQuery, ElasticsearchService,
+    SearchPage, SearchRequest)
+from app.services.search_profiles import get_search_profile
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+class Latency:
+    """Injected delay: ``mean`` seconds, uniformly spread by +/- ``jitter``."""
+
+    def __init__(self, mean: float = 0.0, jitter: float = 0.0, seed: int = 0):
+        self.mean = mean
+        self.jitter = jitter
+        self._rng = random.Random(seed)
+
+    async def wait(self) -> None:
+        if self.mean <= 0:
+            await asyncio.sleep(0)
+            return
+        delay = self.mean + self._rng.uniform(-self.jitter, self.jitter)
+        await asyncio.sleep(max(0.0, delay))
+
+
+def _project(doc: dict, source: Optional[List[str]]) -> dict:
+    if source is None:
+        return doc
+    return {field: doc[field] for field in source if field in doc}
+
+
+def _values(doc: dict, field: str) -> list:
+    value = doc.get(field)
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _matches(doc: dict, query: BrowseQuery) -> bool:
+    for field, values in query.terms:
+        if not set(_values(doc, field)) & set(values):
+            return False
+    for field, low, high in query.ranges:
+        value = doc.get(field)
+        if value is None or (low is not None and value < low) \
+                or (high is not None and value > high):
+            return False
+    return True
+
+
+def _tokens(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+class InMemoryElasticsearchService(ElasticsearchService):
+    """Elasticsearch stand-in over an in-memory catalog.
+
+    Search is a token match over the index's search profile fields, scored by
+    the number of matching query tokens; good enough to produce realistic
+    result sizes without the cost of a real engine in the benchmark process.
+    """
+
+    def __init__(self, documents: dict[str, List[dict]],
+                 latency: Optional[Latency] = None):
+        self.latency = latency or Latency()
+        self.calls: dict[str, int] = defaultdict(int)
+        self._docs = {index_name: {doc["id"]: doc for doc in docs}
+                      for index_name, docs in documents.items()}
+        self._inverted: dict[str, dict[str, set]] = {}
+        for index_name, docs in documents.items():
+            fields = [field.split("^")[0]
+                      for field in get_search_profile(index_name).fields]
+            inverted = defaultdict(set)
+            for doc in docs:
+                for field in fields:
+                    value = doc.get(field)
+                    values = value if isinstance(value, list) else [value]
+                    for item in values:
+                        if isinstance(item, str):
+                            for token in _tokens(item):
+                                inverted[token].add(doc["id"])
+            self._inverted[index_name] = inverted
+
+    async def get_by_id(self, index_name: str, item_id: str,
+                        source: Optional[List[str]] = None) -> Optional[dict]:
+        self.calls["get"] += 1
+        await self.latency.wait()
+        doc = self._docs.get(index_name, {}).get(item_id)
+        if doc is None:
+            return None
+        return _project(doc, source or get_search_profile(index_name).detail_source)
+
+    async def get_many(self, index_name: str, item_ids: List[str],
+                       source: Optional[List[str]] = None) -> List[Optional[dict]]:
+        self.calls["mget"] += 1
+        await self.latency.wait()
+        source = source or get_search_profile(index_name).detail_source
+        docs = self._docs.get(index_name, {})
+        return [_project(docs[item_id], source) if item_id in docs else None
+                for item_id in item_ids]
+
+    async def get_all(self, index_name: str, max_size: int,
+                      source: Optional[List[str]] = None) -> List[dict]:
+        self.calls["get_all"] += 1
+        await self.latency.wait()
+        source = source or get_search_profile(index_name).detail_source
+        docs = self._docs.get(index_name, {})
+        return [_project(docs[doc_id], source) for doc_id in sorted(docs)[:max_size]]
+
+    async def suggest(self, index_name: str, field: str, prefix: str,
+                      size: int) -> List[dict]:
+        self.calls["suggest"] += 1
+        await self.latency.wait()
+        words = _tokens(prefix)
+        hits = []
+        for doc in self._docs.get(index_name, {}).values():
+            tokens = _tokens(doc.get(field) or "")
+            if words and any(tokens[i:i + len(words) - 1] == words[:-1]
+                             and tokens[i + len(words) - 1].startswith(words[-1])
+                             for i in range(len(tokens) - len(words) + 1)):
+                hits.append(_project(doc, ["id", field]))
+                if len(hits) == size:
+                    break
+        return hits
+
+    async def custom_search(self, index_name: str, query: str, start: int, size: int,
+                            source: Optional[List[str]] = None) -> List[dict]:
+        self.calls["search"] += 1
+        await self.latency.wait()
+        ranked = self._match(index_name, query)
+        return self._list_page(index_name, ranked[start:start + size], source)
+
+    async def search_field(
+        self, index_name: str, field_search: str, query: str, start: int, size: int,
+        source: Optional[List[str]] = None
+    ) -> List[dict]:
+        self.calls["search_field"] += 1
+        await self.latency.wait()
+        ranked = self._match_field(index_name, field_search, query)
+        return self._list_page(index_name, ranked[start:start + size], source)
+
+    async def multi_search(self, searches: List[SearchRequest]) -> List[List[dict]]:
+        self.calls["msearch"] += 1
+        await self.latency.wait()
+        return [self._list_page(search.index_name,
+                                self._match(search.index_name, search.query)
+                                [search.start:search.start + search.size])
+                for search in searches]
+
+    async def browse(self, index_name: str, query: BrowseQuery, start: int,
+                     size: int) -> BrowsePage:
+        self.calls["browse"] += 1
+        await self.latency.wait()
+        profile = get_search_profile(index_name)
+        docs = [doc for doc in self._docs.get(index_name, {}).values()
+                if _matches(doc, query)]
+        docs.sort(key=lambda doc: doc["id"])
+        if query.sort:
+            name = query.sort.lstrip("-")
+            missing = [doc for doc in docs if doc.get(name) is None]
+            docs = sorted((doc for doc in docs if doc.get(name) is not None),
+                          key=lambda doc: doc[name],
+                          reverse=query.sort.startswith("-")) + missing
+        facets = {}
+        for field in profile.facet_fields:
+            counts = Counter(value for doc in docs for value in _values(doc, field))
+            facets[field] = dict(counts.most_common(FACET_SIZE))
+        page = [_project(doc, profile.list_source) for doc in docs[start:start + size]]
+        return BrowsePage(page, len(docs), facets)
+
+    async def custom_search_after(
+        self, index_name: str, query: str, size: int,
+        search_after: Optional[list] = None, pit_id: Optional[str] = None,
+        source: Optional[List[str]] = None
+    ) -> SearchPage:
+        self.calls["search"] += 1
+        await self.latency.wait()
+        return self._page_after(index_name, self._match(index_name, query), size,
+                                search_after, source)
+
+    async def search_field_after(
+        self, index_name: str, field_search: str, query: str, size: int,
+        search_after: Optional[list] = None, pit_id: Optional[str] = None,
+        source: Optional[List[str]] = None
+    ) -> SearchPage:
+        self.calls["search_field"] += 1
+        await self.latency.wait()
+        ranked = self._match_field(index_name, field_search, query)
+        return self._page_after(index_name, ranked, size, search_after, source)
+
+    def _match(self, index_name: str, query: str) -> List[Tuple[float, str]]:
+        inverted = self._inverted.get(index_name, {})
+        scores: dict[str, float] = defaultdict(float)
+        for token in _tokens(query):
+            for doc_id in inverted.get(token, ()):
+                scores[doc_id] += 1.0
+        return sorted(((score, doc_id) for doc_id, score in scores.items()),
+                      key=lambda hit: (-hit[0], hit[1]))
+
+    def _match_field(self, index_name: str, field_search: str,
+                     query: str) -> List[Tuple[float, str]]:
+        query = query.lower()
+        hits = []
+        for doc_id, doc in self._docs.get(index_name, {}).items():
+            if field_search in NESTED_FIELDS:
+                path, name = field_search.split(".")
+                values = [item.get(name) for item in doc.get(path) or []]
+            else:
+                value = doc.get(field_search)
+                values = value if isinstance(value, list) else [value]
+            if any(isinstance(value, str) and query in value.lower()
+                   for value in values):
+                hits.append((1.0, doc_id))
+        hits.sort(key=lambda hit: hit[1])
+        return hits
+
+    def _list_page(self, index_name: str, ranked: List[Tuple[float, str]],
+                   source: Optional[List[str]] = None) -> List[dict]:
+        source = source or get_search_profile(index_name).search_source
+        docs = self._docs[index_name]
+        return [_project(docs[doc_id], source) for _, doc_id in ranked]
+
+    def _page_after(self, index_name: str, ranked: List[Tuple[float, str]], size: int,
+                    search_after: Optional[list],
+                    source: Optional[List[str]] = None) -> SearchPage:
+        if search_after is not None:
+            after = (-search_after[0], search_after[1])
+            ranked = [hit for hit in ranked if (-hit[0], hit[1]) > after]
+        page = ranked[:size]
+        next_search_after = list(page[-1]) if len(page) == size else None
+        return SearchPage(self._list_page(index_name, page, source), next_search_after)
+
+
+class InMemoryCacheManager(CacheManager):
+    """Redis stand-in: a dict with expiries, injected latency and hit counters.
+
+    Hits and misses are counted per key kind: the segment after the index name
+    for search keys (``search``, ``search_field``), ``detail`` otherwise.
+    """
+
+    def __init__(self, latency: Optional[Latency] = None, default_expiry: int = 300,
+                 codec: Codec = IDENTITY, compress_min_size: int = 1024,
+                 variant_codecs: Sequence[Codec] = ()):
+        super().__init__(default_expiry, codec, compress_min_size, variant_codecs)
+        self.latency = latency or Latency()
+        self.hits: dict[str, int] = defaultdict(int)
+        self.misses: dict[str, int] = defaultdict(int)
+        self._data: dict[str, Tuple[float, bytes]] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        await self.latency.wait()
+        return self._get(key)
+
+    async def set(self, key: str, value: bytes, expiry: Optional[int] = None) -> None:
+        await self.latency.wait()
+        self._set(key, value, expiry)
+
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        await self.latency.wait()
+        return [self._get(key) for key in keys]
+
+    async def mset(self, items: List[Tuple[str, bytes, Optional[int]]],
+                   new_items: Sequence[Tuple[str, bytes, Optional[int]]] = ()) -> None:
+        await self.latency.wait()
+        for key, value, expiry in items:
+            self._set(key, value, expiry)
+        for key, value, expiry in new_items:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                self._set(key, value, expiry)
+
+    async def delete(self, keys: List[str]) -> None:
+        await self.latency.wait()
+        for key in keys:
+            self._data.pop(key, None)
+
+    def memory_usage(self) -> int:
+        return sum(len(key) + len(value) for key, (_, value) in self._data.items())
+
+    def _get(self, key: str) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self._data[key]
+            entry = None
+        counter = self.misses if entry is None else self.hits
+        counter[self._kind(key)] += 1
+        return entry[1] if entry is not None else None
+
+    def _set(self, key: str, value: bytes, expiry: Optional[int]) -> None:
+        expiry = expiry if expiry is not None else self.default_expiry
+        self._data[key] = (time.monotonic() + expiry, value)
+
+    @staticmethod
+    def _kind(key: str) -> str:
+        parts = key.split(":", 2)
+        if len(parts) > 2 and parts[1] in ("search", "search_field"):
+            return parts[1]
+        return "detail"
@@ -0,0 +1,271 @@
+"""Load benchmark of the search API against in-memory Elasticsearch and Redis.
+
+Runs the FastAPI app in-process (no network) with the fakes from
+``benchmarks.fakes`` and reports throughput, latency percentiles and cache hit
+rates per endpoint:
+
+    python -m benchmarks.run --duration 10 --concurrency 64 --es-latency-ms 5
+
+Results can be saved with ``--json`` and later checked against with
+``--compare``, which exits non-zero when throughput or p95 latency regress by
+more than ``--tolerance``.
+"""
+import argparse
+import asyncio
+import itertools
+import logging
+import random
+import sys
+import time
+from collections import defaultdict
+from typing import List, NamedTuple, Optional
+
+import httpx
+import orjson
+
+from app.core.config import settings
+from app.main import app
+from app.services import dependencies
+from app.services.cache_manager import TieredCacheManager
+from app.services.codecs import get_codec, get_response_codecs
+from benchmarks.catalog import Catalog, generate_catalog
+from benchmarks.fakes import InMemoryCacheManager, InMemoryElasticsearchService, Latency
+
+ENTITIES = {
+    # index name: (URL prefix, field for search_field requests)
+    "movies": ("/api/v1/movies", "title"),
+    "persons": ("/api/v1/persons", "full_name"),
+    "genres": ("/api/v1/genres", "name"),
+}
+
+
+class BenchRequest(NamedTuple):
+    endpoint: str
+    url: str
+    params: Optional[dict] = None
+
+
+class Workload:
+    """Random requests with Zipf-like popularity of IDs and queries."""
+
+    def __init__(self, catalog: Catalog, mix: dict[str, float], skew: float, seed: int):
+        self.mix = mix
+        self._rng = random.Random(seed)
+        self._ids = {index_name: [doc["id"] for doc in docs]
+                     for index_name, docs in catalog.documents().items()}
+        self._weights = {index_name: self._zipf_weights(len(ids), skew)
+                         for index_name, ids in self._ids.items()}
+        words = sorted({word for film in catalog.films
+                        for word in film["title"].lower().split()})
+        self._rng.shuffle(words)
+        self._queries = words + [" ".join(pair) for pair in itertools.islice(
+            itertools.combinations(words, 2), len(words) * 4)]
+        self._query_weights = self._zipf_weights(len(self._queries), skew)
+        self._names = {
+            "movies": [film["title"].split()[0] for film in catalog.films],
+            "persons": [person["full_name"].split()[-1] for person in catalog.persons],
+            "genres": [genre["name"] for genre in catalog.genres],
+        }
+
+    @staticmethod
+    def _zipf_weights(count: int, skew: float) -> List[float]:
+        return list(itertools.accumulate(1 / (rank ** skew)
+                                         for rank in range(1, count + 1)))
+
+    def next(self) -> BenchRequest:
+        kind = self._rng.choices(list(self.mix), weights=list(self.mix.values()))[0]
+        index_name = self._rng.choices(list(ENTITIES), weights=[6, 3, 1])[0]
+        prefix, field = ENTITIES[index_name]
+        if kind == "detail":
+            item_id = self._rng.choices(self._ids[index_name],
+                                        cum_weights=self._weights[index_name])[0]
+            return BenchRequest(f"{index_name}:detail", f"{prefix}/{item_id}")
+        page = self._rng.choices([1, 2, 3], weights=[8, 2, 1])[0]
+        if kind == "search":
+            query = self._rng.choices(self._queries, cum_weights=self._query_weights)[0]
+            return BenchRequest(f"{index_name}:search", f"{prefix}/search/",
+                                {"query": query, "page": page, "size": 10})
+        query = self._rng.choice(self._names[index_name])
+        return BenchRequest(f"{index_name}:search_field", f"{prefix}/search_field/",
+                            {"field_search": field, "query": query, "page": page,
+                             "size": 10})
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+async def run(args: argparse.Namespace) -> dict:
+    catalog = generate_catalog(films=args.films, persons=args.persons, seed=args.seed)
+    es_service = InMemoryElasticsearchService(
+        catalog.documents(),
+        Latency(args.es_latency_ms / 1000, args.es_jitter_ms / 1000, args.seed))
+    cache_manager = InMemoryCacheManager(
+        Latency(args.redis_latency_ms / 1000, args.redis_jitter_ms / 1000,
+                args.seed + 1),
+        codec=get_codec(settings.cache_compression, settings.cache_compression_level),
+        compress_min_size=settings.cache_compression_min_size,
+        variant_codecs=get_response_codecs(settings.response_encodings))
+    # Replace only the network clients' wrappers, so the local cache tier and
+    # the mget batching stay in the measured path; no Redis to record hot
+    # requests into. The app's startup (real clients) doesn't run in-process.
+    dependencies.container = dependencies.Container(
+        None, None, redis_cache_manager=cache_manager, async_es_service=es_service,
+        record_hot_keys=False)
+
+    mix = dict((part.split("=")[0], float(part.split("=")[1]))
+               for part in args.mix.split(","))
+    workload = Workload(catalog, mix, args.skew, args.seed)
+    latencies: dict[str, List[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+
+    transport = httpx.AsyncClient(app=app, base_url="http://bench")
+    deadline = time.perf_counter() + args.warmup + args.duration
+    measure_from = time.perf_counter() + args.warmup
+
+    async def worker():
+        while True:
+            started = time.perf_counter()
+            if started >= deadline:
+                return
+            request = workload.next()
+            response = await transport.get(request.url, params=request.params)
+            elapsed = time.perf_counter() - started
+            if started < measure_from:
+                continue
+            latencies[request.endpoint].append(elapsed)
+            if response.status_code >= 500:
+                errors[request.endpoint] += 1
+
+    async with transport:
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+
+    report = {"config": vars(args), "endpoints": {}}
+    for endpoint in sorted(latencies):
+        values = latencies[endpoint]
+        report["endpoints"][endpoint] = {
+            "requests": len(values),
+            "rps": len(values) / args.duration,
+            "p50_ms": percentile(values, 50) * 1000,
+            "p95_ms": percentile(values, 95) * 1000,
+            "p99_ms": percentile(values, 99) * 1000,
+            "errors": errors[endpoint],
+        }
+    all_values = list(itertools.chain.from_iterable(latencies.values()))
+    report["total"] = {
+        "requests": len(all_values),
+        "rps": len(all_values) / args.duration,
+        "p50_ms": percentile(all_values, 50) * 1000,
+        "p95_ms": percentile(all_values, 95) * 1000,
+        "p99_ms": percentile(all_values, 99) * 1000,
+    }
+    report["cache"] = {
+        kind: {
+            "hits": cache_manager.hits[kind],
+            "misses": cache_manager.misses[kind],
+            "hit_rate": cache_manager.hits[kind]
+            / max(1, cache_manager.hits[kind] + cache_manager.misses[kind]),
+        }
+        for kind in sorted(set(cache_manager.hits) | set(cache_manager.misses))
+    }
+    local_cache = dependencies.container.cache_manager
+    if isinstance(local_cache, TieredCacheManager):
+        report["local_cache"] = local_cache.stats()
+    report["elasticsearch_calls"] = dict(es_service.calls)
+    report["cache_memory_bytes"] = cache_manager.memory_usage()
+    dependencies.container = None
+    return report
+
+
+def print_report(report: dict) -> None:
+    print(f"{'endpoint':<22}{'requests':>10}{'req/s':>10}{'p50 ms':>10}"
+          f"{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    rows = list(report["endpoints"].items()) + [("total", report["total"])]
+    for endpoint, stats in rows:
+        print(f"{endpoint:<22}{stats['requests']:>10}{stats['rps']:>10.0f}"
+              f"{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}"
+              f"{stats['p99_ms']:>10.2f}{stats.get('errors', ''):>8}")
+    print()
+    print(f"{'cache (L2)':<22}{'hits':>10}{'misses':>10}{'hit rate':>10}")
+    for kind, stats in report["cache"].items():
+        print(f"{kind:<22}{stats['hits']:>10}{stats['misses']:>10}"
+              f"{stats['hit_rate']:>10.1%}")
+    print()
+    if report.get("local_cache"):
+        print(f"{'cache (L1)':<22}{'hits':>10}{'misses':>10}{'hit rate':>10}"
+              f"{'size':>10}")
+        for index_name, stats in sorted(report["local_cache"].items()):
+            hit_rate = stats["hits"] / max(1, stats["hits"] + stats["misses"])
+            print(f"{index_name:<22}{stats['hits']:>10}{stats['misses']:>10}"
+                  f"{hit_rate:>10.1%}{stats['size']:>10}")
+        print()
+    calls = sorted(report["elasticsearch_calls"].items())
+    print("elasticsearch calls:",
+          ", ".join(f"{op}={count}" for op, count in calls))
+    print(f"cache memory: {report['cache_memory_bytes'] / 1024:.0f} KiB")
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> List[str]:
+    regressions = []
+    for endpoint, stats in [("total", report["total"]), *report["endpoints"].items()]:
+        if endpoint == "total":
+            before = baseline["total"]
+        else:
+            before = baseline["endpoints"].get(endpoint)
+        if not before:
+            continue
+        if stats["rps"] < before["rps"] * (1 - tolerance):
+            regressions.append(
+                f"{endpoint}: {stats['rps']:.0f} req/s, was {before['rps']:.0f}")
+        if stats["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{endpoint}: p95 {stats['p95_ms']:.2f} ms, "
+                               f"was {before['p95_ms']:.2f}")
+    return regressions
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=10, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=2,
+                        help="unmeasured seconds before")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--mix", default="detail=60,search=30,search_field=10",
+                        help="relative weights of request kinds")
+    parser.add_argument("--skew", type=float, default=1.1,
+                        help="Zipf exponent of ID and query popularity")
+    parser.add_argument("--films", type=int, default=10000)
+    parser.add_argument("--persons", type=int, default=3000)
+    parser.add_argument("--es-latency-ms", type=float, default=5)
+    parser.add_argument("--es-jitter-ms", type=float, default=2)
+    parser.add_argument("--redis-latency-ms", type=float, default=0.3)
+    parser.add_argument("--redis-jitter-ms", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--compare", help="baseline report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    # Per-request INFO lines from the client would dominate the measured time
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.json:
+        with open(args.json, "wb") as f:
+            f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2))
+    if args.compare:
+        with open(args.compare, "rb") as f:
+            regressions = compare(report, orjson.loads(f.read()), args.tolerance)
+        for regression in regressions:
+            print("REGRESSION", regression)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
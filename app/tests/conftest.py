@@ -0,0 +1,46 @@
+import pytest
+from starlette.testclient import TestClient
+
+from app.main import app
+from app.services import dependencies
+from app.services.dependencies import Container
+from app.services.film_service import FilmService
+from benchmarks.catalog import Catalog, generate_catalog
+from benchmarks.fakes import InMemoryCacheManager, InMemoryElasticsearchService
+
+
+@pytest.fixture
+def catalog() -> Catalog:
+    return generate_catalog(films=20, persons=10)
+
+
+@pytest.fixture
+def es(catalog: Catalog) -> InMemoryElasticsearchService:
+    return InMemoryElasticsearchService(catalog.documents())
+
+
+@pytest.fixture
+def cache() -> InMemoryCacheManager:
+    return InMemoryCacheManager()
+
+
+@pytest.fixture
+def films(cache: InMemoryCacheManager, es: InMemoryElasticsearchService) -> FilmService:
+    return FilmService(cache, es)
+
+
+@pytest.fixture
+def container(cache: InMemoryCacheManager, es: InMemoryElasticsearchService):
+    """The app's container over the fakes, without the Redis-backed parts."""
+    previous = dependencies.container
+    dependencies.container = Container(
+        None, None, redis_cache_manager=cache, async_es_service=es,
+        record_hot_keys=False)
+    yield dependencies.container
+    dependencies.container = previous
+
+
+@pytest.fixture
+def client(container: Container) -> TestClient:
+    # Not entered: the startup handler would connect to Redis and Elasticsearch
+    return TestClient(app)
@@ -0,0 +1,85 @@
+import asyncio
+
+import orjson
+
+from app.services.film_service import FilmService
+
+
+def cache_key(films: FilmService, film_id: str) -> str:
+    return films.cache_manager.generate_cache_key(films.index_name, film_id)
+
+
+def test_concurrent_misses_share_one_load(films, es, catalog):
+    film_id = catalog.films[0]["id"]
+
+    async def scenario():
+        return await asyncio.gather(*(films.get_by_id_raw(film_id) for _ in range(5)))
+
+    payloads = asyncio.run(scenario())
+
+    assert {payload.body for payload in payloads} == {payloads[0].body}
+    assert es.calls["get"] == 1
+
+
+def test_stale_entry_is_served_and_refreshed(films, es, catalog):
+    film_id = catalog.films[0]["id"]
+
+    async def scenario():
+        await films.cache_manager.set_entry(
+            cache_key(films, film_id), b'{"title": "old"}', 0, 60)
+        served = await films.get_by_id_raw(film_id)
+        await asyncio.gather(*films._refresh_tasks)
+        entry = await films.cache_manager.get_entry(cache_key(films, film_id))
+        return served, entry
+
+    served, entry = asyncio.run(scenario())
+
+    assert served.body == b'{"title": "old"}'
+    assert es.calls["get"] == 1
+    assert not entry.is_stale
+    assert orjson.loads(entry.value)["title"] == catalog.films[0]["title"]
+
+
+def test_stale_entry_is_kept_when_elasticsearch_fails(films, es, catalog):
+    film_id = catalog.films[0]["id"]
+
+    async def failing_get(*args, **kwargs):
+        raise ConnectionError("elasticsearch is down")
+
+    es.get_by_id = failing_get
+
+    async def scenario():
+        await films.cache_manager.set_entry(
+            cache_key(films, film_id), b'{"title": "old"}', 0, 60)
+        served = await films.get_by_id_raw(film_id)
+        await asyncio.gather(*films._refresh_tasks)
+        return served, await films.cache_manager.get_entry(cache_key(films, film_id))
+
+    served, entry = asyncio.run(scenario())
+
+    assert served.body == b'{"title": "old"}'
+    # Backed off: fresh again for CACHE_REFRESH_BACKOFF, still the stale value
+    assert not entry.is_stale
+    assert entry.value == b'{"title": "old"}'
+
+
+def test_unknown_id_is_cached_as_negative(films, es):
+    async def scenario():
+        first = await films.get_by_id_raw("unknown")
+        second = await films.get_by_id_raw("unknown")
+        return first, second, await films.cache_manager.get_entry(
+            cache_key(films, "unknown"))
+
+    first, second, entry = asyncio.run(scenario())
+
+    assert first is None and second is None
+    assert entry.is_negative
+    assert es.calls["get"] == 1
+
+
+def test_empty_search_is_cached_as_negative(films, es):
+    async def scenario():
+        return [await films.search_films_raw("nosuchword", 1, 10) for _ in range(2)]
+
+    assert asyncio.run(scenario()) == [None, None]
+    assert es.calls["search"] == 1
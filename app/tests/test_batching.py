@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from app.services.batching import BatchingElasticsearchService
+
+
+def test_full_batch_is_sent_at_once(es, catalog):
+    batching = BatchingElasticsearchService(es, max_batch_size=3, max_wait=60)
+    film_ids = [film["id"] for film in catalog.films[:3]]
+
+    async def scenario():
+        return await asyncio.gather(
+            *(batching.get_by_id("movies", film_id) for film_id in film_ids))
+
+    docs = asyncio.run(scenario())
+
+    assert [doc["id"] for doc in docs] == film_ids
+    assert es.calls["mget"] == 1
+    assert es.calls["get"] == 0
+    assert batching.stats()["largest_batch"] == 3
+
+
+def test_partial_batch_is_sent_after_max_wait(es, catalog):
+    batching = BatchingElasticsearchService(es, max_batch_size=50, max_wait=0.01)
+    film_ids = [film["id"] for film in catalog.films[:2]] + ["unknown"]
+
+    async def scenario():
+        # The same ID looked up twice takes one slot
+        return await asyncio.gather(
+            *(batching.get_by_id("movies", film_id) for film_id in film_ids),
+            batching.get_by_id("movies", film_ids[0]))
+
+    docs = asyncio.run(scenario())
+
+    assert [doc and doc["id"] for doc in docs] == [*film_ids[:2], None, film_ids[0]]
+    assert batching.stats() == {
+        "batches": 1, "batched_items": 3, "largest_batch": 3, "pending": 0}
+
+
+def test_batch_error_reaches_every_caller(es, catalog):
+    batching = BatchingElasticsearchService(es, max_batch_size=50, max_wait=0.01)
+
+    async def failing_get_many(*args, **kwargs):
+        raise ConnectionError("elasticsearch is down")
+
+    es.get_many = failing_get_many
+
+    async def scenario():
+        return await asyncio.gather(
+            *(batching.get_by_id("movies", film["id"]) for film in catalog.films[:3]),
+            return_exceptions=True)
+
+    results = asyncio.run(scenario())
+
+    assert all(isinstance(result, ConnectionError) for result in results)
+
+
+def test_projected_lookup_bypasses_the_batch(es, catalog):
+    batching = BatchingElasticsearchService(es, max_batch_size=50, max_wait=60)
+    film = catalog.films[0]
+
+    doc = asyncio.run(batching.get_by_id("movies", film["id"], ["title"]))
+
+    assert doc == {"title": film["title"]}
+    assert es.calls["get"] == 1
+    assert es.calls["mget"] == 0
+
+
+@pytest.mark.parametrize("max_batch_size", [1, 2])
+def test_batches_split_by_size(es, catalog, max_batch_size):
+    batching = BatchingElasticsearchService(es, max_batch_size, max_wait=60)
+
+    async def scenario():
+        await asyncio.gather(
+            *(batching.get_by_id("movies", film["id"]) for film in catalog.films[:4]))
+
+    asyncio.run(scenario())
+
+    assert es.calls["mget"] == 4 // max_batch_size
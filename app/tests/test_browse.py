@@ -0,0 +1,53 @@
+from http import HTTPStatus
+
+from app.services.elasticsearch_service import BrowseQuery
+
+
+def test_browse_query_is_canonical():
+    query = BrowseQuery.of({"type": ["movie"], "genre": ["Drama", "Comedy", "Drama"]},
+                           {"imdb_rating": (5.0, None)}, "-imdb_rating")
+    same = BrowseQuery.of({"genre": ["Comedy", "Drama"], "type": ["movie"]},
+                          {"imdb_rating": (5.0, None)}, "-imdb_rating")
+
+    assert query == same
+    assert query.terms == (("genre", ("Comedy", "Drama")), ("type", ("movie",)))
+    assert query.ranges == (("imdb_rating", 5.0, None),)
+
+
+def test_browse_query_drops_empty_filters():
+    query = BrowseQuery.of({"genre": None, "type": []},
+                           {"imdb_rating": (None, None)})
+
+    assert query == BrowseQuery()
+
+
+def test_browse_filters_and_facets(client, catalog):
+    genre = catalog.films[0]["genre"][0]
+
+    response = client.get("/api/v1/movies/browse/", params={
+        "genre": genre, "imdb_rating_min": 5, "sort": "-imdb_rating"})
+    body = response.json()
+    expected = [film for film in catalog.films
+                if genre in film["genre"] and film["imdb_rating"] >= 5]
+
+    assert response.status_code == HTTPStatus.OK
+    assert body["total"] == len(expected)
+    ratings = [film["imdb_rating"] for film in body["results"]]
+    assert ratings == sorted(ratings, reverse=True)
+    assert body["facets"]["genre"][genre] == len(expected)
+
+
+def test_equal_filters_share_a_cache_entry(client, es):
+    client.get("/api/v1/movies/browse/", params={"genre": ["Drama", "Comedy"]})
+    client.get("/api/v1/movies/browse/", params={"genre": ["Comedy", "Drama"]})
+
+    assert es.calls["browse"] == 1
+
+
+def test_invalid_filters_are_rejected(client):
+    unknown_sort = client.get("/api/v1/movies/browse/", params={"sort": "budget"})
+    empty_range = client.get("/api/v1/movies/browse/", params={
+        "imdb_rating_min": 8, "imdb_rating_max": 5})
+
+    assert unknown_sort.status_code == HTTPStatus.BAD_REQUEST
+    assert empty_range.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+
+from app.services.cache_manager import ENTRY_HEADER, ENTRY_MARKER, CacheEntry
+from app.services.codecs import AVAILABLE, IDENTITY, GzipCodec, ZlibCodec, get_codec
+from benchmarks.fakes import InMemoryCacheManager
+
+BODY = b'{"id": "1", "title": "Star Wars"}' * 20
+
+
+@pytest.mark.parametrize("name", sorted(AVAILABLE))
+def test_codec_round_trip(name):
+    codec = get_codec(name)
+
+    assert codec.decode(codec.encode(BODY)) == BODY
+
+
+def test_unknown_codec_name():
+    with pytest.raises(ValueError):
+        get_codec("snappy")
+
+
+def test_round_trip():
+    entry = CacheEntry(BODY, 10.0, 20.0, {"ETag": '"abc"'})
+
+    unpacked = CacheEntry.unpack(entry.pack())
+
+    assert unpacked.value == BODY
+    assert (unpacked.fresh_until, unpacked.expires_at) == (10.0, 20.0)
+    assert unpacked.headers == {"ETag": '"abc"'}
+
+
+def test_round_trip_compressed():
+    data = CacheEntry(BODY, 10.0, 20.0).pack(GzipCodec())
+
+    unpacked = CacheEntry.unpack(data)
+
+    assert len(data) < len(BODY)
+    assert unpacked.value == BODY
+    assert GzipCodec().decode(unpacked.encodings["gzip"]) == BODY
+
+
+def test_incompressible_value_is_kept_as_is():
+    value = b"{}"
+
+    data = CacheEntry(value, 10.0, 20.0).pack(ZlibCodec())
+
+    assert value in data
+    assert CacheEntry.unpack(data).value == value
+
+
+def test_negative_entry():
+    unpacked = CacheEntry.unpack(CacheEntry(b"", 10.0, 20.0).pack(GzipCodec()))
+
+    assert unpacked.is_negative
+    assert unpacked.payload is None
+
+
+def test_variants():
+    entry = CacheEntry(BODY, 10.0, 20.0)
+
+    data, encodings = entry.encode(GzipCodec(), [ZlibCodec(), GzipCodec()])
+    unpacked = CacheEntry.unpack(data)
+
+    assert unpacked.value == BODY
+    assert set(unpacked.encodings) == {"gzip", "deflate"}
+    assert unpacked.encodings == encodings
+    assert ZlibCodec().decode(unpacked.encodings["deflate"]) == BODY
+    assert unpacked.payload.encodings == encodings
+
+
+def test_variants_of_identity_value():
+    data = CacheEntry(BODY, 10.0, 20.0).pack(IDENTITY, [ZlibCodec()])
+
+    unpacked = CacheEntry.unpack(data)
+
+    assert unpacked.value == BODY
+    assert set(unpacked.encodings) == {"deflate"}
+
+
+def test_unknown_codec_is_a_miss():
+    data = bytearray(CacheEntry(BODY, 10.0, 20.0).pack())
+    # The codec id follows the marker
+    data[1] = 0xFF
+
+    assert CacheEntry.unpack(bytes(data)) is None
+
+
+def test_unknown_variant_codec_is_skipped():
+    data = bytearray(CacheEntry(BODY, 10.0, 20.0).pack(GzipCodec(), [ZlibCodec()]))
+    # The first variant's codec id follows the header (no headers stored)
+    data[ENTRY_HEADER.size] = 0xFF
+
+    unpacked = CacheEntry.unpack(bytes(data))
+
+    assert unpacked.value == BODY
+    assert set(unpacked.encodings) == {"gzip"}
+
+def test_unknown_codec_is_a_miss():
+    data = bytearray(CacheEntry(BODY, 10.0, 20.0).pack(IDENTITY))
+    # The codec id follows the marker
+    data[1] = 0xFF
+
+    assert CacheEntry.unpack(bytes(data)) is None
+
+
+def test_other_format_is_a_miss():
+    assert CacheEntry.unpack(BODY) is None
+    assert CacheEntry.unpack(b"") is None
+    assert CacheEntry.unpack(bytes([ENTRY_MARKER + 1]) + BODY) is None
+
+
+def test_corrupt_value_is_a_miss():
+    data = CacheEntry(BODY, 10.0, 20.0).pack(GzipCodec())
+
+    assert CacheEntry.unpack(data[:-8]) is None
+
+
+def test_encodings_of_a_write():
+    cache = InMemoryCacheManager(codec=GzipCodec(), compress_min_size=0,
+                                 variant_codecs=[ZlibCodec()])
+
+    encodings = asyncio.run(cache.mset_entries(
+        [("movies:1", CacheEntry(BODY, 10.0, 20.0), 60),
+         ("movies:2", CacheEntry(b"", 10.0, 20.0), 60)]))
+
+    assert encodings == [CacheEntry.unpack(cache._data["movies:1"][1]).encodings, {}]
+    assert set(encodings[0]) == {"gzip", "deflate"}
@@ -0,0 +1,46 @@
+from http import HTTPStatus
+
+import pytest
+
+from app.services.cursor import (START_CURSOR, Cursor, InvalidCursorError,
+                                 decode_cursor, encode_cursor)
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor([1.5, "id"], "pit")
+
+    assert decode_cursor(cursor) == Cursor([1.5, "id"], "pit")
+    assert decode_cursor(encode_cursor([1.5, "id"])) == Cursor([1.5, "id"])
+    assert decode_cursor(START_CURSOR) == Cursor()
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", encode_cursor([])[:-1], "e30"])
+def test_malformed_cursor(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+
+
+def test_cursor_pages_cover_all_results(client, catalog):
+    query = catalog.films[0]["title"].split()[0]
+    pages = client.get("/api/v1/movies/search/",
+                       params={"query": query, "page": 1, "size": 100}).json()
+    seen = []
+    cursor = START_CURSOR
+    while cursor:
+        response = client.get("/api/v1/movies/search/",
+                              params={"query": query, "size": 2, "cursor": cursor})
+        if response.status_code == HTTPStatus.NOT_FOUND:
+            break
+        assert len(response.json()) <= 2
+        seen += [film["id"] for film in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+
+    assert len(pages) > 2
+    assert seen == [film["id"] for film in pages]
+
+
+def test_invalid_cursor_is_rejected(client):
+    response = client.get("/api/v1/movies/search/",
+                          params={"query": "star", "cursor": "not a cursor"})
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,43 @@
+from http import HTTPStatus
+
+import pytest
+
+from app.services.codecs import GzipCodec, ZlibCodec
+from benchmarks.fakes import InMemoryCacheManager
+
+
+@pytest.fixture
+def cache() -> InMemoryCacheManager:
+    # Stores gzip values with a deflate variant, like CACHE_COMPRESSION=gzip
+    return InMemoryCacheManager(codec=GzipCodec(), compress_min_size=0,
+                                variant_codecs=[ZlibCodec()])
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "deflate"])
+def test_miss_and_hit_are_sent_alike(client, catalog, encoding):
+    url = f"/api/v1/movies/{catalog.films[0]['id']}"
+    headers = {"Accept-Encoding": encoding}
+
+    miss = client.get(url, headers=headers)
+    hit = client.get(url, headers=headers)
+    not_modified = client.get(
+        url, headers={**headers, "If-None-Match": miss.headers["ETag"]})
+
+    assert miss.headers["Content-Encoding"] == encoding
+    assert hit.headers["Content-Encoding"] == encoding
+    assert miss.headers["ETag"] == hit.headers["ETag"]
+    assert miss.headers["ETag"].endswith(f'-{encoding}"')
+    assert miss.json() == hit.json()
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_identity_when_no_encoding_is_accepted(client, catalog):
+    url = f"/api/v1/movies/{catalog.films[0]['id']}"
+
+    encoded = client.get(url, headers={"Accept-Encoding": "gzip"})
+    plain = client.get(url, headers={"Accept-Encoding": "identity"})
+
+    assert "Content-Encoding" not in plain.headers
+    assert plain.json() == encoded.json()
+    assert plain.headers["ETag"] != encoded.headers["ETag"]
+    assert plain.headers["Vary"] == "Accept-Encoding"
@@ -0,0 +1,40 @@
+from http import HTTPStatus
+
+
+def test_films_batch_follows_the_input_order(client, es, catalog):
+    film_ids = [catalog.films[1]["id"], "unknown", catalog.films[0]["id"]]
+
+    response = client.post("/api/v1/movies/_batch", json={"ids": film_ids})
+
+    assert response.status_code == HTTPStatus.OK
+    assert [film and film["id"] for film in response.json()] == [
+        film_ids[0], None, film_ids[2]]
+    assert es.calls["mget"] == 1
+
+
+def test_films_batch_is_read_from_the_cache(client, es, catalog):
+    film_ids = [film["id"] for film in catalog.films[:3]]
+
+    first = client.post("/api/v1/movies/_batch", json={"ids": film_ids[:2]})
+    second = client.post("/api/v1/movies/_batch", json={"ids": film_ids})
+
+    assert second.json()[:2] == first.json()
+    # Only the third film was fetched by the second request
+    assert es.calls["mget"] == 2
+
+
+def test_persons_and_genres_batches(client, catalog):
+    persons = client.post("/api/v1/persons/_batch",
+                          json={"ids": [catalog.persons[0]["id"]]})
+    genres = client.post("/api/v1/genres/_batch",
+                         json={"ids": [catalog.genres[0]["id"], "unknown"]})
+
+    assert persons.json()[0]["id"] == catalog.persons[0]["id"]
+    assert [genre and genre["id"] for genre in genres.json()] == [
+        catalog.genres[0]["id"], None]
+
+
+def test_batch_without_ids_is_rejected(client):
+    response = client.post("/api/v1/movies/_batch", json={"ids": []})
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
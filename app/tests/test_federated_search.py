@@ -0,0 +1,108 @@
+import asyncio
+from http import HTTPStatus
+
+import pytest
+
+from app.services.base_service import BaseService, _MultiSearch
+from app.services.elasticsearch_service import SearchRequest
+from app.services.genre_service import GenreService
+from app.services.person_service import PersonService
+
+
+@pytest.fixture
+def services(films, cache, es) -> list[BaseService]:
+    return [films, PersonService(cache, es), GenreService(cache, es)]
+
+
+def test_misses_share_one_multi_search(services, es, catalog):
+    query = catalog.films[0]["title"].split()[0]
+
+    async def scenario():
+        federated = await BaseService.search_many_raw(services, query, 1, 10)
+        separate = [await service._search_raw(query, 1, 10, service.model)
+                    for service in services]
+        return federated, separate
+
+    federated, separate = asyncio.run(scenario())
+
+    assert federated[0] is not None
+    assert [payload and payload.body for payload in federated] == [
+        payload and payload.body for payload in separate]
+    assert es.calls["msearch"] == 1
+    # The separate searches were cache hits
+    assert es.calls["search"] == 0
+
+
+def test_cached_pages_skip_elasticsearch(services, es, catalog):
+    query = catalog.films[0]["title"].split()[0]
+
+    async def scenario():
+        await services[0]._search_raw(query, 1, 10, services[0].model)
+        return await BaseService.search_many_raw(services, query, 1, 10)
+
+    asyncio.run(scenario())
+
+    assert es.calls["search"] == 1
+    assert es.calls["msearch"] == 1
+
+
+def test_multi_search_waits_for_every_joined_fill(es, catalog):
+    query = catalog.films[0]["title"].split()[0]
+
+    async def scenario():
+        batch = _MultiSearch(es)
+        for n in range(3):
+            batch.join(n)
+        batch.close()
+        first = asyncio.create_task(
+            batch.search(0, SearchRequest("movies", query, 0, 10)))
+        second = asyncio.create_task(
+            batch.search(1, SearchRequest("persons", query, 0, 10)))
+        await asyncio.sleep(0)
+        assert es.calls["msearch"] == 0
+        # Filled from elsewhere, without a search
+        batch.leave(2)
+        return await first, await second
+
+    movies, persons = asyncio.run(scenario())
+
+    assert movies
+    assert es.calls["msearch"] == 1
+
+
+def test_multi_search_error_reaches_every_fill(es):
+    async def failing_multi_search(searches):
+        raise ConnectionError("elasticsearch is down")
+
+    es.multi_search = failing_multi_search
+
+    async def scenario():
+        batch = _MultiSearch(es)
+        batch.join(0)
+        batch.join(1)
+        batch.close()
+        return await asyncio.gather(
+            batch.search(0, SearchRequest("movies", "star", 0, 10)),
+            batch.search(1, SearchRequest("persons", "star", 0, 10)),
+            return_exceptions=True)
+
+    results = asyncio.run(scenario())
+
+    assert all(isinstance(result, ConnectionError) for result in results)
+
+
+def test_search_endpoint(client, catalog):
+    query = catalog.films[0]["title"].split()[0]
+
+    response = client.get("/api/v1/search/",
+                          params={"query": query, "types": ["movies", "genres"]})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()["movies"]
+    assert response.json()["genres"] == []
+
+
+def test_search_endpoint_unknown_type(client):
+    response = client.get("/api/v1/search/", params={"query": "star", "types": "films"})
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,63 @@
+from http import HTTPStatus
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.common import parse_fields
+from app.models.film import Film
+
+
+def test_parse_fields():
+    assert parse_fields(None, Film) is None
+    assert parse_fields("", Film) is None
+    assert parse_fields("title", Film) == ["id", "title"]
+    assert parse_fields(" title , imdb_rating,title", Film) == [
+        "id", "imdb_rating", "title"]
+    assert parse_fields(",".join(Film.__fields__), Film) is None
+
+
+def test_parse_fields_unknown():
+    with pytest.raises(HTTPException) as error:
+        parse_fields("title,budget,box_office", Film)
+
+    assert error.value.status_code == HTTPStatus.BAD_REQUEST
+    assert error.value.detail == "Unknown fields: box_office, budget"
+
+
+def test_detail_projection(client, es, catalog):
+    film = catalog.films[0]
+
+    response = client.get(f"/api/v1/movies/{film['id']}",
+                          params={"fields": "title,imdb_rating"})
+
+    assert response.json() == {"id": film["id"], "title": film["title"],
+                               "imdb_rating": film["imdb_rating"]}
+    assert es.calls["get"] == 1
+
+
+def test_projection_has_its_own_cache_entry(client, catalog):
+    url = f"/api/v1/movies/{catalog.films[0]['id']}"
+
+    projected = client.get(url, params={"fields": "title"})
+    full = client.get(url)
+    projected_again = client.get(url, params={"fields": "title"})
+
+    assert set(projected.json()) == {"id", "title"}
+    assert "genre" in full.json()
+    assert projected_again.json() == projected.json()
+    assert projected_again.headers["ETag"] != full.headers["ETag"]
+
+
+def test_search_projection(client, catalog):
+    response = client.get("/api/v1/movies/search/", params={
+        "query": catalog.films[0]["title"].split()[0], "fields": "title"})
+
+    assert response.json()
+    assert all(set(film) == {"id", "title"} for film in response.json())
+
+
+def test_unknown_field_is_rejected(client, catalog):
+    response = client.get(f"/api/v1/movies/{catalog.films[0]['id']}",
+                          params={"fields": "budget"})
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
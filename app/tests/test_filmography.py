@@ -0,0 +1,53 @@
+from http import HTTPStatus
+
+from app.services.search_profiles import get_search_profile
+
+
+def person_with_films(catalog, count: int = 3) -> dict:
+    return next(person for person in catalog.persons
+                if len(person["films_id"]) >= count)
+
+
+def test_films_follow_films_id(client, catalog):
+    person = person_with_films(catalog)
+    list_source = get_search_profile("movies").list_source
+
+    response = client.get(f"/api/v1/persons/{person['id']}/films",
+                          params={"page": 2, "size": 2})
+
+    assert response.status_code == HTTPStatus.OK
+    assert [film["id"] for film in response.json()] == person["films_id"][2:4]
+    assert all(set(film) <= set(list_source) for film in response.json())
+
+
+def test_page_is_cached(client, es, catalog):
+    url = f"/api/v1/persons/{person_with_films(catalog)['id']}/films"
+
+    first = client.get(url)
+    calls = dict(es.calls)
+    second = client.get(url)
+
+    assert second.json() == first.json()
+    assert dict(es.calls) == calls
+    assert second.headers["ETag"] == first.headers["ETag"]
+
+
+def test_film_invalidation_moves_the_page(client, container, cache, es, catalog):
+    person = person_with_films(catalog)
+    url = f"/api/v1/persons/{person['id']}/films"
+
+    client.get(url)
+    misses = sum(cache.misses.values())
+    container.cache_invalidator.apply(
+        {"index": "movies", "ids": person["films_id"][:1], "generation": 1})
+    client.get(url)
+
+    # The page is joined again, from the film entries still cached
+    assert sum(cache.misses.values()) == misses + 1
+    assert es.calls["mget"] == 2
+
+
+def test_unknown_person(client):
+    response = client.get("/api/v1/persons/unknown/films")
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,70 @@
+from http import HTTPStatus
+
+from app.api.common import (
+    accepted_encodings, choose_encoding, encoding_etag, etag_matches)
+
+
+def test_etag_matches():
+    assert etag_matches('"a"', '"a"')
+    assert etag_matches('"b", "a"', '"a"')
+    assert etag_matches("*", '"a"')
+    assert not etag_matches('"b"', '"a"')
+
+
+def test_etag_matches_weak():
+    assert etag_matches('W/"a"', '"a"')
+    assert etag_matches('"a"', 'W/"a"')
+    assert etag_matches(' W/"b" , W/"a"', 'W/"a"')
+
+
+def test_accepted_encodings():
+    assert accepted_encodings("gzip, deflate, br") == {"gzip", "deflate", "br"}
+    assert accepted_encodings("GZIP;q=0.5, br;q=0") == {"gzip"}
+    assert accepted_encodings("gzip;q=oops, *") == {"*"}
+    assert accepted_encodings("identity") == {"identity"}
+
+
+def test_choose_encoding():
+    encodings = {"gzip": b"g", "deflate": b"d"}
+
+    assert choose_encoding("deflate", encodings) == "deflate"
+    assert choose_encoding("deflate, gzip", encodings) == "gzip"
+    assert choose_encoding("*", encodings) == "gzip"
+    assert choose_encoding("gzip;q=0, br", encodings) is None
+    assert choose_encoding(None, encodings) is None
+    assert choose_encoding("gzip", {}) is None
+
+
+def test_encoding_etag():
+    assert encoding_etag('"abc"', "gzip") == '"abc-gzip"'
+    assert encoding_etag('W/"abc"', "br") == 'W/"abc-br"'
+    assert etag_matches(encoding_etag('"abc"', "gzip"), '"abc-gzip"')
+    assert not etag_matches('"abc"', encoding_etag('"abc"', "gzip"))
+
+
+def test_detail_not_modified(client, catalog):
+    url = f"/api/v1/movies/{catalog.films[0]['id']}"
+
+    first = client.get(url)
+    etag = first.headers["ETag"]
+    cached = client.get(url)
+    not_modified = client.get(url, headers={"If-None-Match": etag})
+    changed = client.get(url, headers={"If-None-Match": '"other"'})
+
+    assert "Cache-Control" in first.headers
+    assert cached.headers["ETag"] == etag
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+    assert not_modified.content == b""
+    assert not_modified.headers["ETag"] == etag
+    assert changed.status_code == HTTPStatus.OK
+    assert changed.content == first.content
+
+
+def test_search_not_modified(client, catalog):
+    params = {"query": catalog.films[0]["title"].split()[0]}
+
+    etag = client.get("/api/v1/movies/search/", params=params).headers["ETag"]
+    response = client.get("/api/v1/movies/search/", params=params,
+                          headers={"If-None-Match": f'W/{etag}'})
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
@@ -0,0 +1,113 @@
+import asyncio
+from http import HTTPStatus
+
+import orjson
+
+from app.services.invalidation import CacheInvalidator, generation_key
+
+
+class FakeRedis:
+    """The Redis commands the invalidator uses."""
+
+    def __init__(self):
+        self.values: dict[str, int] = {}
+        self.published: list[tuple[str, bytes]] = []
+
+    async def incr(self, key: str) -> int:
+        self.values[key] = self.values.get(key, 0) + 1
+        return self.values[key]
+
+    async def mget(self, keys: list[str]) -> list:
+        return [str(self.values[key]).encode() if key in self.values else None
+                for key in keys]
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        self.published.append((channel, message))
+
+
+def make_invalidator(cache, redis=None) -> CacheInvalidator:
+    return CacheInvalidator(redis or FakeRedis(), cache, "invalidations")
+
+
+def test_invalidate_drops_the_documents_and_moves_the_searches(films, cache, catalog):
+    invalidator = make_invalidator(cache)
+    film_id = catalog.films[0]["id"]
+    search_key = films._search_cache_key("star", 1, 10)
+
+    async def scenario():
+        await films.get_by_id_raw(film_id)
+        return await invalidator.invalidate("movies", [film_id])
+
+    generation = asyncio.run(scenario())
+
+    assert generation == 1
+    assert cache.generations["movies"] == 1
+    assert films._search_cache_key("star", 1, 10) != search_key
+    assert cache.generate_cache_key("movies", film_id) not in cache._data
+    channel, message = invalidator.redis.published[0]
+    assert channel == "invalidations"
+    assert orjson.loads(message) == {"index": "movies", "ids": [film_id],
+                                     "generation": 1}
+
+
+def test_apply_keeps_the_newest_generation_and_notifies_listeners(cache):
+    invalidator = make_invalidator(cache)
+    notified = []
+    invalidator.listeners.append(lambda index, ids: notified.append((index, ids)))
+
+    invalidator.apply({"index": "movies", "ids": ["1"], "generation": 5})
+    invalidator.apply({"index": "movies", "ids": ["2"], "generation": 3})
+
+    assert cache.generations["movies"] == 5
+    assert notified == [("movies", ["1"]), ("movies", ["2"])]
+
+
+def test_malformed_message_is_ignored(cache):
+    invalidator = make_invalidator(cache)
+
+    invalidator._handle(b"not json")
+    invalidator._handle(b'{"ids": ["1"]}')
+
+    assert cache.generations == {}
+
+
+def test_load_generations(cache):
+    redis = FakeRedis()
+    redis.values[generation_key("movies")] = 7
+    invalidator = make_invalidator(cache, redis)
+
+    assert not invalidator.generations_loaded
+    asyncio.run(invalidator.load_generations(["movies", "persons"]))
+
+    assert invalidator.generations_loaded
+    assert cache.generations == {"movies": 7}
+
+
+def test_load_racing_an_invalidation_is_not_cached(films, es, cache, catalog):
+    invalidator = make_invalidator(cache)
+    film_id = catalog.films[0]["id"]
+    get_by_id = es.get_by_id
+
+    async def get_during_invalidation(*args, **kwargs):
+        doc = await get_by_id(*args, **kwargs)
+        invalidator.apply({"index": "movies", "ids": [film_id], "generation": 1})
+        return doc
+
+    es.get_by_id = get_during_invalidation
+
+    payload = asyncio.run(films.get_by_id_raw(film_id))
+
+    assert orjson.loads(payload.body)["id"] == film_id
+    assert cache.generate_cache_key("movies", film_id) not in cache._data
+
+
+def test_ready_waits_for_the_generations(client, container):
+    asyncio.run(container.warmup.run([], None))
+
+    not_ready = client.get("/ready")
+    container.cache_invalidator.generations_loaded = True
+    ready = client.get("/ready")
+
+    assert not_ready.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert not_ready.json()["generations_loaded"] is False
+    assert ready.status_code == HTTPStatus.OK
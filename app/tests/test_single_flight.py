@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_run():
+    single_flight = SingleFlight()
+    runs = []
+
+    async def fn():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def scenario():
+        return await asyncio.gather(*(single_flight.do("key", fn) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == ["value"] * 5
+    assert len(runs) == 1
+    assert len(single_flight) == 0
+
+
+def test_exception_reaches_every_caller():
+    single_flight = SingleFlight()
+
+    async def fn():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def scenario():
+        return await asyncio.gather(*(single_flight.do("key", fn) for _ in range(3)),
+                                    return_exceptions=True)
+
+    results = asyncio.run(scenario())
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert "key" not in single_flight
+
+
+def test_waiter_takes_over_from_cancelled_leader():
+    single_flight = SingleFlight()
+    runs = []
+
+    async def fn():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return len(runs)
+
+    async def scenario():
+        leader = asyncio.create_task(single_flight.do("key", fn))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(single_flight.do("key", fn))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await waiter
+
+    assert asyncio.run(scenario()) == 2
+    assert len(single_flight) == 0
@@ -0,0 +1,56 @@
+from http import HTTPStatus
+
+from app.services.suggest import PrefixIndex, Suggestion
+
+DOCS = [
+    {"id": "1", "title": "Star Wars", "imdb_rating": 8.6},
+    {"id": "2", "title": "The Star", "imdb_rating": 9.0},
+    {"id": "3", "title": "Stardust", "imdb_rating": 7.0},
+    {"id": "4", "title": "Dark Star Wars Story", "imdb_rating": 8.6},
+    {"id": "5", "title": "Звёздные войны", "imdb_rating": 8.0},
+    {"id": "6", "title": None},
+]
+
+
+def test_prefix_index_ranks_whole_query_prefix_first():
+    index = PrefixIndex(DOCS, "title", "imdb_rating")
+
+    assert len(index) == 6
+    assert [s.id for s in index.lookup("star", 10)] == ["1", "3", "2", "4"]
+    assert index.lookup("st", 2) == [Suggestion("1", "Star Wars"),
+                                     Suggestion("3", "Stardust")]
+
+
+def test_prefix_index_matches_every_word():
+    index = PrefixIndex(DOCS, "title", "imdb_rating")
+
+    assert [s.id for s in index.lookup("wars sta", 10)] == ["1", "4"]
+    assert [s.id for s in index.lookup("  STAR   Wa", 10)] == ["1", "4"]
+    assert [s.id for s in index.lookup("звёз", 10)] == ["5"]
+    assert index.lookup("trek", 10) == []
+    assert index.lookup("", 10) == []
+
+
+def test_prefix_index_without_rank():
+    index = PrefixIndex(DOCS, "title")
+
+    # Shorter titles first
+    assert [s.id for s in index.lookup("star", 10)] == ["3", "1", "2", "4"]
+
+
+def test_suggest_endpoint(client, catalog):
+    word = catalog.films[0]["title"].split()[0]
+
+    response = client.get("/api/v1/suggest/",
+                          params={"query": word[:3], "types": ["movies", "movies"]})
+
+    assert response.status_code == HTTPStatus.OK
+    assert list(response.json()) == ["movies"]
+    assert response.json()["movies"]
+    assert "max-age" in response.headers["Cache-Control"]
+
+
+def test_suggest_unknown_type(client):
+    response = client.get("/api/v1/suggest/", params={"query": "st", "types": "films"})
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,70 @@
+import asyncio
+
+from app.services.cache_manager import TieredCacheManager
+from benchmarks.fakes import InMemoryCacheManager
+
+
+def make_cache(**kwargs) -> TieredCacheManager:
+    return TieredCacheManager(InMemoryCacheManager(), max_size=2, ttl=60, **kwargs)
+
+
+def test_reads_through_and_fills_local_tier():
+    cache = make_cache()
+
+    async def scenario():
+        await cache.backend.set_entry("movies:1", b'{"id": "1"}', 60)
+        first = await cache.get_entry("movies:1")
+        second = await cache.get_entry("movies:1")
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first.value == second.value == b'{"id": "1"}'
+    assert cache.backend.hits["detail"] == 1
+    assert cache.stats()["movies"]["hits"] == 1
+
+
+def test_writes_go_to_both_tiers():
+    cache = make_cache()
+
+    async def scenario():
+        await cache.set_entry("movies:1", b'{"id": "1"}', 60)
+        return await cache.get_entry("movies:1"), await cache.backend.get_entry(
+            "movies:1")
+
+    local, backend = asyncio.run(scenario())
+
+    assert local.value == backend.value == b'{"id": "1"}'
+    assert cache.backend.misses["detail"] == 0
+    assert cache.backend.hits["detail"] == 1
+
+
+def test_delete_and_evict_local():
+    cache = make_cache()
+
+    async def scenario():
+        await cache.set_entries([("movies:1", b"1", 60, None, None),
+                                 ("movies:2", b"2", 60, None, None)])
+        await cache.delete(["movies:1"])
+        cache.evict_local(["movies:2"])
+        return await cache.get_entries(["movies:1", "movies:2"])
+
+    deleted, evicted = asyncio.run(scenario())
+
+    assert deleted is None
+    # Only dropped from the local tier
+    assert evicted.value == b"2"
+
+
+def test_per_index_limits():
+    cache = make_cache(index_sizes={"genres": 1}, index_ttls={"persons": 0})
+
+    async def scenario():
+        await cache.set_entries([(key, b"x", 60, None, None) for key in (
+            "movies:1", "movies:2", "genres:1", "genres:2", "persons:1")])
+
+    asyncio.run(scenario())
+
+    assert len(cache.local_caches["movies"]) == 2
+    assert len(cache.local_caches["genres"]) == 1
+    assert cache.local_caches["persons"].get("persons:1") is None
@@ -0,0 +1,70 @@
+import asyncio
+
+from app.services.warmup import HotRequest, Warmup, read_hot_requests
+
+
+def test_replays_every_request_then_reports_ready():
+    warmup = Warmup(concurrency=2, timeout=10)
+    replayed = []
+
+    async def replay(request: HotRequest):
+        await asyncio.sleep(0)
+        if request.request == ["fail"]:
+            raise ValueError("bad request")
+        replayed.append(request)
+
+    requests = [HotRequest("movies", ["detail", str(i)]) for i in range(5)]
+    assert not warmup.is_ready
+    asyncio.run(warmup.run([*requests, HotRequest("movies", ["fail"])], replay))
+
+    assert warmup.is_ready
+    assert sorted(replayed) == requests
+    assert (warmup.total, warmup.completed, warmup.failed) == (6, 5, 1)
+
+
+def test_timeout_still_reports_ready():
+    warmup = Warmup(concurrency=1, timeout=0.01)
+
+    async def replay(request: HotRequest):
+        await asyncio.sleep(1)
+
+    asyncio.run(warmup.run([HotRequest("movies", ["detail", "1"])] * 3, replay))
+
+    assert warmup.is_ready
+    assert warmup.completed == 0
+
+
+def test_abort():
+    warmup = Warmup(concurrency=1, timeout=10)
+
+    warmup.abort(OSError("no hot requests"))
+
+    assert warmup.is_ready
+    assert warmup.status()["error"] == "OSError('no hot requests')"
+
+
+def test_replay_fills_the_cache(films, es, catalog):
+    film_id = catalog.films[0]["id"]
+
+    async def scenario():
+        await films.replay(["detail", film_id])
+        await films.replay(["search", "star", 1, 10])
+        await films.get_by_id_raw(film_id)
+        await films.search_films_raw("star", 1, 10)
+
+    asyncio.run(scenario())
+
+    assert es.calls["get"] == 1
+    assert es.calls["search"] == 1
+
+
+def test_read_hot_requests(tmp_path):
+    path = tmp_path / "hot.jsonl"
+    path.write_text(
+        '{"index": "movies", "request": ["detail", "1"]}\n'
+        '\n'
+        '{"index": "movies", "request": ["detail", "2"]}\n'
+        '{"index": "genres", "request": ["detail", "3"]}\n')
+
+    assert read_hot_requests(str(path), limit=1) == [
+        HotRequest("movies", ["detail", "1"]), HotRequest("genres", ["detail", "3"])]